@@ -10,6 +10,7 @@ from uuid import UUID
 
 from mcp_scan.core.scheduler import Scheduler
 from mcp_scan.core.models import TaskStatus
+from mcp_scan.core.errors import AdmissionRejectedError, InvalidTargetError, SchedulerError
 from mcp_scan.config import get_config
 
 console = Console()
@@ -23,31 +24,101 @@ def cli():
     pass
 
 @cli.command()
-@click.option('--target', required=True, help='Target IP or URL')
+@click.option('--target', help='Target IP or URL')
+@click.option('--targets-file', type=click.File('r'), help='File with one target per line, one job each')
 @click.option('--profile', default='fast', help='Scan profile (fast/deep)')
-def start(target, profile):
-    """Start a new scan job."""
+@click.option('--priority', default=5, type=click.IntRange(1, 10), help='Job priority, 1 (lowest) to 10 (most urgent)')
+@click.option('--no-cache', is_flag=True, help='Run every tool even if a cached result exists')
+@click.option('--incremental', is_flag=True, help='Only rescan services changed since the last completed job for this target')
+def start(target, targets_file, profile, priority, no_cache, incremental):
+    """Start a new scan job, or one job per target of a targets file."""
+    if bool(target) == bool(targets_file):
+        raise click.UsageError("Give exactly one of --target and --targets-file")
+    if targets_file:
+        _start_batch(read_targets(targets_file), profile, priority, no_cache, incremental)
+        return
     console.print(f"[bold green]Starting scan on {target} with profile {profile}[/bold green]")
     
     async def run_scan():
-        job = await scheduler.create_job(target)
+        try:
+            scheduler.admission.check()
+        except AdmissionRejectedError as e:
+            console.print(f"[red]{e.message}[/red]")
+            return
+        try:
+            job = await scheduler.create_job(target, priority=priority, bypass_cache=no_cache,
+                                             incremental=incremental)
+        except InvalidTargetError as e:
+            console.print(f"[red]{e.message}[/red]")
+            return
         console.print(f"Job ID: [bold cyan]{job.id}[/bold cyan]")
         
-        # Start the scheduler in background
-        scan_task = asyncio.create_task(scheduler.run_job(job.id))
+        # Start the scheduler in background, or wait for a turn
+        admission = scheduler.submit_job(job)
+        if admission.position:
+            console.print(f"[yellow]Queued at position {admission.position}[/yellow]")
+        scan_task = admission.runner
         
         # Live Display Loop
-        with Live(generate_status_table(job.id), refresh_per_second=4) as live:
-            while not scan_task.done():
+        try:
+            with Live(generate_status_table(job.id), refresh_per_second=4) as live:
+                while not scan_task.done():
+                    live.update(generate_status_table(job.id))
+                    await asyncio.sleep(0.5)
+                
+                # One final update
                 live.update(generate_status_table(job.id))
-                await asyncio.sleep(0.5)
-            
-            # One final update
-            live.update(generate_status_table(job.id))
+        except asyncio.CancelledError:
+            # Ctrl+C: kill the running tools instead of leaving them behind
+            scheduler.control(job.id, "cancel")
+            await asyncio.wait([scan_task])
+            console.print("[bold yellow]Scan cancelled.[/bold yellow]")
+            return
         
         console.print("[bold green]Scan Completed![/bold green]")
 
-    asyncio.run(run_scan())
+    try:
+        asyncio.run(run_scan())
+    except KeyboardInterrupt:
+        pass
+
+def read_targets(lines) -> list:
+    """Targets of a targets file: one per line, blank lines and # comments skipped."""
+    targets = (line.split("#", 1)[0].strip() for line in lines)
+    return list(dict.fromkeys(t for t in targets if t))
+
+def _start_batch(targets, profile, priority, no_cache, incremental):
+    console.print(f"[bold green]Starting {len(targets)} scans with profile {profile}[/bold green]")
+
+    async def run_batch():
+        try:
+            jobs = await scheduler.create_jobs(targets, priority=priority, bypass_cache=no_cache,
+                                               incremental=incremental)
+        except (InvalidTargetError, SchedulerError) as e:
+            console.print(f"[red]{e.message}[/red]")
+            return
+        # Submitted by the operator: queue past max_queued_jobs, still
+        # running at most max_running_jobs at a time
+        runners = [admission.runner for admission in scheduler.submit_jobs(jobs, force=True)]
+        try:
+            with Live(generate_batch_table(jobs), refresh_per_second=2) as live:
+                while not all(runner.done() for runner in runners):
+                    live.update(generate_batch_table(jobs))
+                    await asyncio.sleep(1.0)
+                live.update(generate_batch_table(jobs))
+        except asyncio.CancelledError:
+            for job in jobs:
+                if job.status not in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+                    scheduler.control(job.id, "cancel")
+            await asyncio.wait(runners)
+            console.print("[bold yellow]Scans cancelled.[/bold yellow]")
+            return
+        console.print("[bold green]All scans finished![/bold green]")
+
+    try:
+        asyncio.run(run_batch())
+    except KeyboardInterrupt:
+        pass
 
 @cli.command()
 @click.argument('job_id')
@@ -60,6 +131,45 @@ def status(job_id):
     except ValueError:
         console.print("[red]Invalid Job ID format[/red]")
 
+def _control(job_id: str, action: str, task_id: str):
+    try:
+        uuid_job = UUID(job_id)
+        uuid_task = UUID(task_id) if task_id else None
+    except ValueError:
+        console.print("[red]Invalid Job ID format[/red]")
+        return
+    try:
+        changed = scheduler.control(uuid_job, action, uuid_task)
+    except SchedulerError as e:
+        console.print(f"[red]{e.message}[/red]")
+        return
+    if changed:
+        console.print(f"[green]{action.capitalize()} requested for job {job_id}[/green]")
+    else:
+        console.print(f"[yellow]Nothing to {action} for job {job_id}[/yellow]")
+
+@cli.command()
+@click.argument('job_id')
+@click.option('--task', 'task_id', default=None, help='Only cancel this task (and the tasks depending on it)')
+def cancel(job_id, task_id):
+    """Cancel a job or task, killing its running tools."""
+    _control(job_id, "cancel", task_id)
+
+@cli.command()
+@click.argument('job_id')
+@click.option('--task', 'task_id', default=None, help='Only pause this task')
+@click.option('--preempt', is_flag=True, help='Also stop running tasks; they rerun on resume')
+def pause(job_id, task_id, preempt):
+    """Pause a job or task; queued tasks stay pending until resumed."""
+    _control(job_id, "preempt" if preempt else "pause", task_id)
+
+@cli.command()
+@click.argument('job_id')
+@click.option('--task', 'task_id', default=None, help='Only resume this task')
+def resume(job_id, task_id):
+    """Resume a paused job or task."""
+    _control(job_id, "resume", task_id)
+
 @cli.command()
 @click.argument('job_id')
 @click.option('--output', '-o', required=True, help='Output file path')
@@ -87,6 +197,42 @@ def report(job_id, output):
     except OSError as e:
         console.print(f"[red]Failed to write report: {e}[/red]")
 
+@cli.command()
+def recover():
+    """Resume unfinished jobs left behind by a crashed or restarted scheduler."""
+    async def run_recovery():
+        jobs = await scheduler.recover_jobs(start=False)
+        if not jobs:
+            console.print("[green]No unfinished jobs to recover.[/green]")
+            return
+        for job in jobs:
+            done = sum(1 for t in job.tasks if t.status == TaskStatus.COMPLETED)
+            console.print(f"Resuming job [bold cyan]{job.id}[/bold cyan] ({job.target}): "
+                          f"{done}/{len(job.tasks)} tasks already done")
+        # Through admission control, like any other job
+        runs = [scheduler.submit_job(job, force=True).runner for job in jobs]
+        try:
+            await asyncio.gather(*runs)
+        except asyncio.CancelledError:
+            for job in jobs:
+                scheduler.control(job.id, "cancel")
+            await asyncio.gather(*runs, return_exceptions=True)
+            return
+        for job in jobs:
+            console.print(f"Job {job.id}: [bold]{job.status.value}[/bold]")
+
+    try:
+        asyncio.run(run_recovery())
+    except KeyboardInterrupt:
+        pass
+
+@cli.command()
+@click.option('--batch-size', default=100, type=click.IntRange(1), help='Jobs converted per transaction')
+def migrate(batch_size):
+    """Convert jobs stored as one JSON blob to the normalized job tables."""
+    migrated = scheduler.db.migrate_legacy_jobs(batch_size=batch_size)
+    console.print(f"[green]Migrated {migrated} jobs.[/green]")
+
 @cli.command()
 def server():
     """Start the MCP Server to expose tools."""
@@ -98,12 +244,31 @@ def server():
     from mcp_scan.transport.mcp_server import start_server
     start_server()
 
+@cli.command()
+@click.option('--scheduler-url', default=None, help='Worker API URL of the scheduler (default: from config)')
+@click.option('--name', default=None, help='Worker name (default: hostname)')
+@click.option('--capacity', default=2, type=click.IntRange(1), help='Tasks to run at the same time')
+@click.option('--tool', 'tools', multiple=True, help='Only accept tasks for this tool (repeatable)')
+def worker(scheduler_url, name, capacity, tools):
+    """Run a scan worker that pulls tasks from a scheduler."""
+    from mcp_scan.transport.worker import ScanWorker
+    config = get_config().workers
+    scheduler_url = scheduler_url or f"http://{config.host}:{config.port}"
+    console.print(f"[bold green]Starting worker for {scheduler_url}[/bold green]")
+    scan_worker = ScanWorker(scheduler_url, name=name, capacity=capacity, tools=list(tools),
+                             heartbeat_interval=config.heartbeat_interval, poll_interval=config.poll_interval,
+                             token=config.token)
+    try:
+        scan_worker.run()
+    except KeyboardInterrupt:
+        scan_worker.stop()
+
 def generate_status_table(job_id: UUID) -> Table:
-    job = scheduler.get_job(job_id)
+    job = scheduler.get_job(job_id, full=False)
     if not job:
         return Panel(f"[red]Job {job_id} not found[/red]")
 
-    table = Table(title=f"Scan Status: {job.target} [{job.status.value}]")
+    table = Table(title=f"Scan Status: {job.target} [{job.status.value}] (priority {job.priority})")
     table.add_column("Task ID", style="dim", width=8)
     table.add_column("Tool", style="cyan")
     table.add_column("Status")
@@ -117,20 +282,48 @@ def generate_status_table(job_id: UUID) -> Table:
             status_color = "red"
         elif task.status == TaskStatus.RUNNING:
             status_color = "blue"
+        elif task.status in (TaskStatus.CANCELLED, TaskStatus.PAUSED):
+            status_color = "magenta"
         
         info = ""
         if task.error:
             info = f"[red]{task.error[:30]}...[/red]"
+        elif task.carried_forward_from:
+            info = f"Carried forward from {str(task.carried_forward_from)[:8]}"
         elif task.result:
-            info = "Done"
+            info = "Done (cached)" if task.result.get("cached") else "Done"
+        elif task.dispatch_note:
+            # Why the scheduler started, or is still holding, this task
+            info = f"[dim]{task.dispatch_note}[/dim]"
 
         table.add_row(
             str(task.id)[:8],
-            task.tool_name,
+            f"{task.tool_name} ({task.name})" if task.name else task.tool_name,
             f"[{status_color}]{task.status.value}[/{status_color}]",
             info
         )
     return table
 
+def generate_batch_table(jobs) -> Table:
+    """Job counts per status and overall task progress of a batch."""
+    # One pass over the admission queue per render, not one per job
+    queued = set(scheduler.admission.queued())
+    counts = {}
+    for job in jobs:
+        key = "queued" if job.id in queued else job.status.value
+        counts[key] = counts.get(key, 0) + 1
+    tasks = [task for job in jobs for task in job.tasks]
+    done = sum(1 for task in tasks if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED))
+
+    table = Table(title=f"Batch: {len(jobs)} jobs", caption=f"Tasks finished: {done}/{len(tasks)}")
+    table.add_column("Status")
+    table.add_column("Jobs", justify="right")
+    colors = {"queued": "dim", "pending": "yellow", "running": "blue", "paused": "magenta",
+              "completed": "green", "failed": "red", "cancelled": "magenta"}
+    for key, color in colors.items():
+        if counts.get(key):
+            table.add_row(f"[{color}]{key}[/{color}]", str(counts[key]))
+    return table
+
 if __name__ == '__main__':
     cli()
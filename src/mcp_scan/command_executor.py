@@ -1,8 +1,12 @@
+import os
+import signal
 import subprocess
 import threading
 import logging
 import sys
-from typing import Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Callable, Iterator, Optional
 
 # Configure logging - use stderr to avoid polluting stdout (critical for MCP)
 logging.basicConfig(
@@ -16,12 +20,85 @@ logger = logging.getLogger(__name__)
 
 COMMAND_TIMEOUT = 180  # 5 minutes default timeout
 
+LineCallback = Callable[[str], None]
+
+_output_listener: ContextVar[Optional[LineCallback]] = ContextVar("output_listener", default=None)
+
+@contextmanager
+def stream_output(listener: LineCallback) -> Iterator[None]:
+    """Feed every stdout line of commands executed in this context to `listener`."""
+    token = _output_listener.set(listener)
+    try:
+        yield
+    finally:
+        _output_listener.reset(token)
+
+def output_listener() -> Optional[LineCallback]:
+    """Listener installed by `stream_output` for the current context, if any."""
+    return _output_listener.get()
+
+_timeout_override: ContextVar[Optional[float]] = ContextVar("command_timeout", default=None)
+
+@contextmanager
+def command_timeout(seconds: Optional[float]) -> Iterator[None]:
+    """Override the timeout of commands executed in this context; None keeps theirs."""
+    token = _timeout_override.set(seconds)
+    try:
+        yield
+    finally:
+        _timeout_override.reset(token)
+
+class CancelScope:
+    """Kill switch for every command started inside `cancel_scope(scope)`.
+
+    `cancel` may be called from any thread; commands that have not started
+    yet return immediately once the scope is cancelled.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._executors = []
+        self._lock = threading.Lock()
+
+    def attach(self, executor: "CommandExecutor") -> bool:
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._executors.append(executor)
+            return True
+
+    def detach(self, executor: "CommandExecutor"):
+        with self._lock:
+            if executor in self._executors:
+                self._executors.remove(executor)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            executors = list(self._executors)
+        for executor in executors:
+            executor.cancel()
+
+_cancel_scope: ContextVar[Optional[CancelScope]] = ContextVar("cancel_scope", default=None)
+
+@contextmanager
+def cancel_scope(scope: CancelScope) -> Iterator[None]:
+    """Make commands executed in this context killable through `scope`."""
+    token = _cancel_scope.set(scope)
+    try:
+        yield
+    finally:
+        _cancel_scope.reset(token)
+
 class CommandExecutor:
     """Class to handle command execution with better timeout management"""
     
-    def __init__(self, command: str, timeout: int = COMMAND_TIMEOUT):
+    def __init__(self, command: str, timeout: int = COMMAND_TIMEOUT, on_line: Optional[LineCallback] = None):
         self.command = command
-        self.timeout = timeout
+        override = _timeout_override.get()
+        self.timeout = override if override is not None else timeout
+        # Called from the reader thread with each stdout line as it arrives
+        self.on_line = on_line or output_listener()
         self.process = None
         self.stdout_data = ""
         self.stderr_data = ""
@@ -29,12 +106,52 @@ class CommandExecutor:
         self.stderr_thread = None
         self.return_code = None
         self.timed_out = False
+        self.cancelled = False
+        self.scope = _cancel_scope.get()
+
+    def _kill_tree(self, sig: int):
+        """Signal the shell and every process it started."""
+        if not self.process or self.process.poll() is not None:
+            return
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(self.process.pid, sig)
+            elif sig == signal.SIGTERM:
+                self.process.terminate()
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def terminate(self, grace: float = 5.0):
+        """Terminate the process tree, killing it if still alive after `grace` seconds."""
+        self._kill_tree(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            logger.warning("Process not responding to termination. Killing.")
+            self._kill_tree(getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    def cancel(self):
+        """Stop the command on request; safe to call from another thread."""
+        self.cancelled = True
+        logger.info(f"Cancelling command: {self.command}")
+        self._kill_tree(signal.SIGTERM)
+        # Escalate without blocking the caller
+        timer = threading.Timer(2.0, self._kill_tree, args=(getattr(signal, "SIGKILL", signal.SIGTERM),))
+        timer.daemon = True
+        timer.start()
     
     def _read_stdout(self):
         """Thread function to continuously read stdout"""
         if self.process and self.process.stdout:
             for line in iter(self.process.stdout.readline, ''):
                 self.stdout_data += line
+                if self.on_line:
+                    try:
+                        self.on_line(line)
+                    except Exception as e:
+                        logger.error(f"Output listener failed: {e}")
     
     def _read_stderr(self):
         """Thread function to continuously read stderr"""
@@ -44,6 +161,8 @@ class CommandExecutor:
     
     def execute(self) -> Dict[str, Any]:
         """Execute the command and handle timeout gracefully"""
+        if self.scope and self.scope.cancelled:
+            return self._cancelled_result()
         logger.info(f"Executing command: {self.command}")
         
         try:
@@ -53,8 +172,12 @@ class CommandExecutor:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
-                bufsize=1  # Line buffered
+                bufsize=1,  # Line buffered
+                # Own process group, so the whole tree can be signalled
+                start_new_session=hasattr(os, "killpg")
             )
+            if self.scope and not self.scope.attach(self):
+                self.cancel()
             
             # Start threads to read output continuously
             self.stdout_thread = threading.Thread(target=self._read_stdout)
@@ -67,27 +190,25 @@ class CommandExecutor:
             # Wait for the process to complete or timeout
             try:
                 self.return_code = self.process.wait(timeout=self.timeout)
-                # Process completed, join the threads
-                self.stdout_thread.join()
-                self.stderr_thread.join()
+                # Process completed, join the threads (a cancelled tree may
+                # leave a stray descendant holding the pipes open)
+                join_timeout = 1.0 if self.cancelled else None
+                self.stdout_thread.join(timeout=join_timeout)
+                self.stderr_thread.join(timeout=join_timeout)
             except subprocess.TimeoutExpired:
                 # Process timed out but we might have partial results
                 self.timed_out = True
                 logger.warning(f"Command timed out after {self.timeout} seconds. Terminating process.")
                 
-                # Try to terminate gracefully first
-                self.process.terminate()
-                try:
-                    self.process.wait(timeout=5)  # Give it 5 seconds to terminate
-                except subprocess.TimeoutExpired:
-                    # Force kill if it doesn't terminate
-                    logger.warning("Process not responding to termination. Killing.")
-                    self.process.kill()
+                # Try to terminate gracefully first, then kill
+                self.terminate(grace=5)
                 
                 self.stdout_thread.join(timeout=1.0)
                 self.stderr_thread.join(timeout=1.0)
                 self.return_code = -1
 
+            if self.cancelled:
+                return self._cancelled_result()
             return {
                 "command": self.command,
                 "stdout": self.stdout_data,
@@ -105,3 +226,16 @@ class CommandExecutor:
                 "return_code": -1,
                 "timed_out": False
             }
+        finally:
+            if self.scope:
+                self.scope.detach(self)
+
+    def _cancelled_result(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "stdout": self.stdout_data,
+            "stderr": self.stderr_data or "Cancelled",
+            "return_code": -1,
+            "timed_out": False,
+            "cancelled": True
+        }
@@ -1,7 +1,7 @@
 import os
 import yaml
 from pydantic import BaseModel, Field, ValidationError
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
 class ToolConfig(BaseModel):
     path: str
@@ -18,11 +18,185 @@ class DatabaseConfig(BaseModel):
     password: str = "root"
     database: str = "job_result_db"
 
+class SchedulerConfig(BaseModel):
+    # Slots shared by every job the scheduler owns
+    max_concurrent_tasks: int = Field(default=16, ge=1)
+    # Per-tool slots; tools not listed are only bound by max_concurrent_tasks
+    tool_limits: Dict[str, int] = Field(default_factory=lambda: {
+        "nmap": 4,
+        "nuclei": 8,
+        "gobuster": 4,
+        "sqlmap": 2,
+        "hydra": 2,
+        "metasploit": 1,
+    })
+    # Politeness per target host/IP, across all jobs
+    max_tasks_per_target: int = Field(default=3, ge=1)
+    # Combined estimated requests/second allowed against one target
+    max_requests_per_target: int = Field(default=100, ge=1)
+    # Run identical in-flight tasks (same tool and params) only once
+    coalesce_inflight: bool = True
+    # Schedule web follow-ups as Nmap reports open ports, not when it exits
+    stream_follow_ups: bool = True
+    # Seconds between checks for cancel/pause requests made by other processes
+    control_poll_interval: float = Field(default=2.0, gt=0)
+    # Start a job's ready tasks longest critical path first, estimated from
+    # past run durations, instead of in the order they became ready
+    critical_path_ordering: bool = True
+
+class ExecutorConfig(BaseModel):
+    # Thread pool size per tool resource class (network, web, exploit, bruteforce)
+    pool_sizes: Dict[str, int] = Field(default_factory=lambda: {
+        "network": 4,
+        "web": 12,
+        "exploit": 3,
+        "bruteforce": 2,
+    })
+    default_pool_size: int = Field(default=4, ge=1)
+    # Workers for result parsing; a process pool when `process_pool` is set
+    parse_workers: int = Field(default=2, ge=1)
+    process_pool: bool = False
+
+class WorkerConfig(BaseModel):
+    # Serve the worker API and send tasks to registered workers
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 8765
+    heartbeat_interval: float = Field(default=5.0, gt=0)
+    # Workers silent for this long are dropped and their tasks reassigned
+    heartbeat_timeout: float = Field(default=15.0, gt=0)
+    poll_interval: float = Field(default=1.0, gt=0)
+    # Shared secret workers send as "Authorization: Bearer <token>"; the
+    # worker API refuses to start without one
+    token: Optional[str] = None
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    # Seconds a result stays valid, per tool; 0 disables caching for a tool
+    ttl: Dict[str, int] = Field(default_factory=lambda: {
+        "nmap": 3600,
+        "nuclei": 3600,
+        "gobuster": 3600,
+        "sqlmap": 0,
+        "hydra": 0,
+        "metasploit": 0,
+    })
+    default_ttl: int = Field(default=0, ge=0)
+    # In-memory LRU size
+    max_entries: int = Field(default=1000, ge=1)
+    # SQLite file backing the cache; memory only when unset
+    path: Optional[str] = None
+    # Seconds between deletes of expired rows from the SQLite file; reads
+    # skip expired rows meanwhile
+    purge_interval: int = Field(default=300, ge=1)
+
+class ShardingConfig(BaseModel):
+    # Split large scopes into parallel nmap tasks
+    enabled: bool = True
+    hosts_per_shard: int = Field(default=64, ge=1)
+    max_ports_per_shard: int = Field(default=8192, ge=1)
+    # Refuse target specs expanding to more hosts than this
+    max_hosts: int = Field(default=65536, ge=1)
+
+class RetryPolicy(BaseModel):
+    # Runs per task including the first; 1 disables retries
+    max_attempts: int = Field(default=1, ge=1)
+    # Delay before the first retry, multiplied by `multiplier` for each further one
+    backoff: float = Field(default=5.0, ge=0)
+    multiplier: float = Field(default=2.0, ge=1)
+    max_backoff: float = Field(default=120.0, ge=0)
+
+class RetryConfig(BaseModel):
+    # Per-tool policies; brute force and exploits are not retried by default
+    policies: Dict[str, RetryPolicy] = Field(default_factory=lambda: {
+        "nmap": RetryPolicy(max_attempts=3),
+        "nuclei": RetryPolicy(max_attempts=3),
+        "gobuster": RetryPolicy(max_attempts=3),
+        "sqlmap": RetryPolicy(max_attempts=2),
+    })
+    default: RetryPolicy = Field(default_factory=RetryPolicy)
+
+class TimeoutConfig(BaseModel):
+    # Derive tool timeouts from past run durations instead of the fixed defaults
+    adaptive: bool = True
+    # Timeout = percentile of recorded durations x factor, within the bounds below
+    percentile: float = Field(default=0.95, gt=0, le=1)
+    factor: float = Field(default=3.0, ge=1)
+    min_timeout: float = Field(default=30.0, gt=0)
+    max_timeout: float = Field(default=3600.0, gt=0)
+    # Runs needed before the fixed default is replaced
+    min_samples: int = Field(default=5, ge=1)
+    # Durations kept per tool and parameter shape
+    history_size: int = Field(default=200, ge=1)
+    # Parameter shapes remembered, least recently used dropped first
+    max_shapes: int = Field(default=500, ge=1)
+
+class RecoveryConfig(BaseModel):
+    # Resume unfinished jobs of crashed or restarted schedulers on startup
+    enabled: bool = True
+    # A job's owner is presumed dead after this long without renewing its lease
+    stale_after: float = Field(default=60.0, gt=0)
+    # Tasks left running by a dead owner: "rerun", "fail", or "auto"
+    # (rerun tools whose results are cacheable, fail the ones with side effects)
+    orphaned_tasks: Literal["rerun", "fail", "auto"] = "auto"
+
+class BatchingConfig(BaseModel):
+    # Scan compatible targets of list-capable tools (nuclei) in one process
+    enabled: bool = True
+    # Seconds a batch waits for more targets before it starts
+    window: float = Field(default=0.5, ge=0)
+    # Targets per process; each batched task still holds its own tool slot
+    max_targets: int = Field(default=16, ge=1)
+    # A batch may run for its slowest target's timeout plus this much per
+    # further target, up to max_timeout seconds
+    per_target_timeout: float = Field(default=60.0, ge=0)
+    max_timeout: float = Field(default=3600.0, gt=0)
+
+class AdmissionConfig(BaseModel):
+    # Jobs beyond max_running_jobs wait in a queue of at most max_queued_jobs;
+    # further submissions are rejected until it drains
+    enabled: bool = True
+    max_running_jobs: int = Field(default=8, ge=1)
+    max_queued_jobs: int = Field(default=32, ge=0)
+    # Retry-after hint for rejected submissions, until job durations are known
+    retry_after: float = Field(default=60.0, gt=0)
+
+class PersistenceConfig(BaseModel):
+    # Coalesce job saves in memory and write them in batches; jobs that
+    # reach a final state are always written immediately
+    write_behind: bool = True
+    # Seconds between batched writes of changed jobs
+    flush_interval: float = Field(default=0.5, gt=0)
+    # Changed jobs that trigger a write before the interval is up
+    max_batch: int = Field(default=200, ge=1)
+    # Run database calls on a dedicated thread, so a slow MySQL never
+    # stalls the event loop
+    async_io: bool = True
+
+class JobCacheConfig(BaseModel):
+    # Evict finished jobs from memory; they are reloaded from the DB on demand
+    enabled: bool = True
+    max_jobs: int = Field(default=200, ge=1)
+    # Seconds a finished job may sit unused in memory
+    max_idle: float = Field(default=3600.0, gt=0)
+
 class MCPConfig(BaseModel):
     log_level: str = "INFO"
     tools: Dict[str, ToolConfig] = Field(default_factory=dict)
     server: ServerConfig = Field(default_factory=ServerConfig)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    scheduler: SchedulerConfig = Field(default_factory=SchedulerConfig)
+    executors: ExecutorConfig = Field(default_factory=ExecutorConfig)
+    workers: WorkerConfig = Field(default_factory=WorkerConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    sharding: ShardingConfig = Field(default_factory=ShardingConfig)
+    retries: RetryConfig = Field(default_factory=RetryConfig)
+    timeouts: TimeoutConfig = Field(default_factory=TimeoutConfig)
+    recovery: RecoveryConfig = Field(default_factory=RecoveryConfig)
+    job_cache: JobCacheConfig = Field(default_factory=JobCacheConfig)
+    batching: BatchingConfig = Field(default_factory=BatchingConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    persistence: PersistenceConfig = Field(default_factory=PersistenceConfig)
 
 def load_config(config_path: str = "config.yaml") -> MCPConfig:
     """Load configuration from a YAML file."""
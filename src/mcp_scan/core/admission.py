@@ -0,0 +1,123 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import math
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from mcp_scan.config import AdmissionConfig
+from mcp_scan.core.errors import AdmissionRejectedError
+from mcp_scan.core.models import Job
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Admission:
+    """Outcome of submitting a job: running now (position 0) or queued."""
+    job_id: UUID
+    position: int
+    # Completes when the job has run; set by the scheduler
+    runner: Optional[asyncio.Task] = None
+
+class AdmissionController:
+    """Caps how many jobs run at once and how many may wait for a turn.
+
+    Up to `max_running_jobs` jobs run; later ones queue, highest priority
+    first and then oldest, until `max_queued_jobs` are waiting. Beyond that
+    submissions are rejected with a retry-after hint, estimated from how
+    often running jobs have been finishing.
+    """
+
+    def __init__(self, config: AdmissionConfig):
+        self.config = config
+        self.running: Dict[UUID, float] = {}  # job id -> monotonic start
+        # (-priority, sequence, job id, turn), kept sorted
+        self._queue: List[Tuple[int, int, UUID, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._durations: Deque[float] = deque(maxlen=50)
+        self.rejected = 0
+
+    def check(self, count: int = 1):
+        """Raise AdmissionRejectedError unless `count` new jobs can run or queue."""
+        if not self.config.enabled or count <= self.capacity():
+            return
+        self.rejected += count
+        if count == 1:
+            message = f"Scanner busy: {len(self.running)} jobs running, {len(self._queue)} queued"
+        else:
+            message = f"Room for {self.capacity()} more jobs, {count} submitted"
+        raise AdmissionRejectedError(message, self.retry_after())
+
+    def capacity(self) -> int:
+        """Jobs that could be admitted right now, to run or to queue."""
+        free_running = max(self.config.max_running_jobs - len(self.running), 0)
+        return free_running + max(self.config.max_queued_jobs - len(self._queue), 0)
+
+    def submit(self, job: Job, force: bool = False) -> Tuple[int, asyncio.Future]:
+        """Admit a job; returns its queue position (0: runs now) and a future
+        resolved when it may start. `force` queues it even past the bound."""
+        if not force:
+            self.check()
+        turn = asyncio.get_running_loop().create_future()
+        if not self.config.enabled or len(self.running) < self.config.max_running_jobs:
+            self.running[job.id] = time.monotonic()
+            turn.set_result(None)
+            return 0, turn
+        entry = (-job.priority, next(self._sequence), job.id, turn)
+        bisect.insort(self._queue, entry, key=lambda e: e[:2])
+        position = self._queue.index(entry) + 1
+        logger.info(f"Job {job.id} queued at position {position}")
+        return position, turn
+
+    def position(self, job_id: UUID) -> Optional[int]:
+        """1-based queue position of a waiting job, else None."""
+        for index, entry in enumerate(self._queue):
+            if entry[2] == job_id:
+                return index + 1
+        return None
+
+    def queued(self) -> List[UUID]:
+        """Ids of the waiting jobs, in queue order."""
+        return [entry[2] for entry in self._queue]
+
+    def withdraw(self, job_id: UUID) -> bool:
+        """Drop a queued job; its turn is cancelled. False if not queued."""
+        for index, entry in enumerate(self._queue):
+            if entry[2] == job_id:
+                del self._queue[index]
+                entry[3].cancel()
+                return True
+        return False
+
+    def finished(self, job_id: UUID):
+        """A running job ended: hand its place to the next queued job."""
+        started = self.running.pop(job_id, None)
+        if started is not None:
+            self._durations.append(time.monotonic() - started)
+        while self._queue and len(self.running) < self.config.max_running_jobs:
+            _, _, next_id, turn = self._queue.pop(0)
+            if turn.done():
+                continue
+            self.running[next_id] = time.monotonic()
+            turn.set_result(None)
+
+    def retry_after(self) -> float:
+        """Seconds until a queue slot is likely free again."""
+        if not self._durations:
+            return self.config.retry_after
+        # Running jobs finish about once every median / max_running seconds
+        return float(max(math.ceil(statistics.median(self._durations) / self.config.max_running_jobs), 1))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self.running),
+            "queued": len(self._queue),
+            "max_running_jobs": self.config.max_running_jobs,
+            "max_queued_jobs": self.config.max_queued_jobs,
+            "rejected": self.rejected,
+        }
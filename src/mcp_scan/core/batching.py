@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from mcp_scan.command_executor import CancelScope
+from mcp_scan.config import BatchingConfig
+from mcp_scan.core.cache import cache_key
+from mcp_scan.tools.registry import ToolSpec
+
+logger = logging.getLogger(__name__)
+
+# launch(tool_name, shared_params, targets, scope, timeout) -> {target: result}
+BatchLauncher = Callable[[str, Dict[str, Any], List[str], CancelScope, Optional[float]],
+                         Awaitable[Dict[str, Dict[str, Any]]]]
+
+class _Batch:
+    def __init__(self, tool_name: str, shared: Dict[str, Any]):
+        self.tool_name = tool_name
+        self.shared = shared
+        # Task id -> (target, future, timeout)
+        self.members: Dict[UUID, Tuple[str, asyncio.Future, Optional[float]]] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.scope = CancelScope()
+
+    def live(self) -> Dict[UUID, Tuple[str, asyncio.Future, Optional[float]]]:
+        return {task_id: m for task_id, m in self.members.items() if not m[1].done()}
+
+class TaskBatcher:
+    """Groups tasks of a list-capable tool into one process per batch.
+
+    Tasks whose params differ only in "target" join the same open batch,
+    which starts after `window` seconds, once `max_targets` joined, or as
+    soon as `can_grow(tool_name)` says no further task could start. Each
+    task gets back the part of the output for its own target. A task
+    cancelled while waiting leaves the batch; the process is killed only
+    when every task of the batch is gone.
+    """
+
+    def __init__(self, config: BatchingConfig, launch: BatchLauncher,
+                 can_grow: Optional[Callable[[str], bool]] = None):
+        self.config = config
+        self.launch = launch
+        self.can_grow = can_grow or (lambda tool_name: True)
+        self._open: Dict[str, _Batch] = {}
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+
+    def accepts(self, spec: Optional[ToolSpec], params: Dict[str, Any]) -> bool:
+        return bool(self.config.enabled and self.config.max_targets > 1 and spec
+                    and spec.batch_runner and params.get("target"))
+
+    async def submit(self, task_id: UUID, tool_name: str, params: Dict[str, Any],
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        shared = {k: v for k, v in params.items() if k != "target"}
+        key = cache_key(tool_name, shared)
+        loop = asyncio.get_running_loop()
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch(tool_name, shared)
+            batch.timer = loop.call_later(self.config.window, self._flush, key)
+        future = loop.create_future()
+        batch.members[task_id] = (params["target"], future, timeout)
+        if len(batch.members) >= self.config.max_targets or not self.can_grow(tool_name):
+            self._flush(key)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            future.cancel()
+            if key not in self._open and not batch.live():
+                batch.scope.cancel()  # Nobody is left waiting for the process
+            raise
+
+    def _flush(self, key: str):
+        batch = self._open.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+        if not batch.live():
+            return
+        self.batches += 1
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _Batch):
+        members = batch.live()
+        targets = list(dict.fromkeys(target for target, _, _ in members.values()))
+        timeouts = [timeout for _, _, timeout in members.values() if timeout]
+        # One process scans the targets concurrently: allow the slowest
+        # target's time plus a little for each further one, not their sum
+        timeout = None
+        if timeouts:
+            timeout = min(max(timeouts) + self.config.per_target_timeout * (len(targets) - 1),
+                          self.config.max_timeout)
+        if len(targets) > 1:
+            logger.info(f"Batching {batch.tool_name} over {len(targets)} targets")
+        try:
+            results = await self.launch(batch.tool_name, batch.shared, targets, batch.scope, timeout)
+        except Exception as e:
+            logger.error(f"Batched {batch.tool_name} run failed: {e}")
+            results = {}
+            error = str(e)
+        else:
+            error = "No result for target"
+        for target, future, _ in members.values():
+            if not future.done():
+                future.set_result(results.get(target) or {"success": False, "error": error})
+
+    def stats(self) -> Dict[str, int]:
+        return {"open": len(self._open), "running": len(self._running), "launched": self.batches}
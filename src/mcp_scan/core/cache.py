@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from mcp_scan.config import CacheConfig
+from mcp_scan.core.limits import task_target
+from mcp_scan.tools.registry import find_tool
+
+logger = logging.getLogger(__name__)
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+def cache_key(tool_name: str, params: Dict[str, Any]) -> str:
+    """Stable hash of a tool invocation: tool, normalized params and target host."""
+    payload = {
+        "tool": tool_name,
+        "params": _normalize(params),
+        "target": task_target(params),
+    }
+    data = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Tool result cache with per-tool TTL, LRU eviction and optional disk store.
+
+    Entries live in a size-bounded in-memory LRU. When `path` is configured
+    they are also written to a SQLite file, so results survive restarts and
+    are shared by every scheduler process on the host. With `io` (the
+    scheduler's AsyncDatabase), the file is read and written on its thread
+    instead of the event loop; expired rows are skipped on read and
+    deleted every `purge_interval` seconds.
+    """
+
+    def __init__(self, config: CacheConfig, io=None):
+        self.config = config
+        self.io = io
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._purged = 0.0
+        self.hits = 0
+        self.misses = 0
+        if config.enabled and config.path:
+            self._open_store(config.path)
+
+    def ttl(self, tool_name: str) -> int:
+        return self.config.ttl.get(tool_name, self.config.default_ttl)
+
+    def cacheable(self, tool_name: str) -> bool:
+        spec = find_tool(tool_name)
+        return self.config.enabled and (spec is None or spec.cacheable) and self.ttl(tool_name) > 0
+
+    def get(self, tool_name: str, params: Dict[str, Any], disk: bool = True) -> Optional[Dict[str, Any]]:
+        """Return a copy of a fresh cached result, or None.
+
+        Without `disk` only memory is looked at, and a miss is not counted
+        while the disk store may still have the result (see `load`).
+        """
+        if not self.cacheable(tool_name):
+            return None
+        key = cache_key(tool_name, params)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None and disk and self._conn:
+                entry = self._load(key, now)
+                if entry:
+                    self._remember(key, entry)
+            if entry is None:
+                if disk or not self._conn:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(entry[1], cached=True)
+
+    async def load(self, tool_name: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look a result missing from memory up in the disk store, off the loop."""
+        if not self._conn or not self.cacheable(tool_name):
+            return None
+        key = cache_key(tool_name, params)
+        entry = await self._io(self._load, key, time.time())
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+        return dict(entry[1], cached=True)
+
+    def put(self, tool_name: str, params: Dict[str, Any], result: Dict[str, Any]):
+        """Store a successful result for the tool's TTL."""
+        if not self.cacheable(tool_name) or not result.get("success") or result.get("timed_out"):
+            return
+        key = cache_key(tool_name, params)
+        expires_at = time.time() + self.ttl(tool_name)
+        with self._lock:
+            self._remember(key, (expires_at, result))
+        if not self._conn:
+            return
+        if self.io:
+            # Queued behind the database writes; nobody waits for it
+            self.io.call(self._store, key, tool_name, expires_at, result)
+        else:
+            self._store(key, tool_name, expires_at, result)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._store_lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, entry: Tuple[float, Dict[str, Any]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _io(self, fn, *args) -> Any:
+        result = self.io.call(fn, *args) if self.io else fn(*args)
+        if isinstance(result, asyncio.Future):
+            return await result
+        return result
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._store_lock:
+            if not self._conn:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT expires_at, result FROM results WHERE key = ? AND expires_at > ?",
+                    (key, now)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to read cache entry: {e}")
+                return None
+        if not row:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _store(self, key: str, tool_name: str, expires_at: float, result: Dict[str, Any]):
+        with self._store_lock:
+            if not self._conn:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, tool, expires_at, result) VALUES (?, ?, ?, ?)",
+                    (key, tool_name, expires_at, json.dumps(result, default=str)))
+                now = time.time()
+                if now - self._purged >= self.config.purge_interval:
+                    self._purge(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist cache entry: {e}")
+
+    def _purge(self, now: float):
+        # A range scan of idx_results_expires, not of the whole table
+        self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._purged = now
+
+    def _open_store(self, path: str):
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, tool TEXT NOT NULL, expires_at REAL NOT NULL, result TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_expires ON results (expires_at)")
+            self._purge(time.time())
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open result cache at {path}: {e}")
+            self._conn = None
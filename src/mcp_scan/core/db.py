@@ -1,20 +1,66 @@
 import json
 import logging
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set
 from uuid import UUID
 import mysql.connector
 from mysql.connector import pooling
 
 from mcp_scan.config import get_config
 from mcp_scan.core.models import Job
+from mcp_scan.core import schema
 
 logger = logging.getLogger(__name__)
 
+# Rows per executemany round trip in bulk saves
+SAVE_BATCH_SIZE = 500
+
+# Jobs whose last written rows are remembered, so saves only write changes
+WRITTEN_STATE_JOBS = 1024
+
+_UPSERT_JOB = f"""
+    INSERT INTO job_results (job_id, status, result_data, target, schema_version, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, {schema.SCHEMA_VERSION}, NOW(), NOW())
+    ON DUPLICATE KEY UPDATE
+        status = VALUES(status),
+        result_data = VALUES(result_data),
+        schema_version = VALUES(schema_version),
+        updated_at = NOW()
+"""
+
+def _job_row(job: Job) -> tuple:
+    # Tasks, outputs and assets live in their own tables; result_data only
+    # keeps the job header
+    return (str(job.id), job.status.value, schema.job_header(job), job.target)
+
+class _WrittenState:
+    """Fingerprints of the rows last written for a job."""
+
+    def __init__(self):
+        self.tasks: Dict[UUID, int] = {}
+        self.outputs: Dict[UUID, int] = {}
+        self.assets: Set[tuple] = set()
+
+class PreparedSave:
+    """Rows a save sends, built by `DatabaseManager.prepare_save`.
+
+    Holds plain values only, so it can be written from another thread
+    while the jobs it came from keep changing.
+    """
+
+    def __init__(self, rows: Dict[str, List[tuple]], states: Dict[UUID, _WrittenState]):
+        self.rows = rows
+        self.states = states
+
 class DatabaseManager:
     _instance = None
 
     def __init__(self):
         config = get_config().database
+        self._written: "OrderedDict[UUID, _WrittenState]" = OrderedDict()
+        # Saves run on the AsyncDatabase thread, reads may come from others
+        self._written_lock = threading.Lock()
         try:
             self.pool = mysql.connector.pooling.MySQLConnectionPool(
                 pool_name="mcp_scan_pool",
@@ -38,7 +84,8 @@ class DatabaseManager:
         return cls._instance
 
     def _ensure_schema(self):
-        """Ensure the status column exists (simple migration check)."""
+        """Ensure the status, target, control, lease and schema_version columns
+        and the normalized job tables exist (simple migration check)."""
         if not self.pool:
             return
         
@@ -53,14 +100,54 @@ class DatabaseManager:
                 logger.info("Adding 'status' column to job_results table")
                 cursor.execute("ALTER TABLE job_results ADD COLUMN status VARCHAR(20) DEFAULT 'pending' AFTER job_id")
                 conn.commit()
+            # Target column, so the latest job for a target can be found by index
+            cursor.execute("SHOW COLUMNS FROM job_results LIKE 'target'")
+            result = cursor.fetchone()
+            if not result:
+                logger.info("Adding 'target' column to job_results table")
+                cursor.execute("ALTER TABLE job_results ADD COLUMN target VARCHAR(255) NULL AFTER status")
+                cursor.execute("UPDATE job_results SET target = JSON_UNQUOTE(JSON_EXTRACT(result_data, '$.target'))")
+                cursor.execute("CREATE INDEX idx_target_status ON job_results(target, status, updated_at)")
+                conn.commit()
+            # Pending cancel/pause request for the process running the job
+            cursor.execute("SHOW COLUMNS FROM job_results LIKE 'control'")
+            result = cursor.fetchone()
+            if not result:
+                logger.info("Adding 'control' column to job_results table")
+                cursor.execute("ALTER TABLE job_results ADD COLUMN control VARCHAR(64) NULL AFTER target")
+                conn.commit()
+            # Lease of the scheduler process running the job, for crash recovery
+            cursor.execute("SHOW COLUMNS FROM job_results LIKE 'owner'")
+            result = cursor.fetchone()
+            if not result:
+                logger.info("Adding 'owner' and 'heartbeat_at' columns to job_results table")
+                cursor.execute("ALTER TABLE job_results ADD COLUMN owner VARCHAR(128) NULL AFTER control")
+                cursor.execute("ALTER TABLE job_results ADD COLUMN heartbeat_at DATETIME NULL AFTER owner")
+                cursor.execute("CREATE INDEX idx_status_heartbeat ON job_results(status, heartbeat_at)")
+                conn.commit()
+            # Normalized tables; rows without a schema_version are legacy JSON blobs
+            cursor.execute("SHOW COLUMNS FROM job_results LIKE 'schema_version'")
+            result = cursor.fetchone()
+            if not result:
+                logger.info("Adding 'schema_version' column and normalized job tables")
+                cursor.execute("ALTER TABLE job_results ADD COLUMN schema_version TINYINT NULL AFTER heartbeat_at")
+                conn.commit()
+            for ddl in schema.TABLES:
+                cursor.execute(ddl)
         except mysql.connector.Error as e:
             logger.warning(f"Schema check failed: {e}")
         finally:
             if conn:
                 conn.close()
 
-    def save_job(self, job: Job):
-        """Upsert a job record."""
+    def save_job(self, job: Job, prepared: Optional[PreparedSave] = None):
+        """Upsert a job record.
+
+        Only rows that changed since the job was last written or read are
+        sent: a task transition is one job_tasks row plus the job row.
+        `prepared` holds rows built earlier by `prepare_save`; the job is
+        then not read again.
+        """
         if not self.pool:
             return
 
@@ -70,19 +157,10 @@ class DatabaseManager:
             cursor = conn.cursor()
             
             job_id = str(job.id)
-            status = job.status.value
-            result_data = job.model_dump_json()
-
-            query = """
-                INSERT INTO job_results (job_id, status, result_data, created_at, updated_at)
-                VALUES (%s, %s, %s, NOW(), NOW())
-                ON DUPLICATE KEY UPDATE
-                    status = VALUES(status),
-                    result_data = VALUES(result_data),
-                    updated_at = NOW()
-            """
-            cursor.execute(query, (job_id, status, result_data))
+            prepared = prepared or self.prepare_save([job])
+            self._execute(cursor, prepared)
             conn.commit()
+            self._remember(prepared.states)
             logger.debug(f"Job {job_id} saved to DB")
         except mysql.connector.Error as e:
             logger.error(f"Failed to save job {job.id}: {e}")
@@ -90,6 +168,173 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def save_jobs(self, jobs: List[Job], prepared: Optional[PreparedSave] = None) -> bool:
+        """Upsert many job records in one transaction; all or none are saved."""
+        if not self.pool or not jobs:
+            return True
+
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor()
+            prepared = prepared or self.prepare_save(jobs)
+            self._execute(cursor, prepared)
+            conn.commit()
+            self._remember(prepared.states)
+            logger.debug(f"Saved {len(jobs)} jobs to DB")
+            return True
+        except mysql.connector.Error as e:
+            logger.error(f"Failed to save {len(jobs)} jobs: {e}")
+            if conn:
+                conn.rollback()
+            return False
+        finally:
+            if conn:
+                conn.close()
+
+    def prepare_save(self, jobs: List[Job]) -> PreparedSave:
+        """The rows of `jobs` that changed since they were last written,
+        and their new written state, remembered once the save commits."""
+        rows: Dict[str, List[tuple]] = {query: [] for query in (
+            schema.UPSERT_TASK, schema.UPSERT_OUTPUT, schema.UPSERT_HOST,
+            schema.UPSERT_SERVICE, schema.UPSERT_VULNERABILITY)}
+        states = {}
+        for job in jobs:
+            with self._written_lock:
+                previous = self._written.get(job.id) or _WrittenState()
+            state = states[job.id] = _WrittenState()
+            for position, task in enumerate(job.tasks):
+                row = schema.task_row(job, position, task)
+                state.tasks[task.id] = hash(row)
+                if previous.tasks.get(task.id) != state.tasks[task.id]:
+                    rows[schema.UPSERT_TASK].append(row)
+                output = schema.output_row(job, task)
+                if output:
+                    state.outputs[task.id] = hash(output)
+                    if previous.outputs.get(task.id) != state.outputs[task.id]:
+                        rows[schema.UPSERT_OUTPUT].append(output)
+            for query, asset_rows in zip((schema.UPSERT_HOST, schema.UPSERT_SERVICE, schema.UPSERT_VULNERABILITY),
+                                         schema.asset_rows(job)):
+                for row in asset_rows:
+                    state.assets.add(row)
+                    if row not in previous.assets:
+                        rows[query].append(row)
+        # The job rows last, once everything they summarize is in place
+        rows[_UPSERT_JOB] = [_job_row(job) for job in jobs]
+        return PreparedSave(rows, states)
+
+    def _execute(self, cursor, prepared: PreparedSave):
+        for query, batch in prepared.rows.items():
+            if len(batch) == 1:
+                cursor.execute(query, batch[0])
+                continue
+            for start in range(0, len(batch), SAVE_BATCH_SIZE):
+                cursor.executemany(query, batch[start:start + SAVE_BATCH_SIZE])
+
+    def _remember(self, states: Dict[UUID, _WrittenState]):
+        with self._written_lock:
+            for job_id, state in states.items():
+                self._written[job_id] = state
+                self._written.move_to_end(job_id)
+            while len(self._written) > WRITTEN_STATE_JOBS:
+                self._written.popitem(last=False)
+
+    def _load_jobs(self, cursor, rows: List[Dict[str, Any]], full: bool = True) -> List[Job]:
+        """Jobs of job_results rows (job_id, status, result_data, schema_version).
+
+        Legacy rows are parsed from their JSON blob. Normalized ones are
+        assembled from their tables; without `full`, only the summary is
+        loaded: tasks without stdout/stderr, and no assets.
+        """
+        jobs: Dict[str, Optional[Job]] = {}
+        normalized = []
+        for row in rows:
+            job_id = row.get("job_id")
+            try:
+                if row.get("schema_version"):
+                    normalized.append(row)
+                    jobs[job_id] = None
+                elif row.get("result_data"):
+                    jobs[job_id or len(jobs)] = Job(**json.loads(row["result_data"]))
+            except Exception as e:
+                logger.error(f"Failed to deserialize job {job_id}: {e}")
+        if normalized:
+            ids = [row["job_id"] for row in normalized]
+            children = {"tasks": "SELECT * FROM job_tasks WHERE job_id IN ({})"}
+            if full:
+                children.update(
+                    outputs="SELECT task_id, job_id, stdout, stderr FROM task_outputs WHERE job_id IN ({})",
+                    hosts="SELECT * FROM job_hosts WHERE job_id IN ({})",
+                    services="SELECT * FROM job_services WHERE job_id IN ({})",
+                    vulnerabilities="SELECT * FROM job_vulnerabilities WHERE job_id IN ({})")
+            grouped: Dict[str, Dict[str, List[Dict[str, Any]]]] = {name: {} for name in children}
+            placeholders = ", ".join(["%s"] * len(ids))
+            for name, query in children.items():
+                cursor.execute(query.format(placeholders), tuple(ids))
+                for child in cursor.fetchall():
+                    grouped[name].setdefault(child["job_id"], []).append(child)
+            for row in normalized:
+                job_id = row["job_id"]
+                try:
+                    outputs = {o["task_id"]: o for o in grouped.get("outputs", {}).get(job_id, [])}
+                    job = schema.assemble_job(
+                        json.loads(row["result_data"]), row["status"], grouped["tasks"].get(job_id, []),
+                        outputs if full else None,
+                        grouped.get("hosts", {}).get(job_id, []), grouped.get("services", {}).get(job_id, []),
+                        grouped.get("vulnerabilities", {}).get(job_id, []))
+                except Exception as e:
+                    logger.error(f"Failed to deserialize job {job_id}: {e}")
+                    continue
+                jobs[job_id] = job
+                if full:
+                    # What is stored now is what this job looks like
+                    self._remember(self.prepare_save([job]).states)
+        return [job for job in jobs.values() if job is not None]
+
+    def migrate_legacy_jobs(self, batch_size: int = 100) -> int:
+        """Convert jobs stored as one JSON blob to the normalized tables.
+
+        Runs in batches, one transaction each; returns how many jobs were
+        converted. Blobs that cannot be parsed are marked (schema_version
+        0) and left as they are.
+        """
+        if not self.pool:
+            return 0
+
+        migrated = 0
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            while True:
+                cursor.execute(
+                    "SELECT job_id, status, result_data, schema_version FROM job_results "
+                    "WHERE schema_version IS NULL LIMIT %s", (batch_size,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                jobs = self._load_jobs(cursor, rows)
+                converted = {str(job.id) for job in jobs}
+                broken = [row["job_id"] for row in rows if row["job_id"] not in converted]
+                prepared = self.prepare_save(jobs)
+                self._execute(cursor, prepared)
+                if broken:
+                    cursor.executemany("UPDATE job_results SET schema_version = 0 WHERE job_id = %s",
+                                       [(job_id,) for job_id in broken])
+                conn.commit()
+                self._remember(prepared.states)
+                migrated += len(jobs)
+                logger.info(f"Migrated {migrated} jobs to the normalized schema")
+            return migrated
+        except mysql.connector.Error as e:
+            logger.error(f"Migration stopped after {migrated} jobs: {e}")
+            if conn:
+                conn.rollback()
+            return migrated
+        finally:
+            if conn:
+                conn.close()
+
     def update_status(self, job_id: UUID, status: str):
         """Update job status only."""
         if not self.pool:
@@ -109,8 +354,113 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
-    def get_job(self, job_id: UUID) -> Optional[Job]:
-        """Fetch a job from DB."""
+    def request_control(self, job_id: UUID, action: str):
+        """Leave a control request (e.g. `cancel`) for the process running a job."""
+        if not self.pool:
+            return
+
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("UPDATE job_results SET control = %s WHERE job_id = %s", (action, str(job_id)))
+            conn.commit()
+        except mysql.connector.Error as e:
+            logger.error(f"Failed to request {action} for job {job_id}: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+    def poll_jobs(self, job_ids: List[UUID], owner: str) -> Dict[str, str]:
+        """Renew `owner`'s leases of `job_ids` and take their pending control
+        requests, all in one transaction; returns {job_id: request}."""
+        if not self.pool or not job_ids:
+            return {}
+
+        ids = [str(job_id) for job_id in job_ids]
+        placeholders = ", ".join(["%s"] * len(ids))
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"UPDATE job_results SET heartbeat_at = NOW() WHERE owner = %s AND job_id IN ({placeholders})",
+                           (owner, *ids))
+            cursor.execute(f"SELECT job_id, control FROM job_results WHERE job_id IN ({placeholders}) "
+                           "AND control IS NOT NULL FOR UPDATE", tuple(ids))
+            requests = {row[0]: row[1] for row in cursor.fetchall()}
+            if requests:
+                taken = ", ".join(["%s"] * len(requests))
+                cursor.execute(f"UPDATE job_results SET control = NULL WHERE job_id IN ({taken})", tuple(requests))
+            conn.commit()
+            return requests
+        except mysql.connector.Error as e:
+            logger.error(f"Failed to poll {len(ids)} jobs: {e}")
+            return {}
+        finally:
+            if conn:
+                conn.close()
+
+    def claim_job(self, job_id: UUID, owner: str, stale_after: Optional[float] = None) -> bool:
+        """Take the lease of a job for `owner`.
+
+        With `stale_after`, only succeeds if the job has no owner, is
+        already `owner`'s, or its owner has not renewed the lease for that
+        many seconds.
+        """
+        if not self.pool:
+            return True
+
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor()
+            query = "UPDATE job_results SET owner = %s, heartbeat_at = NOW() WHERE job_id = %s"
+            params = [owner, str(job_id)]
+            if stale_after is not None:
+                query += (" AND (owner IS NULL OR owner = %s OR heartbeat_at IS NULL"
+                          " OR heartbeat_at < NOW() - INTERVAL %s SECOND)")
+                params += [owner, int(stale_after)]
+            cursor.execute(query, tuple(params))
+            conn.commit()
+            return cursor.rowcount == 1
+        except mysql.connector.Error as e:
+            logger.error(f"Failed to claim job {job_id}: {e}")
+            return False
+        finally:
+            if conn:
+                conn.close()
+
+    def get_unfinished_jobs(self, stale_after: float) -> List[Job]:
+        """Jobs left pending, running or paused whose owner stopped renewing its lease.
+
+        Jobs that never had an owner are left alone: they were just created
+        and their scheduler has yet to submit them.
+        """
+        if not self.pool:
+            return []
+
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            query = """
+                SELECT job_id, status, result_data, schema_version FROM job_results
+                WHERE status IN ('pending', 'running', 'paused')
+                  AND owner IS NOT NULL
+                  AND (heartbeat_at IS NULL OR heartbeat_at < NOW() - INTERVAL %s SECOND)
+                ORDER BY created_at
+            """
+            cursor.execute(query, (int(stale_after),))
+            return self._load_jobs(cursor, cursor.fetchall())
+        except mysql.connector.Error as e:
+            logger.error(f"Failed to list unfinished jobs: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
+
+    def get_job(self, job_id: UUID, full: bool = True) -> Optional[Job]:
+        """Fetch a job from DB; without `full`, its summary (no tool output or assets)."""
         if not self.pool:
             return None
 
@@ -119,13 +469,13 @@ class DatabaseManager:
             conn = self.pool.get_connection()
             cursor = conn.cursor(dictionary=True)
             
-            query = "SELECT result_data FROM job_results WHERE job_id = %s"
+            query = "SELECT job_id, status, result_data, schema_version FROM job_results WHERE job_id = %s"
             cursor.execute(query, (str(job_id),))
             row = cursor.fetchone()
             
-            if row and row['result_data']:
-                data = json.loads(row['result_data'])
-                return Job(**data)
+            if row:
+                jobs = self._load_jobs(cursor, [row], full)
+                return jobs[0] if jobs else None
             return None
         except mysql.connector.Error as e:
             logger.error(f"Failed to fetch job {job_id}: {e}")
@@ -137,5 +487,37 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def get_latest_job(self, target: str, status: str = "completed") -> Optional[Job]:
+        """Fetch the most recently created job for a target with the given status."""
+        if not self.pool:
+            return None
+
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            query = """
+                SELECT job_id, status, result_data, schema_version FROM job_results
+                WHERE target = %s AND status = %s
+                ORDER BY created_at DESC LIMIT 1
+            """
+            cursor.execute(query, (target, status))
+            row = cursor.fetchone()
+
+            if row:
+                jobs = self._load_jobs(cursor, [row])
+                return jobs[0] if jobs else None
+            return None
+        except mysql.connector.Error as e:
+            logger.error(f"Failed to fetch latest job for {target}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to deserialize latest job for {target}: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+
 def get_db():
     return DatabaseManager.get_instance()
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from mcp_scan.config import PersistenceConfig
+from mcp_scan.core.models import Job
+
+logger = logging.getLogger(__name__)
+
+class AsyncDatabase:
+    """Runs `DatabaseManager` calls on a dedicated thread, off the event loop.
+
+    Calls go through one thread and its queue, so they apply in the order
+    they were made: a status update never overtakes the save creating the
+    row, nor an older save of the same job a newer one. A slow MySQL then
+    only delays persistence, not the scheduler, the CLI display or the MCP
+    server.
+
+    `submit` queues a call and returns a future of its result; `run` awaits
+    it. Outside an event loop, without a connection pool or with `async_io`
+    off, calls run inline and `submit` returns the result itself.
+    """
+
+    def __init__(self, config: PersistenceConfig, db):
+        self.config = config
+        self.db = db
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[asyncio.Future] = set()
+        self.calls = 0
+        self.failures = 0
+        self.busy = 0.0
+
+    @property
+    def pool(self):
+        return self.db.pool
+
+    def _loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        if not self.config.async_io:
+            return None
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    def _offload(self) -> Optional[asyncio.AbstractEventLoop]:
+        # Without a database every call returns at once
+        if self.db.pool is None:
+            return None
+        return self._loop()
+
+    def _run(self, fn: Callable, *args) -> Any:
+        began = time.monotonic()
+        self.calls += 1
+        try:
+            return fn(*args)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.busy += time.monotonic() - began
+
+    def _queue(self, loop: asyncio.AbstractEventLoop, fn: Callable, *args) -> asyncio.Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-db")
+        future = loop.run_in_executor(self._executor, self._run, fn, *args)
+        self._pending.add(future)
+        future.add_done_callback(self._settled)
+        return future
+
+    def submit(self, method: str, *args) -> Any:
+        """Queue `db.<method>(*args)`; returns a future of its result."""
+        loop = self._offload()
+        if loop is None:
+            return self._run(getattr(self.db, method), *args)
+        return self._queue(loop, getattr(self.db, method), *args)
+
+    def call(self, fn: Callable, *args) -> Any:
+        """Queue `fn(*args)` on the same thread, for other stores that must
+        not block the loop either, such as the result cache's SQLite file.
+
+        Unlike `submit`, it does not need a MySQL pool to be offloaded.
+        """
+        loop = self._loop()
+        if loop is None:
+            return self._run(fn, *args)
+        return self._queue(loop, fn, *args)
+
+    def _settled(self, future: asyncio.Future):
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Database call failed: {future.exception()}")
+
+    async def run(self, method: str, *args) -> Any:
+        """`db.<method>(*args)`, awaited without blocking the event loop."""
+        result = self.submit(method, *args)
+        if isinstance(result, asyncio.Future):
+            return await asyncio.shield(result)
+        return result
+
+    # The loop keeps changing a job while its write waits in the queue: the
+    # changed rows are built when it is saved, the thread only sends them
+
+    def save_job(self, job: Job) -> Any:
+        if self._offload() is None:
+            return self.submit("save_job", job)
+        return self.submit("save_job", job, self.db.prepare_save([job]))
+
+    def save_jobs(self, jobs: List[Job]) -> Any:
+        if self._offload() is None:
+            return self.submit("save_jobs", jobs)
+        return self.submit("save_jobs", jobs, self.db.prepare_save(jobs))
+
+    async def drain(self):
+        """Wait until every call queued so far is done."""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": len(self._pending), "calls": self.calls, "failures": self.failures,
+                "busy_seconds": round(self.busy, 3)}
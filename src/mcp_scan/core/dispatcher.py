@@ -0,0 +1,140 @@
+import bisect
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from mcp_scan.core.models import Job, Task
+from mcp_scan.core.limits import ConcurrencyLimiter, TargetLimiter, task_target, estimate_request_rate
+
+logger = logging.getLogger(__name__)
+
+# Seconds assumed for a task whose tool has no run history yet
+DEFAULT_TASK_DURATION = 60.0
+
+class _QueuedJob:
+    def __init__(self, job: Job):
+        self.job = job
+        # (task, enqueued_at, critical path), longest path first, then FIFO
+        self.tasks: List[Tuple[Task, float, float]] = []
+        self.running = 0
+
+    @property
+    def weight(self) -> int:
+        return max(self.job.priority, 1)
+
+    def share(self) -> float:
+        """Normalized usage if one more task of this job were started."""
+        return (self.running + 1) / self.weight
+
+class Dispatcher:
+    """Central ready queue shared by all jobs of a Scheduler.
+
+    Every ready task of every job is queued here and started only when the
+    dispatcher picks it. Jobs are served by weighted fair share: the job with
+    the lowest running-tasks-to-priority ratio goes first, ties going to the
+    higher priority and then to the older job. A task is only started when
+    both its tool and its target have capacity; blocked tasks are skipped so
+    tasks for other tools and targets can still run.
+
+    With an `estimate` of task durations, a job's own ready tasks are
+    started longest critical path first (HEFT-style list scheduling): the
+    estimated duration of the task plus its longest chain of dependents.
+    Without one they start in the order they became ready.
+    """
+
+    def __init__(self, limits: ConcurrencyLimiter, targets: TargetLimiter,
+                 estimate: Optional[Callable[[Task], Optional[float]]] = None):
+        self.limits = limits
+        self.targets = targets
+        self.estimate = estimate
+        self._jobs: Dict[UUID, _QueuedJob] = {}
+        # task id -> (job id, tool, host, cost) for tasks holding slots
+        self._leases: Dict[UUID, Tuple[UUID, str, Optional[str], int]] = {}
+
+    def submit(self, job: Job, task: Task):
+        """Queue a ready task."""
+        entry = self._jobs.get(job.id)
+        if not entry:
+            entry = self._jobs[job.id] = _QueuedJob(job)
+        rank = entry.job.critical_path(task.id, self._duration) if self.estimate else 0.0
+        bisect.insort(entry.tasks, (task, time.monotonic(), rank), key=lambda queued: -queued[2])
+        task.dispatch_note = "queued"
+
+    def _duration(self, task: Task) -> float:
+        estimate = self.estimate(task)
+        return DEFAULT_TASK_DURATION if estimate is None else estimate
+
+    def withdraw(self, task: Task) -> bool:
+        """Remove a task that is still queued; returns False if it is not."""
+        for job_id, entry in list(self._jobs.items()):
+            for index, (queued, _, _) in enumerate(entry.tasks):
+                if queued.id == task.id:
+                    del entry.tasks[index]
+                    if not entry.running and not entry.tasks:
+                        del self._jobs[job_id]
+                    return True
+        return False
+
+    def queued_count(self) -> int:
+        return sum(len(entry.tasks) for entry in self._jobs.values())
+
+    def dispatch(self) -> List[Tuple[Job, Task]]:
+        """Pick every queued task that can start now and take its slots."""
+        started = []
+        # (tool, host, cost) combinations found blocked during this pass
+        blocked: Set[Tuple[str, Optional[str], int]] = set()
+        while True:
+            picked = self._pick(blocked)
+            if not picked:
+                break
+            started.append(picked)
+        return started
+
+    def release(self, task: Task):
+        """Return the slots held by a finished task."""
+        lease = self._leases.pop(task.id, None)
+        if not lease:
+            return
+        job_id, tool_name, host, cost = lease
+        entry = self._jobs.get(job_id)
+        if entry:
+            entry.running -= 1
+            if not entry.running and not entry.tasks:
+                del self._jobs[job_id]
+        self.limits.release(tool_name)
+        self.targets.release(host, cost)
+
+    def _pick(self, blocked: Set[Tuple[str, Optional[str], int]]) -> Optional[Tuple[Job, Task]]:
+        candidates = [entry for entry in self._jobs.values() if entry.tasks]
+        candidates.sort(key=lambda e: (e.share(), -e.job.priority, e.job.created_at))
+        for entry in candidates:
+            for index, (task, enqueued_at, rank) in enumerate(entry.tasks):
+                host = task_target(task.params)
+                cost = estimate_request_rate(task.tool_name, task.params)
+                key = (task.tool_name, host, cost)
+                if key in blocked:
+                    continue
+                if not self.limits.has_capacity(task.tool_name):
+                    task.dispatch_note = f"queued: {task.tool_name} slots full"
+                    blocked.add(key)
+                    continue
+                if not self.targets.try_acquire(host, cost):
+                    task.dispatch_note = f"queued: target {host} saturated"
+                    blocked.add(key)
+                    continue
+                self.limits.try_acquire(task.tool_name)
+                del entry.tasks[index]
+
+                share = entry.share()
+                entry.running += 1
+                self._leases[task.id] = (entry.job.id, task.tool_name, host, cost)
+                task.dispatch_note = (
+                    f"dispatched: priority {entry.job.priority}, share {share:.2f}, "
+                    f"waited {time.monotonic() - enqueued_at:.1f}s"
+                )
+                if self.estimate:
+                    task.dispatch_note += f", critical path {rank:.0f}s"
+                logger.debug(f"Dispatching {task.tool_name} ({task.id}) of job {entry.job.id}: {task.dispatch_note}")
+                return entry.job, task
+        return None
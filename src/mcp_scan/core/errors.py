@@ -17,6 +17,15 @@ class SchedulerError(MCPScanError):
     def __init__(self, message: str):
         super().__init__(message, "E3001")
 
+class AdmissionRejectedError(MCPScanError):
+    def __init__(self, message: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"{message}; retry after {retry_after:.0f}s", "E3002")
+
+class InvalidPlanError(MCPScanError):
+    def __init__(self, message: str):
+        super().__init__(f"Invalid plan: {message}", "E3003")
+
 class ExecutionError(MCPScanError):
     def __init__(self, message: str):
         super().__init__(message, "E4001")
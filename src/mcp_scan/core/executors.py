@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from mcp_scan.config import ExecutorConfig
+from mcp_scan.tools.registry import find_tool
+
+logger = logging.getLogger(__name__)
+
+# Pool of tools whose spec does not name a resource class
+DEFAULT_RESOURCE_CLASS = "default"
+
+class PoolMetrics:
+    """Thread-safe occupancy counters for one executor pool."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+
+    def submitted(self):
+        with self._lock:
+            self.queued += 1
+
+    def started(self):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def finished(self):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "completed": self.completed,
+                "peak_active": self.peak_active,
+                "saturated": self.active >= self.max_workers,
+            }
+
+class ExecutionBackend:
+    """Dedicated, bounded executors for tool runs and result parsing.
+
+    Each tool resource class gets its own named thread pool, so long hydra or
+    sqlmap runs cannot occupy the loop's default executor. CPU-heavy parsing
+    goes to a process pool when one is configured, otherwise to a small
+    thread pool of its own.
+    """
+
+    def __init__(self, config: ExecutorConfig):
+        self.config = config
+        self._pools: Dict[str, Executor] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+        self._lock = threading.Lock()
+
+    def resource_class(self, tool_name: str) -> str:
+        """Tools of one resource class share a bounded thread pool."""
+        spec = find_tool(tool_name)
+        return spec.resource_class if spec else DEFAULT_RESOURCE_CLASS
+
+    async def run(self, tool_name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking tool call in the pool of the tool's resource class."""
+        pool_name = self.resource_class(tool_name)
+        size = self.config.pool_sizes.get(pool_name, self.config.default_pool_size)
+        return await self._submit(pool_name, size, fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable[..., Any], *args) -> Any:
+        """Run CPU-bound work such as output parsing. `fn` must be picklable."""
+        return await self._submit("parse", self.config.parse_workers, fn, *args)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Occupancy of every pool created so far."""
+        return {name: metrics.snapshot() for name, metrics in self._metrics.items()}
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait)
+
+    async def _submit(self, pool_name: str, size: int, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        pool, metrics = self._get_pool(pool_name, size)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        metrics.submitted()
+        if isinstance(pool, ProcessPoolExecutor):
+            # Occupancy is tracked from the loop side for process pools
+            metrics.started()
+            try:
+                return await loop.run_in_executor(pool, call)
+            finally:
+                metrics.finished()
+        return await loop.run_in_executor(pool, _tracked, metrics, call)
+
+    def _get_pool(self, pool_name: str, size: int):
+        with self._lock:
+            pool = self._pools.get(pool_name)
+            if pool is None:
+                if pool_name == "parse" and self.config.process_pool:
+                    pool = ProcessPoolExecutor(max_workers=size)
+                else:
+                    pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"mcp_scan-{pool_name}")
+                self._pools[pool_name] = pool
+                self._metrics[pool_name] = PoolMetrics(size)
+                logger.info(f"Created {type(pool).__name__} '{pool_name}' with {size} workers")
+            return pool, self._metrics[pool_name]
+
+def _tracked(metrics: PoolMetrics, call: Callable[[], Any]) -> Any:
+    metrics.started()
+    try:
+        return call()
+    finally:
+        metrics.finished()
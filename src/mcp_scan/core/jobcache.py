@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from uuid import UUID
+
+from mcp_scan.config import JobCacheConfig
+from mcp_scan.core.models import Job, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+class JobCache(MutableMapping):
+    """Jobs held in memory, bounded in count and idle time.
+
+    Behaves like the plain dict it replaces. Finished jobs that are not
+    being run are evicted least recently used first, once there are more
+    than `max_jobs` or they were not touched for `max_idle` seconds. A
+    finished job is already in the database (JobWriter writes final states
+    at once), so eviction only drops it; `Scheduler.get_job` reloads it on
+    demand. Without a database nothing is evicted.
+    """
+
+    def __init__(self, config: JobCacheConfig, db, is_active: Callable[[UUID], bool]):
+        self.config = config
+        self.db = db
+        self.is_active = is_active
+        self._jobs: "OrderedDict[UUID, Job]" = OrderedDict()
+        self._touched: Dict[UUID, float] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def __getitem__(self, job_id: UUID) -> Job:
+        with self._lock:
+            job = self._jobs[job_id]
+            self._jobs.move_to_end(job_id)
+            self._touched[job_id] = time.monotonic()
+            return job
+
+    def __setitem__(self, job_id: UUID, job: Job):
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._touched[job_id] = time.monotonic()
+        self.prune()
+
+    def __delitem__(self, job_id: UUID):
+        with self._lock:
+            del self._jobs[job_id]
+            self._touched.pop(job_id, None)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._jobs
+
+    def __iter__(self) -> Iterator[UUID]:
+        with self._lock:
+            return iter(list(self._jobs))
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    # Iterating must not count as use, nor reorder the LRU under the caller
+    def values(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def items(self) -> List[Tuple[UUID, Job]]:
+        with self._lock:
+            return list(self._jobs.items())
+
+    def evictable(self) -> bool:
+        return bool(self.config.enabled and getattr(self.db, "pool", None) is not None)
+
+    def prune(self) -> int:
+        """Evict finished, idle jobs beyond the bounds; returns how many."""
+        if not self.evictable():
+            return 0
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            excess = len(self._jobs) - self.config.max_jobs
+            # Least recently used first
+            for job_id, job in list(self._jobs.items()):
+                idle = now - self._touched.get(job_id, now)
+                if excess <= 0 and idle < self.config.max_idle:
+                    continue
+                if job.status not in FINISHED_STATUSES or self.is_active(job_id):
+                    continue
+                del self._jobs[job_id]
+                self._touched.pop(job_id, None)
+                evicted.append(job)
+                excess -= 1
+            self.evictions += len(evicted)
+        for job in evicted:
+            logger.debug(f"Evicted job {job.id} from memory")
+        return len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = sum(1 for job in self._jobs.values() if job.status in FINISHED_STATUSES)
+            return {"cached": len(self._jobs), "finished": finished, "evictions": self.evictions}
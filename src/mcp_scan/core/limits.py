@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from mcp_scan.config import SchedulerConfig
+from mcp_scan.tools.registry import find_tool
+
+logger = logging.getLogger(__name__)
+
+# Request rate assumed for tools not in the registry
+DEFAULT_REQUEST_RATE = 10
+
+def task_target(params: Dict[str, Any]) -> Optional[str]:
+    """Extract the host a task will hit from its params (IP, hostname or URL)."""
+    value = params.get("target") or params.get("url")
+    if not value:
+        options = params.get("options") or {}
+        value = options.get("RHOSTS")
+    if not value:
+        return None
+    value = str(value).strip()
+    if "://" in value:
+        return urlparse(value).hostname or value
+    host = value.split("/", 1)[0]
+    # Strip a trailing :port, but leave bare IPv6 addresses alone
+    if host.count(":") == 1:
+        host = host.split(":", 1)[0]
+    return host.lower()
+
+def estimate_request_rate(tool_name: str, params: Dict[str, Any]) -> int:
+    if tool_name == "gobuster" and params.get("threads"):
+        return int(params["threads"])
+    # Approximate requests/second the tool drives, declared in its ToolSpec
+    spec = find_tool(tool_name)
+    return spec.request_rate if spec else DEFAULT_REQUEST_RATE
+
+class _SlotWaiters:
+    """FIFO wait queue for limiters whose slots are released synchronously."""
+
+    def __init__(self):
+        self._waiters: List[asyncio.Future] = []
+        self._release_listeners: List[Callable[[], None]] = []
+
+    def add_release_listener(self, listener: Callable[[], None]):
+        """Call `listener` whenever a slot is released."""
+        self._release_listeners.append(listener)
+
+    async def _wait_for(self, try_acquire: Callable[[], bool]):
+        while not try_acquire():
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def _wake_waiters(self):
+        # Wake queued tasks in FIFO order; each re-checks its own limits
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        for listener in self._release_listeners:
+            listener()
+
+class ConcurrencyLimiter(_SlotWaiters):
+    """Global and per-tool execution slots shared by all jobs of a Scheduler."""
+
+    def __init__(self, max_total: int, tool_limits: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.max_total = max_total
+        self.tool_limits = dict(tool_limits or {})
+        self.total_in_use = 0
+        self.tool_in_use: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: SchedulerConfig) -> "ConcurrencyLimiter":
+        return cls(config.max_concurrent_tasks, config.tool_limits)
+
+    def has_capacity(self, tool_name: str) -> bool:
+        if self.total_in_use >= self.max_total:
+            return False
+        limit = self.tool_limits.get(tool_name)
+        return limit is None or self.tool_in_use.get(tool_name, 0) < limit
+
+    def try_acquire(self, tool_name: str) -> bool:
+        """Take a slot for `tool_name` if one is free, without waiting."""
+        if not self.has_capacity(tool_name):
+            return False
+        self.total_in_use += 1
+        self.tool_in_use[tool_name] = self.tool_in_use.get(tool_name, 0) + 1
+        return True
+
+    async def acquire(self, tool_name: str):
+        """Wait until a slot for `tool_name` is free and take it."""
+        await self._wait_for(lambda: self.try_acquire(tool_name))
+
+    def release(self, tool_name: str):
+        self.total_in_use -= 1
+        self.tool_in_use[tool_name] -= 1
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self, tool_name: str):
+        await self.acquire(tool_name)
+        try:
+            yield
+        finally:
+            self.release(tool_name)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Slots currently in use, per tool plus the global total."""
+        usage = {tool: count for tool, count in self.tool_in_use.items() if count}
+        usage["total"] = self.total_in_use
+        return usage
+
+class TargetLimiter(_SlotWaiters):
+    """Per-target politeness: caps in-flight tasks and request rate per host.
+
+    A task is admitted for a host only while the host has fewer than
+    `max_tasks` tasks in flight and the estimated request rate of those tasks
+    plus the new one stays within `max_requests`. A host with nothing in flight
+    always admits one task, however expensive, so big tasks cannot starve.
+    """
+
+    def __init__(self, max_tasks: int, max_requests: int):
+        super().__init__()
+        self.max_tasks = max_tasks
+        self.max_requests = max_requests
+        self.in_flight: Dict[str, int] = {}
+        self.request_load: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: SchedulerConfig) -> "TargetLimiter":
+        return cls(config.max_tasks_per_target, config.max_requests_per_target)
+
+    def has_capacity(self, host: Optional[str], cost: int) -> bool:
+        if host is None:
+            return True
+        in_flight = self.in_flight.get(host, 0)
+        if in_flight == 0:
+            return True
+        if in_flight >= self.max_tasks:
+            return False
+        return self.request_load.get(host, 0) + cost <= self.max_requests
+
+    def try_acquire(self, host: Optional[str], cost: int) -> bool:
+        if not self.has_capacity(host, cost):
+            return False
+        if host is not None:
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.request_load[host] = self.request_load.get(host, 0) + cost
+        return True
+
+    async def acquire(self, host: Optional[str], cost: int):
+        """Wait until `host` has room for a task with request rate `cost`."""
+        await self._wait_for(lambda: self.try_acquire(host, cost))
+
+    def release(self, host: Optional[str], cost: int):
+        if host is None:
+            return
+        self.in_flight[host] -= 1
+        self.request_load[host] -= cost
+        if not self.in_flight[host]:
+            del self.in_flight[host]
+            del self.request_load[host]
+        self._wake_waiters()
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """In-flight tasks and request load per target."""
+        return {
+            host: {"tasks": count, "requests": self.request_load[host]}
+            for host, count in self.in_flight.items()
+        }
@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any
 from uuid import UUID, uuid4
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 
 class TaskStatus(str, Enum):
@@ -9,6 +9,9 @@ class TaskStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    # Held back on request; resumes as pending
+    PAUSED = "paused"
 
 class Severity(str, Enum):
     INFO = "info"
@@ -40,11 +43,21 @@ class Host(BaseModel):
 class Task(BaseModel):
     id: UUID = Field(default_factory=uuid4)
     tool_name: str
+    # Id the task was given in a submitted plan, if any
+    name: Optional[str] = None
     params: Dict[str, Any] = Field(default_factory=dict)
     status: TaskStatus = TaskStatus.PENDING
     result: Optional[Dict[str, Any]] = None
     dependencies: List[UUID] = Field(default_factory=list)
+    # Always run the tool, even if a fresh cached result exists
+    bypass_cache: bool = False
     error: Optional[str] = None
+    # Latest scheduling decision for this task, shown in status output
+    dispatch_note: Optional[str] = None
+    # Runs so far, retries included
+    attempts: int = 0
+    # Set when the result was reused from an earlier job instead of rescanning
+    carried_forward_from: Optional[UUID] = None
     created_at: datetime = Field(default_factory=datetime.now)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
@@ -53,6 +66,117 @@ class Job(BaseModel):
     id: UUID = Field(default_factory=uuid4)
     target: str
     status: TaskStatus = TaskStatus.PENDING
+    # 1 (lowest) to 10 (most urgent); also the job's weight in fair-share dispatch
+    priority: int = Field(default=5, ge=1, le=10)
+    # Earlier completed job an incremental rescan diffs against
+    baseline_job_id: Optional[UUID] = None
     tasks: List[Task] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.now)
     assets: List[Host] = Field(default_factory=list)
+
+    # Dependency index (not persisted, rebuilt from `tasks` on load)
+    _index: Dict[UUID, Task] = PrivateAttr(default_factory=dict)
+    _remaining: Dict[UUID, int] = PrivateAttr(default_factory=dict)
+    _children: Dict[UUID, List[UUID]] = PrivateAttr(default_factory=dict)
+    _ready: Dict[UUID, None] = PrivateAttr(default_factory=dict)  # ordered set
+
+    def model_post_init(self, __context: Any) -> None:
+        for task in self.tasks:
+            self._register(task)
+
+    def add_task(self, task: Task) -> Task:
+        """Append a task to the job and index its dependencies."""
+        self.tasks.append(task)
+        self._register(task)
+        return task
+
+    def get_task(self, task_id: UUID) -> Optional[Task]:
+        self._sync_index()
+        return self._index.get(task_id)
+
+    def pop_ready(self) -> List[Task]:
+        """Return and clear the pending tasks whose dependencies are all completed."""
+        self._sync_index()
+        ready = [self._index[task_id] for task_id in self._ready
+                 if self._index[task_id].status == TaskStatus.PENDING]
+        self._ready.clear()
+        return ready
+
+    def task_completed(self, task: Task) -> List[Task]:
+        """Release the dependents of a completed task, in O(out-degree).
+
+        Returns the tasks that became ready as a result.
+        """
+        released = []
+        for child_id in self._children.get(task.id, ()):
+            self._remaining[child_id] -= 1
+            child = self._index.get(child_id)
+            if self._remaining[child_id] == 0 and child and child.status == TaskStatus.PENDING:
+                self._ready[child_id] = None
+                released.append(child)
+        return released
+
+    def requeue(self, task: Task):
+        """Put a task back to pending, ready again if its dependencies are met."""
+        self._sync_index()
+        task.status = TaskStatus.PENDING
+        task.started_at = None
+        if self._remaining.get(task.id, 0) == 0:
+            self._ready[task.id] = None
+
+    def dependents(self, task_id: UUID) -> List[Task]:
+        """Every task that directly or transitively depends on `task_id`."""
+        self._sync_index()
+        found: Dict[UUID, Task] = {}
+        stack = list(self._children.get(task_id, ()))
+        while stack:
+            child_id = stack.pop()
+            if child_id in found or child_id not in self._index:
+                continue
+            found[child_id] = self._index[child_id]
+            stack.extend(self._children.get(child_id, ()))
+        return list(found.values())
+
+    def critical_path(self, task_id: UUID, cost: Callable[[Task], float]) -> float:
+        """Estimated length of the longest chain from `task_id` to the end of
+        the DAG, the task itself included (its HEFT upward rank)."""
+        self._sync_index()
+        ranks: Dict[UUID, float] = {}
+        visiting = set()
+        stack = [(task_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in ranks or current not in self._index:
+                continue
+            children = [c for c in self._children.get(current, ()) if c in self._index]
+            if not expanded:
+                if current in visiting:
+                    continue  # Cycle: count the task once
+                visiting.add(current)
+                stack.append((current, True))
+                stack.extend((c, False) for c in children if c not in ranks)
+                continue
+            ranks[current] = cost(self._index[current]) + max((ranks.get(c, 0.0) for c in children), default=0.0)
+        return ranks.get(task_id, 0.0)
+
+    def _sync_index(self):
+        # Tasks appended to `tasks` directly are indexed lazily
+        if len(self._index) != len(self.tasks):
+            for task in self.tasks:
+                if task.id not in self._index:
+                    self._register(task)
+
+    def _register(self, task: Task):
+        self._index[task.id] = task
+        remaining = 0
+        for dep_id in set(task.dependencies):
+            self._children.setdefault(dep_id, []).append(task.id)
+            dep = self._index.get(dep_id)
+            if not dep or dep.status != TaskStatus.COMPLETED:
+                remaining += 1
+        self._remaining[task.id] = remaining
+        if remaining == 0 and task.status == TaskStatus.PENDING:
+            self._ready[task.id] = None
+        if task.status == TaskStatus.COMPLETED:
+            # Dependents indexed before this task was
+            self.task_completed(task)
@@ -0,0 +1,133 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from mcp_scan.core.errors import InvalidPlanError
+from mcp_scan.core.models import Job, Task
+from mcp_scan.tools.registry import find_tool, tool_names
+
+logger = logging.getLogger(__name__)
+
+def build_plan_job(target: str, plan: Any, priority: int = 5) -> Job:
+    """Turn a submitted task plan into a job, validating it first.
+
+    `plan` is a list of steps. A task step is
+        {"id": "web", "tool_name": "nuclei", "params": {...},
+         "depends_on": ["scan"], "bypass_cache": false}
+    and a group step fans out and back in:
+        {"id": "web", "parallel": [step, ...], "depends_on": ["scan"]}
+    Its steps run side by side once the group's dependencies are met, and
+    depending on the group waits for all of them. Ids are optional; steps
+    without `depends_on` start immediately. A plan in which no step uses
+    `depends_on` or `parallel` keeps the original meaning: each step runs
+    after the previous one.
+
+    Params default their "target" to the job target. Raises
+    InvalidPlanError for unknown tools, duplicate or unknown ids, and
+    dependency cycles; nothing is created then.
+    """
+    if not isinstance(plan, list) or not plan:
+        raise InvalidPlanError("expected a non-empty list of steps")
+
+    steps: Dict[str, Dict[str, Any]] = {}  # id -> step, tasks only
+    groups: Dict[str, List[str]] = {}  # group id -> ids of its tasks
+    edges: Dict[str, List[str]] = {}  # id -> ids it depends on (tasks or groups)
+    sequential = not any(_is_graph_step(step) for step in plan)
+
+    def add(step: Any, path: str, inherited: List[str]) -> List[str]:
+        """Register a step; returns the ids of the tasks it expands to."""
+        if not isinstance(step, dict):
+            raise InvalidPlanError(f"step {path} must be an object")
+        step_id = str(step.get("id") or path)
+        if step_id in edges:
+            raise InvalidPlanError(f"duplicate step id {step_id!r}")
+        depends_on = step.get("depends_on", [])
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        if not isinstance(depends_on, list):
+            raise InvalidPlanError(f"depends_on of {step_id!r} must be a list of ids")
+        edges[step_id] = [str(d) for d in depends_on] + inherited
+
+        if "parallel" in step:
+            members = step["parallel"]
+            if not isinstance(members, list) or not members:
+                raise InvalidPlanError(f"group {step_id!r} needs a non-empty 'parallel' list")
+            # Members inherit the group's dependencies; the group itself
+            # completes when every member has
+            task_ids: List[str] = []
+            for index, member in enumerate(members, 1):
+                task_ids.extend(add(member, f"{step_id}.{index}", [step_id + "^"]))
+            edges[step_id + "^"] = edges[step_id]
+            edges[step_id] = list(task_ids)
+            groups[step_id] = task_ids
+            return task_ids
+
+        tool_name = step.get("tool_name")
+        if not tool_name or find_tool(tool_name) is None:
+            raise InvalidPlanError(
+                f"unknown tool {tool_name!r} in step {step_id!r} (available: {', '.join(tool_names())})")
+        if not isinstance(step.get("params", {}), dict):
+            raise InvalidPlanError(f"params of {step_id!r} must be an object")
+        steps[step_id] = step
+        return [step_id]
+
+    previous: Optional[str] = None
+    for index, step in enumerate(plan, 1):
+        inherited = [previous] if sequential and previous else []
+        expanded = add(step, f"task-{index}", inherited)
+        previous = expanded[-1]
+
+    for step_id, deps in edges.items():
+        for dep in deps:
+            if dep not in edges:
+                raise InvalidPlanError(f"{step_id!r} depends on unknown step {dep!r}")
+    _check_acyclic(edges)
+
+    job = Job(target=target, priority=priority)
+    tasks: Dict[str, Task] = {}
+    for step_id, step in steps.items():
+        params = dict(step.get("params") or {})
+        params["target"] = params.get("target", target)  # Auto-inject target if missing
+        tasks[step_id] = Task(tool_name=step["tool_name"], name=step_id, params=params,
+                              bypass_cache=bool(step.get("bypass_cache", False)))
+    for step_id, task in tasks.items():
+        task.dependencies = [tasks[t].id for t in _task_dependencies(step_id, edges, steps)]
+        job.add_task(task)
+    logger.info(f"Plan for {target}: {len(tasks)} tasks in {len(groups)} groups")
+    return job
+
+def _is_graph_step(step: Any) -> bool:
+    return isinstance(step, dict) and ("depends_on" in step or "parallel" in step)
+
+def _task_dependencies(step_id: str, edges: Dict[str, List[str]], steps: Dict[str, Any]) -> List[str]:
+    """Tasks a task waits for, with groups expanded to their members."""
+    found: Dict[str, None] = {}
+    stack = list(edges[step_id])
+    seen = set()
+    while stack:
+        dep = stack.pop()
+        if dep in seen:
+            continue
+        seen.add(dep)
+        if dep in steps:
+            found[dep] = None
+        else:
+            stack.extend(edges[dep])
+    return list(found)
+
+def _check_acyclic(edges: Dict[str, List[str]]):
+    """Kahn's algorithm over steps and groups; names the steps on a cycle."""
+    remaining = {node: len(deps) for node, deps in edges.items()}
+    dependents: Dict[str, List[str]] = {}
+    for node, deps in edges.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(node)
+    ready = [node for node, count in remaining.items() if count == 0]
+    while ready:
+        node = ready.pop()
+        for dependent in dependents.get(node, ()):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    cyclic = sorted(node.rstrip("^") for node, count in remaining.items() if count)
+    if cyclic:
+        raise InvalidPlanError(f"dependency cycle between {', '.join(dict.fromkeys(cyclic))}")
@@ -0,0 +1,96 @@
+import ipaddress
+import logging
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from mcp_scan.core.models import Host, Job, Service
+
+logger = logging.getLogger(__name__)
+
+# Follow-up tools whose results are tied to one service and can be carried forward
+FOLLOW_UP_TOOLS = ("nuclei", "gobuster", "sqlmap")
+WEB_PORTS = {80, 443, 8000, 8080, 8443}
+HTTPS_PORTS = {443, 8443}
+# Always probed by the change-detection pass, to notice newly opened services
+COMMON_PORTS = {21, 22, 23, 25, 53, 80, 110, 143, 443, 445, 3306, 3389, 5432, 8080, 8443}
+
+ServiceKey = Tuple[str, int]  # (host, port)
+
+def is_web_service(service: Service) -> bool:
+    return "http" in service.service_name or service.port in WEB_PORTS
+
+def service_url(host: str, service: Service) -> str:
+    """Base URL of a web service, omitting default ports."""
+    https = service.port in HTTPS_PORTS or "ssl" in service.service_name or "https" in service.service_name
+    scheme = "https" if https else "http"
+    if service.port == (443 if https else 80):
+        return f"{scheme}://{host}"
+    return f"{scheme}://{host}:{service.port}"
+
+def target_hostnames(target: str) -> List[str]:
+    """Hostnames the operator scoped in a target spec; IPs, networks and ranges left out."""
+    names = []
+    for part in re.split(r"[,\s]+", target.strip()):
+        name = urlparse(part).hostname if "://" in part else part
+        if not name or "/" in name or re.fullmatch(r"[\d.]+-[\d.]+", name):
+            continue
+        try:
+            ipaddress.ip_address(name)
+        except ValueError:
+            names.append(name.lower())
+    return names
+
+def scoped_name(host: Host, target: str) -> str:
+    """Name follow-up tools reach a host by.
+
+    nmap's hostname may be the reverse-DNS (PTR) name, which the operator
+    never authorized and which may not even resolve back to the host: only
+    a hostname the job targeted is used, else the IP.
+    """
+    names = target_hostnames(target)
+    if host.hostname and host.hostname.lower() in names:
+        return host.hostname
+    if len(names) == 1 and len(re.split(r"[,\s]+", target.strip())) == 1:
+        return names[0]  # The one host of a single-hostname target
+    return host.ip
+
+def url_service_key(url: str) -> Optional[ServiceKey]:
+    """(host, port) a follow-up URL points at."""
+    parsed = urlparse(url if "://" in url else f"http://{url}")
+    if not parsed.hostname:
+        return None
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return parsed.hostname.lower(), port
+
+def service_index(hosts: List[Host], target: str = "") -> Dict[ServiceKey, Service]:
+    """Services keyed by (host, port), under the IP, the hostname and the name scoped by `target`."""
+    index: Dict[ServiceKey, Service] = {}
+    for host in hosts:
+        for name in {host.ip, host.hostname or host.ip, scoped_name(host, target)}:
+            for service in host.services:
+                index[(name.lower(), service.port)] = service
+    return index
+
+def detection_ports(baseline: Job) -> str:
+    """Ports for the cheap change-detection scan: known open ports plus common ones."""
+    ports: Set[int] = set(COMMON_PORTS)
+    for host in baseline.assets:
+        ports.update(service.port for service in host.services)
+    return ",".join(str(port) for port in sorted(ports))
+
+def changed_services(baseline: Job, hosts: List[Host]) -> Set[ServiceKey]:
+    """Services that are new or whose product or version changed since the baseline.
+
+    A full scan runs without version detection, so a baseline may not have
+    recorded product or version; only the fields it recorded are compared.
+    """
+    before = service_index(baseline.assets, baseline.target)
+    changed = set()
+    for key, service in service_index(hosts, baseline.target).items():
+        old = before.get(key)
+        if (not old or old.protocol != service.protocol
+                or (old.product is not None and old.product != service.product)
+                or (old.version is not None and old.version != service.version)):
+            changed.add(key)
+    return changed
@@ -0,0 +1,161 @@
+import logging
+import math
+import re
+import statistics
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from mcp_scan.config import RetryConfig, RetryPolicy, TimeoutConfig
+
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt: the network or the target hiccuped,
+# not the invocation itself
+_TRANSIENT_RE = re.compile(
+    r"timed? ?out|connection (refused|reset|closed)|temporar(y|ily)|unreachable|"
+    r"no route to host|broken pipe|too many (requests|open files)|resource temporarily|"
+    r"name resolution|could not resolve|bad gateway|service unavailable|gateway time-?out|"
+    # 502/503/504 only as an HTTP status, not inside ports, counts or paths
+    r"\b(http/\d(\.\d)?|status|code|error)[ :=]+50[234]\b",
+    re.IGNORECASE,
+)
+
+def is_transient(result: Dict[str, Any]) -> bool:
+    """Whether a failed tool result is worth retrying."""
+    if result.get("success") or result.get("cancelled"):
+        return False
+    if result.get("timed_out"):
+        return True
+    if "return_code" not in result:
+        # Rejected before anything ran (bad params, unknown tool)
+        return False
+    if result["return_code"] is not None and result["return_code"] < 0:
+        return True  # Killed by a signal
+    text = f"{result.get('stderr') or ''} {result.get('error') or ''}"
+    return bool(_TRANSIENT_RE.search(text))
+
+def backoff_delay(policy: RetryPolicy, attempt: int) -> float:
+    """Delay before retrying after `attempt` failed runs (1-based)."""
+    return min(policy.backoff * policy.multiplier ** (attempt - 1), policy.max_backoff)
+
+def retry_policy(config: RetryConfig, tool_name: str) -> RetryPolicy:
+    return config.policies.get(tool_name, config.default)
+
+def _target_shape(value: Any) -> str:
+    value = str(value).strip()
+    if "://" in value:
+        return "url"
+    if "/" in value:
+        return "cidr/" + value.rsplit("/", 1)[1]
+    hosts = len(value.split())
+    return "host" if hosts <= 1 else f"hosts:{hosts}"
+
+def _ports_shape(value: Any) -> str:
+    # Explicit port lists (e.g. an incremental rescan's known ports) differ
+    # from run to run: keep their size, rounded up to a power of two
+    value = str(value).replace(" ", "")
+    if not value or not all(c.isdigit() or c in ",-" for c in value):
+        return value  # Named set such as top-1000
+    count = 0
+    for part in filter(None, value.split(",")):
+        first, dash, last = part.partition("-")
+        try:
+            # nmap reads "-100" as 1-100 and "100-" as 100-65535
+            first, last = int(first or 1), int(last or 65535) if dash else int(first or 1)
+        except ValueError:
+            first = last = 0  # Malformed; nmap rejects it anyway
+        count += max(last - first + 1, 1)
+    return f"~{2 ** math.ceil(math.log2(max(count, 1)))}"
+
+def param_shape(tool_name: str, params: Dict[str, Any]) -> str:
+    """Tool invocation with the concrete target abstracted away.
+
+    Runs of the same shape (e.g. nmap top-1000 against one host) are
+    expected to take similar time whatever host they hit. Explicit port
+    lists only count by size.
+    """
+    parts = []
+    for key in sorted(params):
+        value = params[key]
+        if key in ("target", "url"):
+            value = _target_shape(value)
+        elif key == "ports":
+            value = _ports_shape(value)
+        elif isinstance(value, dict):
+            value = {k: ("*" if k.lower() == "rhosts" else v) for k, v in value.items()}
+        parts.append(f"{key}={value}")
+    return f"{tool_name}({', '.join(parts)})"
+
+class DurationHistory:
+    """Recent durations of successful runs, per tool and parameter shape.
+
+    Once a shape has `min_samples` runs, its timeout becomes the configured
+    percentile of the recorded durations times `factor`, clamped to
+    [min_timeout, max_timeout]. Until then the tool's fixed default applies.
+    At most `max_shapes` shapes are kept, least recently used evicted first.
+    """
+
+    def __init__(self, config: TimeoutConfig):
+        self.config = config
+        self._durations: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, tool_name: str, params: Dict[str, Any], duration: float):
+        shape = param_shape(tool_name, params)
+        with self._lock:
+            samples = self._durations.get(shape)
+            if samples is None:
+                samples = self._durations[shape] = deque(maxlen=self.config.history_size)
+            samples.append(duration)
+            self._durations.move_to_end(shape)
+            while len(self._durations) > self.config.max_shapes:
+                self._durations.popitem(last=False)
+
+    def percentile(self, tool_name: str, params: Dict[str, Any]) -> Optional[float]:
+        shape = param_shape(tool_name, params)
+        with self._lock:
+            samples = list(self._durations.get(shape, ()))
+            if samples:
+                self._durations.move_to_end(shape)
+        return self._percentile(samples)
+
+    def estimate(self, tool_name: str, params: Dict[str, Any]) -> Optional[float]:
+        """Median duration of the shape, else of the tool; None without history."""
+        shape = param_shape(tool_name, params)
+        with self._lock:
+            samples = list(self._durations.get(shape, ()))
+            if not samples:
+                prefix = f"{tool_name}("
+                samples = [d for s, durations in self._durations.items() if s.startswith(prefix)
+                           for d in durations]
+        return statistics.median(samples) if samples else None
+
+    def timeout_for(self, tool_name: str, params: Dict[str, Any], attempt: int = 1,
+                    default: Optional[float] = None) -> Optional[float]:
+        """Timeout for a run, from history or else `default`; None if neither.
+
+        Each retry doubles it, so a slow but healthy scan is not killed at
+        the same limit again.
+        """
+        observed = self.percentile(tool_name, params) if self.config.adaptive else None
+        if observed is not None:
+            base = max(observed * self.config.factor, self.config.min_timeout)
+        elif default is not None:
+            base = default
+        else:
+            return None
+        return min(base * 2 ** (attempt - 1), self.config.max_timeout)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Sample count and current percentile per shape."""
+        with self._lock:
+            shapes = {shape: list(samples) for shape, samples in self._durations.items()}
+        return {shape: {"samples": len(samples), "percentile": self._percentile(samples)}
+                for shape, samples in shapes.items()}
+
+    def _percentile(self, samples) -> Optional[float]:
+        if len(samples) < self.config.min_samples:
+            return None
+        samples = sorted(samples)
+        return samples[max(math.ceil(self.config.percentile * len(samples)) - 1, 0)]
@@ -1,202 +1,912 @@
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from uuid import UUID
+import os
+import socket
+import time
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
 from datetime import datetime
 
 from mcp_scan.core.models import Job, Task, TaskStatus, Host, Service, Vulnerability
-from mcp_scan.core.errors import ToolNotFoundError, SchedulerError
-from mcp_scan.tools.nmap_tool import run_nmap
-from mcp_scan.tools.nuclei_tool import run_nuclei
-from mcp_scan.tools.gobuster_tool import run_gobuster
-from mcp_scan.tools.sqlmap_tool import run_sqlmap
-from mcp_scan.tools.hydra_tool import run_hydra
+from mcp_scan.core.errors import SchedulerError
+from mcp_scan.tools.registry import find_tool, run_tool
 from mcp_scan.core.db import get_db
+from mcp_scan.core.dbio import AsyncDatabase
+from mcp_scan.command_executor import CancelScope, cancel_scope, command_timeout, stream_output
+from mcp_scan.core.limits import ConcurrencyLimiter, TargetLimiter
+from mcp_scan.core.dispatcher import Dispatcher
+from mcp_scan.core.sharding import plan_scan_shards
+from mcp_scan.core.retry import DurationHistory, backoff_delay, is_transient, retry_policy
+from mcp_scan.core.executors import ExecutionBackend
+from mcp_scan.core.workers import WorkerRegistry
+from mcp_scan.core.cache import ResultCache, cache_key
+from mcp_scan.core.jobcache import JobCache
+from mcp_scan.core.writer import JobWriter
+from mcp_scan.core.batching import TaskBatcher
+from mcp_scan.core.admission import Admission, AdmissionController
+from mcp_scan.core.rescan import (
+    FOLLOW_UP_TOOLS, ServiceKey, changed_services, detection_ports, is_web_service,
+    scoped_name, service_index, service_url, url_service_key,
+)
+from mcp_scan.config import MCPConfig, get_config
 
 logger = logging.getLogger(__name__)
 
-class Scheduler:
+# Control actions accepted by `Scheduler.control`
+CONTROL_ACTIONS = ("cancel", "pause", "preempt", "resume")
+
+_CANCELLED = {"success": False, "cancelled": True, "error": "Cancelled"}
+
+class _JobRun:
+    """Runtime state of a job while `run_job` drives it."""
+
     def __init__(self):
-        self.jobs: Dict[UUID, Job] = {}
+        # Set whenever one of the job's tasks finishes or it is controlled
+        self.wakeup = asyncio.Event()
+        # Submitted tasks that have not finished yet
+        self.in_flight: Set[UUID] = set()
+        # Job an incremental scan diffs against, loaded as the run starts
+        self.baseline: Optional[Job] = None
+
+class Scheduler:
+    def __init__(self, config: Optional[MCPConfig] = None):
+        config = config or get_config()
         self.active_tasks: Dict[UUID, asyncio.Task] = {}
+        self._runs: Dict[UUID, _JobRun] = {}
         self.db = get_db()
+        # Database calls made from the event loop run on their own thread
+        self.dbio = AsyncDatabase(config.persistence, self.db)
+        # Coalesced, batched saves of job state changes
+        self.writer = JobWriter(config.persistence, self.dbio)
+        # Finished jobs are evicted once persisted and reloaded by get_job
+        self.jobs = JobCache(config.job_cache, self.dbio, lambda job_id: job_id in self._runs)
+        # Execution slots shared by every job this scheduler owns
+        self.limits = ConcurrencyLimiter.from_config(config.scheduler)
+        # Per-target admission, so one host is never flooded by several jobs
+        self.targets = TargetLimiter.from_config(config.scheduler)
+        # Past run durations, for adaptive timeouts and task ordering
+        self.history = DurationHistory(config.timeouts)
+        # Single queue deciding which ready task of which job starts next
+        self.dispatcher = Dispatcher(
+            self.limits, self.targets,
+            self._estimate_duration if config.scheduler.critical_path_ordering else None)
+        self._pump_scheduled = False
+        # Bounded thread pools per tool class instead of the default executor
+        self.executors = ExecutionBackend(config.executors)
+        # Remote workers; tasks run locally while none are registered
+        self.workers = WorkerRegistry(config.workers)
+        # Its SQLite file is read and written on the database thread
+        self.cache = ResultCache(config.cache, self.dbio)
+        # Single-flight: invocation key -> (leader task id, future of its result)
+        self.coalesce = config.scheduler.coalesce_inflight
+        self.stream_follow_ups = config.scheduler.stream_follow_ups
+        # Kill switches of tasks running locally
+        self._scopes: Dict[UUID, CancelScope] = {}
+        self.control_poll_interval = config.scheduler.control_poll_interval
+        self.retries = config.retries
+        self._retry_timers: Dict[UUID, asyncio.TimerHandle] = {}
+        # Renews leases and fetches control requests for all owned jobs
+        self._poller: Optional[asyncio.Task] = None
+        # Identity under which this scheduler leases the jobs it runs
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.recovery = config.recovery
+        # Bounds on running and waiting jobs for submit_job
+        self.admission = AdmissionController(config.admission)
+        self._background: Set[asyncio.Task] = set()
+        self._inflight: Dict[str, Tuple[UUID, asyncio.Future]] = {}
+        self._inflight_keys: Dict[UUID, str] = {}
+        self.sharding = config.sharding
+        # Runs of list-capable tools shared by compatible tasks; a batch
+        # starts early once the tool has no free slot left to grow it
+        self.batcher = TaskBatcher(config.batching, self._run_batch, self.limits.has_capacity)
+        # Slots freed outside the dispatcher (direct MCP tool calls) may
+        # unblock queued tasks too
+        self.limits.add_release_listener(self._schedule_pump)
         # Loop should be retrieved in async context, not init
 
-    async def create_job(self, target: str) -> Job:
-        """Initialize a new scan job with default tasks."""
-        job = Job(target=target)
+    async def create_job(self, target: str, priority: int = 5, bypass_cache: bool = False,
+                         incremental: bool = False) -> Job:
+        """Initialize a new scan job with default tasks.
+
+        With `incremental`, the job diffs against the latest completed job for
+        the target: a cheap version scan of the known and common ports
+        replaces the full top-1000 scan, and follow-ups only re-run for
+        services that changed.
+        """
+        baseline = await self._latest_completed_job(target) if incremental else None
+        job = self._build_job(target, priority, bypass_cache, baseline)
         self.jobs[job.id] = job
+        # Queued at once: the lease and status updates of run_job need the row
+        self.dbio.save_job(job)
+        return job
+
+    async def create_jobs(self, targets: List[str], priority: int = 5, bypass_cache: bool = False,
+                          incremental: bool = False) -> List[Job]:
+        """Create one job per target, saved in a single transaction.
+
+        Every target is validated first: an invalid one raises
+        InvalidTargetError and no job is created. If the transaction
+        fails, SchedulerError is raised and no job is created either.
+        """
+        jobs = []
+        for target in dict.fromkeys(t.strip() for t in targets if t.strip()):
+            baseline = await self._latest_completed_job(target) if incremental else None
+            jobs.append(self._build_job(target, priority, bypass_cache, baseline))
+        for job in jobs:
+            self.jobs[job.id] = job
+        if not await self.dbio.run("save_jobs", jobs):
+            for job in jobs:
+                self.jobs.pop(job.id, None)
+            raise SchedulerError(f"Failed to save {len(jobs)} jobs; none was created")
+        logger.info(f"Created {len(jobs)} jobs")
+        return jobs
+
+    def _build_job(self, target: str, priority: int, bypass_cache: bool, baseline: Optional[Job]) -> Job:
+        job = Job(target=target, priority=priority)
+        ports, extra = "top-1000", {}
+        if baseline:
+            job.baseline_job_id = baseline.id
+            ports, extra = detection_ports(baseline), {"additional_args": "-sV"}
+            logger.info(f"Incremental scan of {target} against job {baseline.id}")
         
-        # Initial Task: Nmap
-        # In a real DAG, we'd add this, then subsequent tasks depend on it.
-        # For MVP, we'll add Nmap first.
-        nmap_task = Task(
-            tool_name="nmap",
-            params={"target": target, "ports": "top-1000"}
-        )
-        job.tasks.append(nmap_task)
-        
-        # Save to DB
-        self.db.save_job(job)
-        
+        # Initial Tasks: one Nmap per shard of a large scope (CIDR, ranges,
+        # long port ranges); the dispatcher runs them in parallel and their
+        # hosts merge into the same assets
+        for shard_target, shard_ports in plan_scan_shards(target, ports, self.sharding):
+            job.add_task(Task(
+                tool_name="nmap",
+                params={"target": shard_target, "ports": shard_ports, **extra},
+                bypass_cache=bypass_cache
+            ))
         return job
 
+    def submit_job(self, job: Job, force: bool = False) -> Admission:
+        """Run a job in the background as soon as admission control lets it.
+
+        Returns its queue position, 0 if it started right away. Raises
+        AdmissionRejectedError if the queue is full, unless `force`
+        (recovered jobs are never turned away).
+        """
+        position, turn = self.admission.submit(job, force)
+        # Leased from now on, renewed by the poller while the job waits, so
+        # no other scheduler recovers it as orphaned
+        self.dbio.submit("claim_job", job.id, self.owner, self.recovery.stale_after)
+        self._start_poller()
+        runner = asyncio.create_task(self._run_admitted(job.id, turn))
+        self._background.add(runner)
+        runner.add_done_callback(self._background.discard)
+        return Admission(job.id, position, runner)
+
+    def submit_jobs(self, jobs: List[Job], force: bool = False) -> List[Admission]:
+        """Submit several jobs at once; all are admitted or none is.
+
+        Raises AdmissionRejectedError if they do not all fit under the
+        running and queued job limits, unless `force`.
+        """
+        if not force:
+            self.admission.check(len(jobs))
+        return [self.submit_job(job, force=True) for job in jobs]
+
+    async def _run_admitted(self, job_id: UUID, turn: asyncio.Future):
+        try:
+            await turn
+        except asyncio.CancelledError:
+            self.admission.withdraw(job_id)
+            raise
+        try:
+            await self.run_job(job_id)
+        finally:
+            self.admission.finished(job_id)
+
     async def run_job(self, job_id: UUID):
-        """Main loop to execute tasks for a job."""
+        """Main loop to execute tasks for a job.
+
+        The loop is event driven: every finished task sets the job's wakeup
+        event, so dependents are released as soon as their last dependency
+        completes and the job ends as soon as its last task does.
+        """
         job = self.jobs.get(job_id)
         if not job:
             raise SchedulerError(f"Job {job_id} not found")
 
-        job.status = TaskStatus.RUNNING
-        self.db.update_status(job.id, TaskStatus.RUNNING.value)
+        # Lost if another scheduler recovered the job meanwhile
+        if not await self.dbio.run("claim_job", job.id, self.owner, self.recovery.stale_after):
+            logger.warning(f"Job {job_id} is leased by another scheduler; not running it")
+            return
+        if job.status != TaskStatus.PAUSED:
+            job.status = TaskStatus.RUNNING
+        self.dbio.submit("update_status", job.id, job.status.value)
         logger.info(f"Starting job {job_id} for target {job.target}")
 
+        run = _JobRun()
+        self._runs[job.id] = run
+        saved = None
+        if job.baseline_job_id:
+            run.baseline = await self.load_job(job.baseline_job_id)
+        # Requests left while the job was created or queued apply before
+        # anything starts; later ones arrive through the shared poller
+        await self._poll([job.id])
+        self._start_poller()
+
         try:
-            # Simple sequential execution for MVP P0 (or simple dependency check)
-            # In a full DAG, we'd use a queue and check dependencies.
-            # Here, we just iterate through pending tasks, execute them, and add new ones.
-            
-            # We keep a loop until all tasks are completed
             while True:
-                pending_tasks = [t for t in job.tasks if t.status == TaskStatus.PENDING]
-                if not pending_tasks:
-                    # check if any are running?
-                    running = [t for t in job.tasks if t.status == TaskStatus.RUNNING]
-                    if not running:
-                        break # All done
-                    await asyncio.sleep(1) # Wait for running tasks
-                    continue
 
-                # Pick a task that is ready (dependencies met)
-                # For MVP, we assume order in list is roughly order of execution or independent
-                # But let's do a simple check
-                ready_tasks = []
-                for task in pending_tasks:
-                    deps_met = True
-                    for dep_id in task.dependencies:
-                        dep_task = next((t for t in job.tasks if t.id == dep_id), None)
-                        if not dep_task or dep_task.status != TaskStatus.COMPLETED:
-                            deps_met = False
-                            break
-                    if deps_met:
-                        ready_tasks.append(task)
-                
-                if not ready_tasks:
-                    # If we have pending tasks but none are ready, and no running tasks -> Deadlock or waiting
-                    running = [t for t in job.tasks if t.status == TaskStatus.RUNNING]
-                    if not running:
-                        logger.error("Deadlock detected or dependencies failed.")
-                        job.status = TaskStatus.FAILED
-                        self.db.save_job(job) # Save final state
-                        return
-                    await asyncio.sleep(1)
-                    continue
+                # Hand every task whose dependencies are met to the central
+                # dispatcher; it starts them as slots become free. A paused
+                # job keeps its ready tasks until it is resumed.
+                if job.status == TaskStatus.RUNNING:
+                    dispatched = False
+                    for task in job.pop_ready():
+                        run.in_flight.add(task.id)
+                        dispatched = self._submit_task(job, task) or dispatched
+                    if dispatched:
+                        self._pump()
 
-                # Execute ready tasks (concurrency limit could be added here)
-                for task in ready_tasks:
-                    # Run in background
-                    task.status = TaskStatus.RUNNING
-                    task.started_at = datetime.now()
-                    # Save state before running task
-                    self.db.save_job(job)
-                    asyncio.create_task(self._execute_task(job, task))
-                
-                await asyncio.sleep(0.5)
+                if not run.in_flight:
+                    if job.status == TaskStatus.CANCELLED:
+                        break
+                    held = job.status == TaskStatus.PAUSED or any(
+                        t.status == TaskStatus.PAUSED for t in job.tasks)
+                    if not held:
+                        pending = any(t.status == TaskStatus.PENDING for t in job.tasks)
+                        if pending:
+                            # Pending tasks that can never become ready -> dependencies failed
+                            logger.error("Deadlock detected or dependencies failed.")
+                            job.status = TaskStatus.FAILED
+                            saved = self.writer.save(job) # Save final state
+                            return
+                        break # All done
 
-            job.status = TaskStatus.COMPLETED
-            self.db.save_job(job) # Save completed state
-            logger.info(f"Job {job_id} completed.")
+                # Sleep until a running task finishes or the job is controlled
+                await run.wakeup.wait()
+                run.wakeup.clear()
+
+            if job.status == TaskStatus.CANCELLED:
+                logger.info(f"Job {job_id} cancelled.")
+            else:
+                job.status = TaskStatus.COMPLETED
+                logger.info(f"Job {job_id} completed.")
+            saved = self.writer.save(job) # Save final state
 
         except Exception as e:
             logger.error(f"Job failed: {e}")
             job.status = TaskStatus.FAILED
-            self.db.save_job(job) # Save failed state
+            saved = self.writer.save(job) # Save failed state
+        finally:
+            self._runs.pop(job.id, None)
+            if saved is not None:
+                # The job's outcome is durable before run_job returns
+                await asyncio.gather(saved, return_exceptions=True)
+            self.jobs.prune()
+
+    def _submit_task(self, job: Job, task: Task) -> bool:
+        """Start a ready task; returns True if it was queued for dispatch.
+
+        Cache hits and tasks identical to one already queued or running
+        complete without taking an execution slot.
+        """
+        # Memory only: the disk store is looked up by _execute_task, off the loop
+        cached = None if task.bypass_cache else self.cache.get(task.tool_name, task.params, disk=False)
+        if cached is not None:
+            logger.info(f"Cache hit for {task.tool_name} ({task.id})")
+            self.active_tasks[task.id] = asyncio.create_task(self._execute_task(job, task, cached))
+            return False
 
-    async def _execute_task(self, job: Job, task: Task):
-        """Execute a single task and handle results."""
+        key = cache_key(task.tool_name, task.params)
+        leader = self._inflight.get(key) if self.coalesce else None
+        if leader and leader[0] != task.id:
+            leader_id, future = leader
+            logger.info(f"Coalescing {task.tool_name} ({task.id}) with in-flight task {leader_id}")
+            task.dispatch_note = f"coalesced with in-flight task {str(leader_id)[:8]}"
+            self.active_tasks[task.id] = asyncio.create_task(self._follow_task(job, task, leader_id, future))
+            return False
+
+        if self.coalesce and not leader:
+            self._inflight[key] = (task.id, asyncio.get_running_loop().create_future())
+            self._inflight_keys[task.id] = key
+        self.dispatcher.submit(job, task)
+        return True
+
+    async def _follow_task(self, job: Job, task: Task, leader_id: UUID, future: asyncio.Future):
+        """Complete a task with the result of the identical task it subscribed to."""
         try:
+            result = await asyncio.shield(future)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        if result.get("cancelled") and task.status == TaskStatus.PENDING:
+            # The leader was cancelled or preempted, not this task: run it ourselves
+            self.active_tasks.pop(task.id, None)
+            if job.status == TaskStatus.PAUSED:
+                job.requeue(task)
+                self._task_done(job, task)
+            elif self._submit_task(job, task):
+                self._pump()
+            return
+        await self._execute_task(job, task, dict(result, coalesced_from=str(leader_id)))
+
+    def _settle_inflight(self, task: Task, result: Dict[str, Any]):
+        """Hand a leader task's result to its subscribers."""
+        key = self._inflight_keys.pop(task.id, None)
+        if key is None:
+            return
+        _, future = self._inflight.pop(key)
+        if not future.done():
+            future.set_result(result)
+
+    def _schedule_pump(self):
+        """Run the dispatcher once on the next loop iteration."""
+        if self._pump_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._pump_scheduled = True
+        loop.call_soon(self._pump)
+
+    def _pump(self):
+        """Start every queued task the dispatcher admits."""
+        self._pump_scheduled = False
+        for job, task in self.dispatcher.dispatch():
+            self.active_tasks[task.id] = asyncio.create_task(self._execute_task(job, task))
+
+    async def _execute_task(self, job: Job, task: Task, cached_result: Optional[Dict[str, Any]] = None):
+        """Execute a single task and handle results.
+
+        The dispatcher has already taken the task's slots; they are returned
+        when the task finishes. With `cached_result` the tool is not run.
+        Transient failures are retried after a backoff, per the tool's
+        retry policy; the task stays in flight meanwhile.
+        """
+        retrying = False
+        try:
+            if task.status != TaskStatus.PENDING:
+                return  # Cancelled or paused before it could start
+            task.status = TaskStatus.RUNNING
+            task.started_at = datetime.now()
+            task.attempts += 1
+            # Save state before running task
+            self.writer.save(job)
             logger.info(f"Executing task {task.tool_name} ({task.id})")
             
-            # Execute tool wrapper in thread pool
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, 
-                self._run_tool_wrapper, 
-                task.tool_name, 
-                task.params
-            )
+            spec = find_tool(task.tool_name)
+            result = cached_result
+            if result is None and not task.bypass_cache:
+                result = await self.cache.load(task.tool_name, task.params)
+                if result is not None:
+                    logger.info(f"Cache hit on disk for {task.tool_name} ({task.id})")
+            ran = result is None
+            if ran:
+                # Applied by the worker too, when the task runs remotely
+                timeout = self.history.timeout_for(task.tool_name, task.params, task.attempts,
+                                                   default=spec.default_timeout if spec else None)
+                if self.workers.has_workers(task.tool_name):
+                    result = await self.workers.execute(task.id, task.tool_name, task.params, timeout)
+                    # The registry times remote runs from the lease, not from the queue
+                    if result is not None and result.get("success") and result.get("duration") is not None:
+                        self.history.record(task.tool_name, task.params, result["duration"])
+            if result is None:
+                started = time.monotonic()
+                if self.batcher.accepts(spec, task.params):
+                    # One process shared with compatible tasks, killed by the batch
+                    result = await self.batcher.submit(task.id, task.tool_name, task.params, timeout)
+                else:
+                    # Execute tool wrapper in the pool of the tool's resource class
+                    scope = self._scopes[task.id] = CancelScope()
+                    result = await self.executors.run(
+                        task.tool_name,
+                        self._run_streaming,
+                        task.tool_name,
+                        task.params,
+                        self._stream_listener(job, task),
+                        scope,
+                        timeout
+                    )
+                # A batch's duration says little about one target
+                if result.get("success") and not result.get("batched"):
+                    self.history.record(task.tool_name, task.params, time.monotonic() - started)
+            if ran:
+                # Run locally or on a worker; put only keeps cacheable successes
+                self.cache.put(task.tool_name, task.params, result)
+            if task.status != TaskStatus.RUNNING:
+                return  # Stopped while the tool was finishing
+
+            policy = retry_policy(self.retries, task.tool_name)
+            if cached_result is None and task.attempts < policy.max_attempts and is_transient(result):
+                retrying = True
+                self._schedule_retry(job, task, result, backoff_delay(policy, task.attempts))
+                return
+            self._settle_inflight(task, result)
             
             task.result = result
             task.completed_at = datetime.now()
             
             if result.get("success", False):
+                hosts = None
+                parser = spec.load_parser() if spec else None
+                if parser:
+                    # Parsing large outputs is CPU bound, keep it off the loop
+                    hosts = await self.executors.run_cpu(
+                        parser, result.get("stdout", ""), task.params.get("target", job.target))
+                    self._merge_assets(job, hosts)
                 task.status = TaskStatus.COMPLETED
-                self._process_task_result(job, task)
+                job.task_completed(task)
+                self._process_task_result(job, task, hosts)
             else:
                 task.status = TaskStatus.FAILED
                 task.error = result.get("stderr") or result.get("error")
             
             # Save job state after task completion
-            self.db.save_job(job)
+            self.writer.save(job)
                 
         except Exception as e:
             logger.error(f"Task execution failed: {e}")
             task.status = TaskStatus.FAILED
             task.error = str(e)
-            self.db.save_job(job)
+            self._settle_inflight(task, {"success": False, "error": str(e)})
+            self.writer.save(job)
+        finally:
+            self._scopes.pop(task.id, None)
+            self.dispatcher.release(task)
+            if retrying:
+                self.active_tasks.pop(task.id, None)
+            else:
+                self._task_done(job, task)
+
+    def _schedule_retry(self, job: Job, task: Task, result: Dict[str, Any], delay: float):
+        """Resubmit a transiently failed task once its backoff has passed."""
+        policy = retry_policy(self.retries, task.tool_name)
+        reason = "timed out" if result.get("timed_out") else (result.get("stderr") or result.get("error") or "").strip()
+        reason = reason.splitlines()[0][:60] if reason else "failed"
+        logger.warning(f"Task {task.tool_name} ({task.id}) attempt {task.attempts} failed ({reason}); "
+                       f"retrying in {delay:.1f}s")
+        task.status = TaskStatus.PENDING
+        task.result = result
+        task.dispatch_note = f"retry {task.attempts + 1}/{policy.max_attempts} in {delay:.0f}s: {reason}"
+        self._retry_timers[task.id] = asyncio.get_running_loop().call_later(delay, self._retry, job, task)
+        self.writer.save(job)
+
+    def _retry(self, job: Job, task: Task):
+        self._retry_timers.pop(task.id, None)
+        run = self._runs.get(job.id)
+        if task.status != TaskStatus.PENDING or not run or task.id not in run.in_flight:
+            return
+        if job.status == TaskStatus.PAUSED:
+            job.requeue(task)
+            self._task_done(job, task)
+        elif self._submit_task(job, task):
+            self._pump()
+
+    def _task_done(self, job: Job, task: Task):
+        """Take a task off the job's in-flight set; safe to call twice."""
+        self.active_tasks.pop(task.id, None)
+        run = self._runs.get(job.id)
+        if run and task.id in run.in_flight:
+            run.in_flight.discard(task.id)
+            # Wake the job loop so dependents start immediately
+            run.wakeup.set()
+
+    def control(self, job_id: UUID, action: str, task_id: Optional[UUID] = None) -> bool:
+        """Cancel, pause, preempt or resume a job, or one task of it.
+
+        `pause` holds back tasks that have not started; `preempt` also stops
+        running ones and requeues them. Jobs run by another process are
+        reached through the database, which that process polls.
+        """
+        if action not in CONTROL_ACTIONS:
+            raise SchedulerError(f"Unknown control action: {action}")
+        job = self.jobs.get(job_id)
+        if job and self.admission.position(job_id) is not None:
+            return self._control_queued(job, action, task_id)
+        if job_id not in self._runs:
+            # Applied by whichever process runs the job, when it next checks
+            if not job and not self.db.get_job(job_id, full=False):
+                raise SchedulerError(f"Job {job_id} not found")
+            self.db.request_control(job_id, f"{action} {task_id}" if task_id else action)
+            logger.info(f"Requested {action} of job {job_id}")
+            return True
+        if task_id:
+            task = job.get_task(task_id)
+            if not task:
+                raise SchedulerError(f"Task {task_id} not found in job {job_id}")
+            changed = self._control_task(job, task, action)
+        else:
+            changed = self._control_job(job, action)
+        if changed:
+            self.writer.save(job)
+            self._runs[job.id].wakeup.set()
+        return changed
+
+    async def control_async(self, job_id: UUID, action: str, task_id: Optional[UUID] = None) -> bool:
+        """`control` for callers on the event loop: the database lookup and
+        request for a job run by another process happen off the loop."""
+        if action in CONTROL_ACTIONS and job_id not in self._runs and self.admission.position(job_id) is None:
+            if job_id not in self.jobs and not await self.dbio.run("get_job", job_id, False):
+                raise SchedulerError(f"Job {job_id} not found")
+            await self.dbio.run("request_control", job_id, f"{action} {task_id}" if task_id else action)
+            logger.info(f"Requested {action} of job {job_id}")
+            return True
+        return self.control(job_id, action, task_id)
+
+    def _control_queued(self, job: Job, action: str, task_id: Optional[UUID]) -> bool:
+        """Control a job still waiting for admission; nothing of it runs yet."""
+        if task_id:
+            task = job.get_task(task_id)
+            if not task:
+                raise SchedulerError(f"Task {task_id} not found in job {job.id}")
+            changed = self._control_task(job, task, action)
+        elif action == "cancel":
+            self.admission.withdraw(job.id)
+            changed = self._control_job(job, action)
+        elif action == "resume":
+            changed = self._control_job(job, action)
+        else:
+            changed = job.status != TaskStatus.PAUSED
+            job.status = TaskStatus.PAUSED
+        if changed:
+            self.writer.save(job)
+        return changed
+
+    def _control_job(self, job: Job, action: str) -> bool:
+        if job.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+            return False
+        if action == "resume":
+            if job.status != TaskStatus.PAUSED:
+                return False
+            job.status = TaskStatus.RUNNING
+            logger.info(f"Job {job.id} resumed")
+            return True
+        if action == "cancel":
+            job.status = TaskStatus.CANCELLED
+            for task in job.tasks:
+                if task.status in (TaskStatus.PENDING, TaskStatus.RUNNING, TaskStatus.PAUSED):
+                    self._stop_task(job, task, TaskStatus.CANCELLED)
+            logger.info(f"Job {job.id} cancelled")
+            return True
+        job.status = TaskStatus.PAUSED
+        for task in job.tasks:
+            if task.id in self._runs[job.id].in_flight and (
+                    task.status == TaskStatus.PENDING or action == "preempt"):
+                self._stop_task(job, task, TaskStatus.PENDING)
+        logger.info(f"Job {job.id} paused" + (" (running tasks preempted)" if action == "preempt" else ""))
+        return True
+
+    def _control_task(self, job: Job, task: Task, action: str) -> bool:
+        if action == "resume":
+            if task.status != TaskStatus.PAUSED:
+                return False
+            job.requeue(task)
+            return True
+        if task.status not in (TaskStatus.PENDING, TaskStatus.RUNNING, TaskStatus.PAUSED):
+            return False
+        if action == "cancel":
+            # Dependents can never run without it
+            for dependent in [task] + job.dependents(task.id):
+                if dependent.status in (TaskStatus.PENDING, TaskStatus.RUNNING, TaskStatus.PAUSED):
+                    self._stop_task(job, dependent, TaskStatus.CANCELLED)
+            return True
+        if task.status == TaskStatus.RUNNING and action == "pause":
+            return False  # Only preempt stops a running task
+        self._stop_task(job, task, TaskStatus.PAUSED)
+        return True
+
+    def _stop_task(self, job: Job, task: Task, status: TaskStatus):
+        """Withdraw a queued task or kill a running one, freeing its slots now.
+
+        The task ends up `status`; PENDING requeues it.
+        """
+        self.dispatcher.withdraw(task)
+        timer = self._retry_timers.pop(task.id, None)
+        if timer:
+            timer.cancel()
+        scope = self._scopes.pop(task.id, None)
+        if scope:
+            scope.cancel()  # Kills the tool's process tree
+        running = self.active_tasks.get(task.id)
+        if running:
+            running.cancel()
+        self.dispatcher.release(task)
+        # Tasks coalesced onto this one run the tool themselves instead
+        self._settle_inflight(task, _CANCELLED)
+        if status == TaskStatus.PENDING:
+            job.requeue(task)
+        else:
+            task.status = status
+            if status == TaskStatus.CANCELLED:
+                task.error = "Cancelled"
+                task.completed_at = datetime.now()
+        self._task_done(job, task)
+
+    def _start_poller(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self):
+        """Renew the leases of every job this scheduler owns and apply the
+        control requests other processes left, with one query per interval
+        for all of them. Stops once no job is running or queued."""
+        while True:
+            await asyncio.sleep(self.control_poll_interval)
+            owned = list(self._runs) + self.admission.queued()
+            if not owned:
+                return
+            await self._poll(owned)
+
+    async def _poll(self, job_ids: List[UUID]):
+        try:
+            requests = await self.dbio.run("poll_jobs", job_ids, self.owner)
+        except Exception as e:
+            logger.error(f"Polling {len(job_ids)} jobs failed: {e}")
+            return
+        if not isinstance(requests, dict):
+            return
+        for job_id, request in requests.items():
+            action, _, task_id = (request or "").partition(" ")
+            if action not in CONTROL_ACTIONS:
+                continue
+            try:
+                self.control(UUID(job_id), action, UUID(task_id) if task_id else None)
+            except (SchedulerError, ValueError) as e:
+                logger.warning(f"Ignoring control request {request!r} for job {job_id}: {e}")
+
+    async def recover_jobs(self, start: bool = True) -> List[Job]:
+        """Take over unfinished jobs whose scheduler died, and resume them.
+
+        A job qualifies when it is still pending, running or paused in the
+        database and its owner stopped renewing the lease. Completed tasks
+        are kept, so the DAG resumes where it stopped; tasks that were
+        running are rerun or failed according to `recovery.orphaned_tasks`.
+        With `start`, the recovered jobs are run in the background.
+        """
+        recovered = []
+        for job in await self.dbio.run("get_unfinished_jobs", self.recovery.stale_after):
+            if job.id in self._runs or not await self.dbio.run("claim_job", job.id, self.owner,
+                                                               self.recovery.stale_after):
+                continue  # Running here already, or another scheduler took it first
+            self._reset_orphans(job)
+            self.jobs[job.id] = job
+            self.writer.save(job)
+            done = sum(1 for t in job.tasks if t.status == TaskStatus.COMPLETED)
+            logger.info(f"Recovered job {job.id} for {job.target} ({done}/{len(job.tasks)} tasks already done)")
+            recovered.append(job)
+            if start:
+                self.submit_job(job, force=True)
+        return recovered
+
+    def _reset_orphans(self, job: Job):
+        """Settle the tasks a dead scheduler left running."""
+        for task in job.tasks:
+            if task.status != TaskStatus.RUNNING:
+                continue
+            policy = self.recovery.orphaned_tasks
+            if policy == "auto":
+                spec = find_tool(task.tool_name)
+                policy = "rerun" if spec and spec.cacheable else "fail"
+            if policy == "rerun":
+                job.requeue(task)
+                task.dispatch_note = "requeued after scheduler restart"
+            else:
+                task.status = TaskStatus.FAILED
+                task.error = "Interrupted by scheduler restart"
+                task.completed_at = datetime.now()
+
+    def _estimate_duration(self, task: Task) -> Optional[float]:
+        return self.history.estimate(task.tool_name, task.params)
 
     def _run_tool_wrapper(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Dispatch to the correct tool function."""
-        if tool_name == "nmap":
-            return run_nmap(**params)
-        elif tool_name == "nuclei":
-            return run_nuclei(**params)
-        elif tool_name == "gobuster":
-            # Assuming gobuster tool signature
-            return run_gobuster(**params)
-        elif tool_name == "sqlmap":
-            return run_sqlmap(**params)
-        elif tool_name == "hydra":
-            return run_hydra(**params)
-        else:
-            raise ToolNotFoundError(tool_name)
+        return run_tool(tool_name, params)
+
+    def _run_streaming(self, tool_name: str, params: Dict[str, Any],
+                       on_line: Optional[Callable[[str], None]], scope: CancelScope,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run the tool, feeding its stdout lines to `on_line` as they arrive.
+
+        Commands the tool starts are killed when `scope` is cancelled, or
+        after `timeout` seconds when given instead of the tool's default.
+        """
+        with cancel_scope(scope), command_timeout(timeout):
+            if on_line is None:
+                return self._run_tool_wrapper(tool_name, params)
+            with stream_output(on_line):
+                return self._run_tool_wrapper(tool_name, params)
+
+    async def _run_batch(self, tool_name: str, shared: Dict[str, Any], targets: List[str],
+                         scope: CancelScope, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Launch a batch formed by `self.batcher`; a lone target runs the plain tool."""
+        if len(targets) == 1:
+            result = await self.executors.run(tool_name, self._run_streaming, tool_name,
+                                              dict(shared, target=targets[0]), None, scope, timeout)
+            return {targets[0]: result}
+        if timeout:
+            timeout = min(timeout, self.history.config.max_timeout)
+        return await self.executors.run(tool_name, self._run_batch_wrapper, tool_name,
+                                        targets, shared, scope, timeout)
+
+    def _run_batch_wrapper(self, tool_name: str, targets: List[str], params: Dict[str, Any],
+                           scope: CancelScope, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Run the tool's batch runner over `targets` with shared `params`."""
+        with cancel_scope(scope), command_timeout(timeout):
+            return find_tool(tool_name).load_batch_runner()(targets, **params)
+
+    def _stream_listener(self, job: Job, task: Task) -> Optional[Callable[[str], None]]:
+        """Line callback spotting open ports while Nmap is still running.
 
-    def _process_task_result(self, job: Job, task: Task):
+        Incremental jobs wait for the full result, since deciding what to
+        carry forward needs the complete service list.
+        """
+        spec = find_tool(task.tool_name)
+        parser_cls = spec.load_stream_parser() if spec else None
+        if not parser_cls or not self.stream_follow_ups or job.baseline_job_id:
+            return None
+        parser = parser_cls(task.params.get("target", job.target))
+        loop = asyncio.get_running_loop()
+
+        def on_line(line: str):
+            found = parser.feed(line)
+            if found:
+                loop.call_soon_threadsafe(self._on_service_found, job, task, *found)
+        return on_line
+
+    def _on_service_found(self, job: Job, task: Task, host: Host, service: Service):
+        """Start web follow-ups for a service found by a still running Nmap."""
+        if task.status != TaskStatus.RUNNING or not is_web_service(service):
+            return
+        before = len(job.tasks)
+        self._plan_follow_ups(job, task, [Host(ip=host.ip, hostname=host.hostname, services=[service])],
+                              streaming=True)
+        run = self._runs.get(job.id)
+        if run and len(job.tasks) > before:
+            run.wakeup.set()
+
+    def _process_task_result(self, job: Job, task: Task, hosts: Optional[List[Host]] = None):
         """Analyze result and trigger next steps (DAG Logic)."""
         # This is where the "Intelligent" part happens
         
-        if task.tool_name == "nmap":
-            # Parse Nmap output (simplistic for MVP)
-            # If port 80/443 open, trigger Nuclei and Gobuster
-            output = task.result.get("stdout", "")
-            
-            # Very basic parsing logic
-            has_web = "80/tcp" in output or "443/tcp" in output or "http" in output
-            
-            if has_web:
-                logger.info("Web ports detected. Scheduling Nuclei and Gobuster.")
-                
-                # Create Nuclei Task
-                nuclei_task = Task(
-                    tool_name="nuclei",
-                    params={"target": f"http://{job.target}"}, # Simplified protocol guessing
-                    dependencies=[task.id]
-                )
-                job.tasks.append(nuclei_task)
-                
-                # Create Gobuster Task
-                gobuster_task = Task(
-                    tool_name="gobuster",
-                    params={"url": f"http://{job.target}"},
-                    dependencies=[task.id]
-                )
-                job.tasks.append(gobuster_task)
-
-    def get_job(self, job_id: UUID) -> Optional[Job]:
+        if task.tool_name == "nmap" and hosts is not None:
+            run = self._runs.get(job.id)
+            baseline = run.baseline if run else None
+            if baseline:
+                self._plan_incremental_follow_ups(job, task, hosts, baseline)
+            else:
+                self._plan_follow_ups(job, task, hosts)
+
+    def _plan_follow_ups(self, job: Job, task: Task, hosts: List[Host],
+                         skip: Optional[Set[Tuple[ServiceKey, str]]] = None, streaming: bool = False):
+        """Schedule Nuclei and Gobuster for every web service Nmap found.
+
+        Follow-ups planned while Nmap is `streaming` do not wait for it to
+        finish. Services that already have a follow-up (found earlier in
+        the stream, or by an overlapping shard) are skipped.
+        """
+        skip = set(skip or ())
+        for existing in job.tasks:
+            if existing.tool_name in FOLLOW_UP_TOOLS:
+                url = existing.params.get("target") or existing.params.get("url") or ""
+                skip.add((url_service_key(url), existing.tool_name))
+        dependencies = [] if streaming else [task.id]
+        for host in hosts:
+            # Never the PTR name nmap reported, unless the job targeted it
+            name = scoped_name(host, job.target)
+            for service in host.services:
+                if not is_web_service(service):
+                    continue
+                url = service_url(name, service)
+                keys = {(name.lower(), service.port), (host.ip.lower(), service.port)}
+                logger.info(f"Web service {url} detected. Scheduling Nuclei and Gobuster.")
+                if not any((key, "nuclei") in skip for key in keys):
+                    job.add_task(Task(
+                        tool_name="nuclei",
+                        params={"target": url},
+                        dependencies=list(dependencies),
+                        bypass_cache=task.bypass_cache
+                    ))
+                if not any((key, "gobuster") in skip for key in keys):
+                    job.add_task(Task(
+                        tool_name="gobuster",
+                        params={"url": url},
+                        dependencies=list(dependencies),
+                        bypass_cache=task.bypass_cache
+                    ))
+
+    def _plan_incremental_follow_ups(self, job: Job, task: Task, hosts: List[Host], baseline: Job):
+        """Re-run follow-ups only for changed services, carry the rest forward."""
+        changed = changed_services(baseline, hosts)
+        current = service_index(hosts, job.target)
+        planned: Set[Tuple[ServiceKey, str]] = set()
+
+        for old_task in baseline.tasks:
+            if old_task.tool_name not in FOLLOW_UP_TOOLS or old_task.status != TaskStatus.COMPLETED:
+                continue
+            key = url_service_key(old_task.params.get("target") or old_task.params.get("url") or "")
+            if key not in current or (key, old_task.tool_name) in planned:
+                continue  # Service is gone, or already handled
+            planned.add((key, old_task.tool_name))
+            if key in changed:
+                job.add_task(Task(
+                    tool_name=old_task.tool_name,
+                    params=dict(old_task.params),
+                    dependencies=[task.id],
+                    bypass_cache=task.bypass_cache
+                ))
+            else:
+                job.add_task(Task(
+                    tool_name=old_task.tool_name,
+                    params=dict(old_task.params),
+                    status=TaskStatus.COMPLETED,
+                    result=old_task.result,
+                    started_at=old_task.started_at,
+                    completed_at=old_task.completed_at,
+                    carried_forward_from=old_task.carried_forward_from or old_task.id
+                ))
+
+        logger.info(f"Incremental rescan of {job.target}: {len(changed)} changed service(s), "
+                    f"{len(planned)} follow-up(s) from baseline job {baseline.id}")
+        # New web services, or ones without a usable baseline result
+        self._plan_follow_ups(job, task, hosts, skip=planned)
+
+    def _merge_assets(self, job: Job, hosts: List[Host]):
+        """Merge discovered hosts and services into the job's assets."""
+        for host in hosts:
+            existing = next((h for h in job.assets if h.ip == host.ip), None)
+            if not existing:
+                job.assets.append(host)
+                continue
+            existing.hostname = existing.hostname or host.hostname
+            known = {(svc.port, svc.protocol): i for i, svc in enumerate(existing.services)}
+            for service in host.services:
+                key = (service.port, service.protocol)
+                if key in known:
+                    existing.services[known[key]] = service
+                else:
+                    existing.services.append(service)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of slot usage, queue depth and executor pool saturation."""
+        return {
+            "slots": self.limits.snapshot(),
+            "targets": self.targets.snapshot(),
+            "queued_tasks": self.dispatcher.queued_count(),
+            "executors": self.executors.metrics(),
+            "workers": self.workers.workers(),
+            "cache": self.cache.stats(),
+            "durations": self.history.stats(),
+            "jobs": self.jobs.stats(),
+            "batches": self.batcher.stats(),
+            "admission": self.admission.stats(),
+            "persistence": self.writer.stats(),
+            "database": self.dbio.stats(),
+        }
+
+    async def _latest_completed_job(self, target: str) -> Optional[Job]:
+        """Most recent completed job for a target, in memory or in the DB."""
+        candidates = [j for j in self.jobs.values() if j.target == target and j.status == TaskStatus.COMPLETED]
+        stored = await self.dbio.run("get_latest_job", target)
+        if stored:
+            candidates.append(stored)
+        return max(candidates, key=lambda j: j.created_at, default=None)
+
+    async def load_job(self, job_id: UUID) -> Optional[Job]:
+        """`get_job` for callers on the event loop; the database is read off the loop."""
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+        job = await self.dbio.run("get_job", job_id)
+        if isinstance(job, Job):
+            self.jobs[job.id] = job
+            return job
+        return None
+
+    def get_job(self, job_id: UUID, full: bool = True) -> Optional[Job]:
+        """Job from memory or the DB; without `full`, a stored job is only
+        loaded as its summary (no tool output or assets), for status views."""
         # Try memory first
         if job_id in self.jobs:
             return self.jobs[job_id]
         
+        if not full:
+            # A summary is not cached: a later full read must hit the DB
+            return self.db.get_job(job_id, full=False)
+
         # Try DB
         job = self.db.get_job(job_id)
         if job:
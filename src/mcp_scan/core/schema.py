@@ -0,0 +1,199 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mcp_scan.core.models import Host, Job, Service, Task, Vulnerability
+
+# job_results.schema_version of jobs stored in the normalized tables; rows
+# without it still hold the whole job as a JSON blob in result_data
+SCHEMA_VERSION = 1
+
+# Job fields kept in job_results.result_data of normalized jobs
+JOB_HEADER_FIELDS = {"id", "target", "status", "priority", "baseline_job_id", "created_at"}
+
+# Result keys stored in task_outputs instead of job_tasks
+OUTPUT_KEYS = ("stdout", "stderr")
+
+TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS job_tasks (
+        task_id VARCHAR(64) PRIMARY KEY,
+        job_id VARCHAR(64) NOT NULL,
+        position INT NOT NULL,
+        tool_name VARCHAR(64) NOT NULL,
+        name VARCHAR(255) NULL,
+        status VARCHAR(20) NOT NULL,
+        params JSON NOT NULL,
+        dependencies JSON NOT NULL,
+        bypass_cache BOOLEAN NOT NULL DEFAULT FALSE,
+        attempts INT NOT NULL DEFAULT 0,
+        error TEXT NULL,
+        dispatch_note TEXT NULL,
+        carried_forward_from VARCHAR(64) NULL,
+        result_meta JSON NULL,
+        created_at DATETIME(6) NULL,
+        started_at DATETIME(6) NULL,
+        completed_at DATETIME(6) NULL,
+        INDEX idx_job_position (job_id, position)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_outputs (
+        task_id VARCHAR(64) PRIMARY KEY,
+        job_id VARCHAR(64) NOT NULL,
+        stdout LONGTEXT NULL,
+        stderr LONGTEXT NULL,
+        INDEX idx_job (job_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_hosts (
+        job_id VARCHAR(64) NOT NULL,
+        ip VARCHAR(64) NOT NULL,
+        hostname VARCHAR(255) NULL,
+        os VARCHAR(255) NULL,
+        PRIMARY KEY (job_id, ip)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_services (
+        job_id VARCHAR(64) NOT NULL,
+        ip VARCHAR(64) NOT NULL,
+        port INT NOT NULL,
+        protocol VARCHAR(8) NOT NULL,
+        service_name VARCHAR(64) NULL,
+        product VARCHAR(255) NULL,
+        version VARCHAR(255) NULL,
+        PRIMARY KEY (job_id, ip, port, protocol)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_vulnerabilities (
+        job_id VARCHAR(64) NOT NULL,
+        ip VARCHAR(64) NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        severity VARCHAR(16) NOT NULL,
+        description TEXT NULL,
+        evidence TEXT NULL,
+        PRIMARY KEY (job_id, ip, title)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+)
+
+UPSERT_TASK = """
+    INSERT INTO job_tasks (task_id, job_id, position, tool_name, name, status, params, dependencies,
+                           bypass_cache, attempts, error, dispatch_note, carried_forward_from,
+                           result_meta, created_at, started_at, completed_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        position = VALUES(position), status = VALUES(status), params = VALUES(params),
+        dependencies = VALUES(dependencies), attempts = VALUES(attempts), error = VALUES(error),
+        dispatch_note = VALUES(dispatch_note), carried_forward_from = VALUES(carried_forward_from),
+        result_meta = VALUES(result_meta), started_at = VALUES(started_at),
+        completed_at = VALUES(completed_at)
+"""
+
+UPSERT_OUTPUT = """
+    INSERT INTO task_outputs (task_id, job_id, stdout, stderr) VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE stdout = VALUES(stdout), stderr = VALUES(stderr)
+"""
+
+UPSERT_HOST = """
+    INSERT INTO job_hosts (job_id, ip, hostname, os) VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE hostname = VALUES(hostname), os = VALUES(os)
+"""
+
+UPSERT_SERVICE = """
+    INSERT INTO job_services (job_id, ip, port, protocol, service_name, product, version)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        service_name = VALUES(service_name), product = VALUES(product), version = VALUES(version)
+"""
+
+UPSERT_VULNERABILITY = """
+    INSERT INTO job_vulnerabilities (job_id, ip, title, severity, description, evidence)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        severity = VALUES(severity), description = VALUES(description), evidence = VALUES(evidence)
+"""
+
+TASK_COLUMNS = ("task_id", "job_id", "position", "tool_name", "name", "status", "params", "dependencies",
+                "bypass_cache", "attempts", "error", "dispatch_note", "carried_forward_from",
+                "result_meta", "created_at", "started_at", "completed_at")
+
+def job_header(job: Job) -> str:
+    return job.model_dump_json(include=JOB_HEADER_FIELDS)
+
+def task_row(job: Job, position: int, task: Task) -> tuple:
+    meta = None
+    if task.result is not None:
+        meta = json.dumps({k: v for k, v in task.result.items() if k not in OUTPUT_KEYS}, default=str)
+    return (
+        str(task.id), str(job.id), position, task.tool_name, task.name, task.status.value,
+        json.dumps(task.params, default=str), json.dumps([str(d) for d in task.dependencies]),
+        task.bypass_cache, task.attempts, task.error, task.dispatch_note,
+        str(task.carried_forward_from) if task.carried_forward_from else None,
+        meta, task.created_at, task.started_at, task.completed_at,
+    )
+
+def output_row(job: Job, task: Task) -> Optional[tuple]:
+    if not task.result or not any(task.result.get(k) for k in OUTPUT_KEYS):
+        return None
+    return (str(task.id), str(job.id), task.result.get("stdout"), task.result.get("stderr"))
+
+def asset_rows(job: Job) -> Tuple[List[tuple], List[tuple], List[tuple]]:
+    """Rows of job_hosts, job_services and job_vulnerabilities."""
+    job_id = str(job.id)
+    hosts, services, vulnerabilities = [], [], []
+    for host in job.assets:
+        hosts.append((job_id, host.ip, host.hostname, host.os))
+        for service in host.services:
+            services.append((job_id, host.ip, service.port, service.protocol, service.service_name,
+                             service.product, service.version))
+        for vulnerability in host.vulnerabilities:
+            vulnerabilities.append((job_id, host.ip, vulnerability.title, vulnerability.severity.value,
+                                    vulnerability.description, vulnerability.evidence))
+    return hosts, services, vulnerabilities
+
+def _json(value: Any) -> Any:
+    if value is None:
+        return None
+    return json.loads(value) if isinstance(value, (str, bytes, bytearray)) else value
+
+def assemble_job(header: Dict[str, Any], status: str, task_rows: Iterable[Dict[str, Any]],
+                 outputs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 hosts: Iterable[Dict[str, Any]] = (), services: Iterable[Dict[str, Any]] = (),
+                 vulnerabilities: Iterable[Dict[str, Any]] = ()) -> Job:
+    """Rebuild a Job from its normalized rows (dict cursor rows).
+
+    Without `outputs`, task results lack stdout and stderr.
+    """
+    tasks = []
+    for row in sorted(task_rows, key=lambda r: r["position"]):
+        result = _json(row["result_meta"])
+        output = (outputs or {}).get(row["task_id"])
+        if output:
+            result = dict(result or {}, **{k: output[k] for k in OUTPUT_KEYS if output.get(k) is not None})
+        tasks.append(Task(
+            id=row["task_id"], tool_name=row["tool_name"], name=row["name"], status=row["status"],
+            params=_json(row["params"]), dependencies=_json(row["dependencies"]),
+            bypass_cache=bool(row["bypass_cache"]), attempts=row["attempts"], error=row["error"],
+            dispatch_note=row["dispatch_note"], carried_forward_from=row["carried_forward_from"],
+            result=result, created_at=row["created_at"], started_at=row["started_at"],
+            completed_at=row["completed_at"],
+        ))
+
+    by_ip: Dict[str, Host] = {}
+    for row in hosts:
+        by_ip[row["ip"]] = Host(ip=row["ip"], hostname=row["hostname"], os=row["os"])
+    for row in services:
+        host = by_ip.setdefault(row["ip"], Host(ip=row["ip"]))
+        host.services.append(Service(port=row["port"], protocol=row["protocol"],
+                                     service_name=row["service_name"] or "unknown",
+                                     product=row["product"], version=row["version"]))
+    for row in vulnerabilities:
+        host = by_ip.setdefault(row["ip"], Host(ip=row["ip"]))
+        host.vulnerabilities.append(Vulnerability(title=row["title"], severity=row["severity"],
+                                                  description=row["description"], evidence=row["evidence"]))
+    for host in by_ip.values():
+        host.services.sort(key=lambda s: (s.port, s.protocol))
+    return Job(**dict(header, status=status), tasks=tasks, assets=list(by_ip.values()))
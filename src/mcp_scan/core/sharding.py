@@ -0,0 +1,122 @@
+import ipaddress
+import logging
+import re
+from typing import List, Tuple
+
+from mcp_scan.config import ShardingConfig
+from mcp_scan.core.errors import InvalidTargetError
+
+logger = logging.getLogger(__name__)
+
+_RANGE_RE = re.compile(r"^(\d+\.\d+\.\d+\.)(\d+)-(\d+)$")
+
+def _split_targets(target: str) -> List[str]:
+    return [part for part in re.split(r"[,\s]+", target.strip()) if part]
+
+def _expand_range(part: str) -> List[str]:
+    """`10.0.0.1-20` or `10.0.0.1-10.0.0.20` -> individual addresses."""
+    short = _RANGE_RE.match(part)
+    if short:
+        prefix, first, last = short.groups()
+        start = ipaddress.ip_address(prefix + first)
+        end = ipaddress.ip_address(prefix + last)
+    else:
+        first, last = part.split("-", 1)
+        start, end = ipaddress.ip_address(first), ipaddress.ip_address(last)
+    if int(end) < int(start):
+        raise InvalidTargetError(part)
+    return [str(ipaddress.ip_address(n)) for n in range(int(start), int(end) + 1)]
+
+def shard_targets(target: str, hosts_per_shard: int, max_hosts: int) -> List[str]:
+    """
+    Split a target spec into nmap target strings of at most `hosts_per_shard` hosts.
+
+    CIDR blocks are split into smaller subnets, ranges and lists into groups
+    of space-separated hosts. Hostnames, URLs and anything else that is
+    not a network or range are kept as they are.
+    """
+    shards: List[str] = []
+    loose: List[str] = []
+    total = 0
+    for part in _split_targets(target):
+        # Only parts that parse as a network or an address range are expanded;
+        # URLs, hostnames like 1-800-flowers.com and the rest go to nmap as is
+        network = addresses = None
+        if "/" in part:
+            try:
+                network = ipaddress.ip_network(part, strict=False)
+            except ValueError:
+                pass
+        elif "-" in part and part[0].isdigit():
+            try:
+                addresses = _expand_range(part)
+            except ValueError:
+                pass
+        if network is not None:
+            total += network.num_addresses
+            if total > max_hosts:
+                raise InvalidTargetError(f"{target} (more than {max_hosts} hosts)")
+            # Largest subnet holding at most hosts_per_shard addresses
+            new_prefix = max(network.prefixlen, network.max_prefixlen - (hosts_per_shard.bit_length() - 1))
+            shards.extend(str(subnet) for subnet in network.subnets(new_prefix=new_prefix))
+        elif addresses is not None:
+            total += len(addresses)
+            if total > max_hosts:
+                raise InvalidTargetError(f"{target} (more than {max_hosts} hosts)")
+            loose.extend(addresses)
+        else:
+            total += 1
+            loose.append(part)
+    loose = list(dict.fromkeys(loose))
+    for i in range(0, len(loose), hosts_per_shard):
+        shards.append(" ".join(loose[i:i + hosts_per_shard]))
+    return shards
+
+def _parse_ports(ports: str) -> List[Tuple[int, int]]:
+    ranges = []
+    for part in ports.split(","):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            ranges.append((int(first), int(last)))
+        elif part:
+            ranges.append((int(part), int(part)))
+    return ranges
+
+def shard_ports(ports: str, max_ports_per_shard: int) -> List[str]:
+    """
+    Split an explicit port spec into contiguous shards of at most
+    `max_ports_per_shard` ports. Named sets such as `top-1000` stay whole.
+    """
+    if ports in ("all", "1-65535"):
+        ports = "1-65535"
+    if not ports or not all(c.isdigit() or c in ",-" for c in ports):
+        return [ports]
+    ranges = _parse_ports(ports)
+    if sum(last - first + 1 for first, last in ranges) <= max_ports_per_shard:
+        return [ports]
+
+    shards, current, size = [], [], 0
+    for first, last in ranges:
+        while first <= last:
+            take = min(last - first + 1, max_ports_per_shard - size)
+            end = first + take - 1
+            current.append(str(first) if take == 1 else f"{first}-{end}")
+            size += take
+            first = end + 1
+            if size == max_ports_per_shard:
+                shards.append(",".join(current))
+                current, size = [], 0
+    if current:
+        shards.append(",".join(current))
+    return shards
+
+def plan_scan_shards(target: str, ports: str, config: ShardingConfig) -> List[Tuple[str, str]]:
+    """(target, ports) pairs, one per nmap task."""
+    if not config.enabled:
+        return [(target, ports)]
+    targets = shard_targets(target, config.hosts_per_shard, config.max_hosts)
+    port_shards = shard_ports(ports, config.max_ports_per_shard)
+    shards = [(t, p) for t in targets for p in port_shards]
+    if len(shards) > 1:
+        logger.info(f"Sharded {target} ({ports}) into {len(shards)} nmap tasks")
+    return shards
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from mcp_scan.config import WorkerConfig
+
+logger = logging.getLogger(__name__)
+
+class WorkerInfo:
+    def __init__(self, name: str, capacity: int, tools: Optional[List[str]] = None):
+        self.id = str(uuid4())
+        self.name = name
+        self.capacity = capacity
+        # Tools the worker can run; empty means all
+        self.tools = list(tools or [])
+        self.last_seen = time.monotonic()
+        self.leases: Dict[str, Dict[str, Any]] = {}
+        # Leased tasks cancelled by the scheduler, told on the next pull or heartbeat
+        self.cancelled: List[str] = []
+        self.completed = 0
+
+    def can_run(self, tool_name: str) -> bool:
+        return not self.tools or tool_name in self.tools
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "capacity": self.capacity,
+            "tools": self.tools,
+            "running": len(self.leases),
+            "completed": self.completed,
+            "last_seen_seconds": round(time.monotonic() - self.last_seen, 1),
+        }
+
+class WorkerRegistry:
+    """Tracks remote workers and the tasks leased to them.
+
+    Workers register, heartbeat and pull tasks over HTTP (see
+    `transport/worker_api.py`); the scheduler awaits `execute()` for each task
+    it sends out. A worker that misses heartbeats for `heartbeat_timeout`
+    seconds is dropped and its leased tasks go back to the front of the queue.
+    Tasks are only queued while some worker can run their tool; queued tasks
+    no remaining worker can run are handed back to the scheduler.
+    HTTP handlers run in their own threads, so all state is guarded by a lock.
+    """
+
+    def __init__(self, config: WorkerConfig):
+        self.config = config
+        self._workers: Dict[str, WorkerInfo] = {}
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._futures: Dict[str, asyncio.Future] = {}
+        # When each leased task was handed to its worker, to time the run
+        self._leased_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def register(self, name: str, capacity: int = 1, tools: Optional[List[str]] = None) -> str:
+        worker = WorkerInfo(name, max(capacity, 1), tools)
+        with self._lock:
+            self._workers[worker.id] = worker
+        logger.info(f"Worker {name} registered as {worker.id} (capacity {worker.capacity})")
+        return worker.id
+
+    def heartbeat(self, worker_id: str) -> bool:
+        """Refresh a worker's lease; False tells the worker to register again."""
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if not worker:
+                return False
+            worker.last_seen = time.monotonic()
+            return True
+
+    def take_cancellations(self, worker_id: str) -> List[str]:
+        """Tasks the worker should stop, as the scheduler cancelled them."""
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if not worker:
+                return []
+            cancelled, worker.cancelled = worker.cancelled, []
+            return cancelled
+
+    def has_workers(self, tool_name: Optional[str] = None) -> bool:
+        """Whether any worker is registered; with `tool_name`, one that can run it."""
+        with self._lock:
+            return self._can_run(tool_name)
+
+    def _can_run(self, tool_name: Optional[str]) -> bool:
+        if tool_name is None:
+            return bool(self._workers)
+        return any(worker.can_run(tool_name) for worker in self._workers.values())
+
+    def deregister(self, worker_id: str) -> bool:
+        """Remove a worker that is shutting down; its tasks are reassigned."""
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if not worker:
+                return False
+            self._drop(worker)
+            orphaned = self._orphans()
+        logger.info(f"Worker {worker.name} ({worker_id}) deregistered")
+        _hand_back(orphaned)
+        return True
+
+    def workers(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [worker.to_dict() for worker in self._workers.values()]
+
+    def pull(self, worker_id: str, max_tasks: int = 1) -> Optional[List[Dict[str, Any]]]:
+        """Lease up to `max_tasks` queued tasks to a worker; None if unknown."""
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if not worker:
+                return None
+            worker.last_seen = time.monotonic()
+            room = min(max_tasks, worker.capacity - len(worker.leases))
+            leased, skipped = [], []
+            while self._queue and len(leased) < room:
+                item = self._queue.popleft()
+                if item["task_id"] not in self._futures:
+                    continue  # Already finished elsewhere
+                if worker.can_run(item["tool_name"]):
+                    worker.leases[item["task_id"]] = item
+                    self._leased_at[item["task_id"]] = time.monotonic()
+                    leased.append(item)
+                else:
+                    skipped.append(item)
+            self._queue.extendleft(reversed(skipped))
+            return leased
+
+    def complete(self, worker_id: str, task_id: str, result: Dict[str, Any]) -> bool:
+        """Deliver a task result from a worker. Late duplicates are ignored.
+
+        The result gets the seconds since the task was leased as `duration`.
+        """
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if worker:
+                worker.last_seen = time.monotonic()
+                if worker.leases.pop(task_id, None) is not None:
+                    worker.completed += 1
+            future = self._futures.pop(task_id, None)
+            leased_at = self._leased_at.pop(task_id, None)
+        if not future:
+            return False
+        if leased_at is not None:
+            result = dict(result, duration=round(time.monotonic() - leased_at, 3))
+        future.get_loop().call_soon_threadsafe(_resolve, future, result)
+        return True
+
+    async def execute(self, task_id: UUID, tool_name: str, params: Dict[str, Any],
+                      timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Queue a task for the workers and wait for its result.
+
+        `timeout` is sent along for the worker to apply to the tool's
+        commands. Returns None if no worker that can run the tool is left
+        before the task finished; the caller should then run the task itself.
+        """
+        key = str(task_id)
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if not self._can_run(tool_name):
+                return None
+            self._futures[key] = future
+            self._queue.append({"task_id": key, "tool_name": tool_name, "params": params, "timeout": timeout})
+        try:
+            return await future
+        finally:
+            self._forget(key)
+
+    def reap(self) -> List[str]:
+        """Drop workers that stopped heart-beating and requeue their tasks."""
+        deadline = time.monotonic() - self.config.heartbeat_timeout
+        dead = []
+        orphaned = []
+        with self._lock:
+            for worker_id, worker in list(self._workers.items()):
+                if worker.last_seen >= deadline:
+                    continue
+                self._drop(worker)
+                dead.append(worker_id)
+                logger.warning(f"Worker {worker.name} ({worker_id}) missed heartbeats; "
+                               f"requeued {len(worker.leases)} task(s)")
+            if dead:
+                orphaned = self._orphans()
+        _hand_back(orphaned)
+        return dead
+
+    def _drop(self, worker: WorkerInfo):
+        del self._workers[worker.id]
+        # Reassign ahead of tasks that have not started yet
+        self._queue.extendleft(reversed(list(worker.leases.values())))
+
+    def _orphans(self) -> List[asyncio.Future]:
+        # Queued tasks nobody left can run go back to the scheduler
+        orphaned, kept = [], deque()
+        for item in self._queue:
+            if item["task_id"] not in self._futures:
+                continue
+            if self._can_run(item["tool_name"]):
+                kept.append(item)
+            else:
+                orphaned.append(self._futures.pop(item["task_id"]))
+        self._queue = kept
+        return orphaned
+
+    def start_reaper(self):
+        if self._reaper:
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="mcp_scan-worker-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _reap_loop(self):
+        while not self._stopped.wait(self.config.heartbeat_timeout / 2):
+            self.reap()
+
+    def _forget(self, task_id: str):
+        # Drop a cancelled or finished task from the queue and any lease; a
+        # worker still running it is told to kill it
+        with self._lock:
+            self._futures.pop(task_id, None)
+            self._leased_at.pop(task_id, None)
+            for worker in self._workers.values():
+                if worker.leases.pop(task_id, None) is not None:
+                    worker.cancelled.append(task_id)
+
+def _hand_back(futures: List[asyncio.Future]):
+    for future in futures:
+        future.get_loop().call_soon_threadsafe(_resolve, future, None)
+
+def _resolve(future: asyncio.Future, result: Optional[Dict[str, Any]]):
+    if not future.done():
+        future.set_result(result)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from mcp_scan.config import PersistenceConfig
+from mcp_scan.core.dbio import AsyncDatabase
+from mcp_scan.core.models import Job, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+class JobWriter:
+    """Write-behind layer in front of `DatabaseManager.save_job`.
+
+    Saving a job only marks it dirty; repeated saves of the same job
+    coalesce, and dirty jobs are upserted together with `save_jobs` every
+    `flush_interval` seconds, or once `max_batch` are waiting. A job in a
+    final state is written at once: `save` returns the future of that
+    write (see AsyncDatabase), done once the outcome is durable. Outside
+    an event loop every save is written at once too.
+    """
+
+    def __init__(self, config: PersistenceConfig, db: AsyncDatabase):
+        self.config = config
+        self.db = db
+        self._dirty: Dict[UUID, Job] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.saves = 0
+        self.writes = 0
+        self.flushes = 0
+
+    def save(self, job: Job) -> Optional[asyncio.Future]:
+        self.saves += 1
+        if not self.config.write_behind or job.status in FINAL_STATUSES:
+            self._dirty.pop(job.id, None)
+            return self._write(job)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty.pop(job.id, None)
+            return self._write(job)
+        self._dirty[job.id] = job
+        if len(self._dirty) >= self.config.max_batch:
+            self.flush()
+        else:
+            self._schedule(loop)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop):
+        if self._timer is None:
+            self._timer = loop.call_later(self.config.flush_interval, self.flush)
+
+    def _write(self, job: Job) -> Optional[asyncio.Future]:
+        self.writes += 1
+        saved = self.db.save_job(job)
+        return saved if isinstance(saved, asyncio.Future) else None
+
+    def flush(self):
+        """Write every dirty job now, in one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._dirty:
+            return
+        jobs = list(self._dirty.values())
+        self._dirty.clear()
+        self.flushes += 1
+        self.writes += len(jobs)
+        saved = self.db.save_jobs(jobs)
+        if isinstance(saved, asyncio.Future):
+            saved.add_done_callback(lambda future: self._flushed(
+                jobs, not future.cancelled() and future.exception() is None and future.result()))
+        else:
+            self._flushed(jobs, saved)
+
+    def _flushed(self, jobs: List[Job], saved: bool):
+        if not saved:
+            # Keep them for the next flush, unless saved again meanwhile
+            for job in jobs:
+                self._dirty.setdefault(job.id, job)
+            logger.warning(f"Write of {len(jobs)} jobs failed; retrying on the next flush")
+            try:
+                self._schedule(asyncio.get_running_loop())
+            except RuntimeError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"dirty": len(self._dirty), "saves": self.saves, "writes": self.writes,
+                "batches": self.flushes}
@@ -1,6 +1,8 @@
 import logging
-from typing import Dict, Any, Optional
-from mcp_scan.command_executor import CommandExecutor
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
+from mcp_scan.command_executor import CommandExecutor, output_listener
+from mcp_scan.core.models import Host, Service
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +63,11 @@ def run_nmap(target: str, ports: str = "top-1000", timing: str = "T3", additiona
              return {"error": "Invalid additional_args", "success": False}
         command_parts.append(additional_args)
         
+    # Someone is consuming output as it arrives: have Nmap report open
+    # ports as it discovers them instead of only in the final table
+    if output_listener() is not None:
+        command_parts.append("-v")
+
     command_parts.append(target)
     
     full_command = " ".join(command_parts)
@@ -80,3 +87,95 @@ def run_nmap(target: str, ports: str = "top-1000", timing: str = "T3", additiona
     
     result["success"] = result["return_code"] == 0
     return result
+
+_REPORT_RE = re.compile(r"^Nmap scan report for (?:(\S+) \(([^)]+)\)|(\S+))")
+_PORT_RE = re.compile(r"^(\d+)/(tcp|udp)\s+open(?:\s+(\S+))?(?:\s+(.*))?$")
+_SCANNING_RE = re.compile(r"^Scanning (\S+) \(([^)]+)\)")
+_DISCOVERED_RE = re.compile(r"^Discovered open port (\d+)/(tcp|udp) on (\S+)")
+
+def parse_service_line(line: str) -> Optional[Service]:
+    """Parse one open-port line, e.g. `80/tcp open http Apache httpd 2.4.41`."""
+    match = _PORT_RE.match(line.strip())
+    if not match:
+        return None
+    port, protocol, service_name, details = match.groups()
+    product = version = None
+    if details:
+        # Product words come first, the version is the first token starting with a digit
+        tokens = details.split()
+        for i, token in enumerate(tokens):
+            if token[0].isdigit():
+                version = token
+                product = " ".join(tokens[:i]) or None
+                break
+        else:
+            product = details
+    return Service(port=int(port), protocol=protocol, service_name=service_name or "unknown",
+                   product=product, version=version)
+
+def parse_nmap_output(stdout: str, default_host: str = "") -> List[Host]:
+    """
+    Parse Nmap normal output into hosts with their open services.
+
+    Port lines seen before any `Nmap scan report for` line are attributed
+    to `default_host`.
+    """
+    hosts: List[Host] = []
+    current: Optional[Host] = None
+    for line in stdout.splitlines():
+        report = _REPORT_RE.match(line)
+        if report:
+            hostname, ip, bare = report.groups()
+            current = Host(ip=ip or bare, hostname=hostname)
+            hosts.append(current)
+            continue
+        service = parse_service_line(line)
+        if service:
+            if current is None:
+                current = Host(ip=default_host)
+                hosts.append(current)
+            current.services.append(service)
+    return hosts
+
+class NmapStreamParser:
+    """
+    Incremental parser for Nmap output read line by line.
+
+    `feed` returns `(host, service)` the first time an open port is seen,
+    either from a verbose `Discovered open port` line or from a port table.
+    """
+
+    def __init__(self, default_host: str = ""):
+        self.default_host = default_host
+        self.current: Optional[Host] = None
+        self.names: Dict[str, str] = {}  # ip -> hostname from `Scanning` lines
+        self.seen: Set[Tuple[str, int, str]] = set()
+
+    def feed(self, line: str) -> Optional[Tuple[Host, Service]]:
+        line = line.strip()
+        scanning = _SCANNING_RE.match(line)
+        if scanning:
+            self.names[scanning.group(2)] = scanning.group(1)
+            return None
+        report = _REPORT_RE.match(line)
+        if report:
+            hostname, ip, bare = report.groups()
+            self.current = Host(ip=ip or bare, hostname=hostname)
+            return None
+
+        discovered = _DISCOVERED_RE.match(line)
+        if discovered:
+            port, protocol, ip = discovered.groups()
+            host = Host(ip=ip, hostname=self.names.get(ip))
+            service = Service(port=int(port), protocol=protocol, service_name="unknown")
+        else:
+            service = parse_service_line(line)
+            if not service:
+                return None
+            host = self.current or Host(ip=self.default_host)
+
+        key = (host.ip, service.port, service.protocol)
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+        return host, service
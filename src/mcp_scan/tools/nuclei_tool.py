@@ -1,5 +1,9 @@
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import re
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
 from mcp_scan.command_executor import CommandExecutor
 
 logger = logging.getLogger(__name__)
@@ -23,15 +27,10 @@ def run_nuclei(target: str, tags: Optional[List[str]] = None) -> Dict[str, Any]:
         
     command_parts = ["nuclei", "-target", target]
     
-    if tags:
-        tags_str = ",".join(tags)
-        if all(c.isalnum() or c in "-_," for c in tags_str):
-            command_parts.append(f"-tags {tags_str}")
-        else:
-             return {"error": "Invalid tags format", "success": False}
-             
-    # Rate limit per spec: 50 requests/second
-    command_parts.append("-rate-limit 50")
+    options = _options(tags)
+    if options is None:
+        return {"error": "Invalid tags format", "success": False}
+    command_parts.extend(options)
     
     full_command = " ".join(command_parts)
     
@@ -41,3 +40,116 @@ def run_nuclei(target: str, tags: Optional[List[str]] = None) -> Dict[str, Any]:
     
     result["success"] = result["return_code"] == 0
     return result
+
+def _options(tags: Optional[List[str]]) -> Optional[List[str]]:
+    """Command options shared by single and batched runs; None if invalid."""
+    options = []
+    if tags:
+        tags_str = ",".join(tags)
+        if not all(c.isalnum() or c in "-_," for c in tags_str):
+            return None
+        options.append(f"-tags {tags_str}")
+    # Rate limit per spec: 50 requests/second
+    options.append("-rate-limit 50")
+    return options
+
+def run_nuclei_batch(targets: List[str], tags: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Scan several URLs with one Nuclei process (`-list`), so templates are
+    loaded once instead of once per target.
+
+    Args:
+        targets: URLs (http/https).
+        tags: List of tags, applied to every target.
+
+    Returns:
+        Result per target, shaped like `run_nuclei` results. Findings are
+        split by the URL they were reported for; stderr is shared.
+    """
+    invalid = [t for t in targets if not t or ";" in t or "|" in t or "\n" in t]
+    options = _options(tags)
+    if invalid or options is None:
+        error = "Invalid target format" if invalid else "Invalid tags format"
+        return {t: {"error": error, "success": False} for t in targets}
+
+    fd, list_path = tempfile.mkstemp(prefix="mcp_scan-nuclei-", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(targets) + "\n")
+        full_command = " ".join(["nuclei", "-list", list_path] + options)
+        logger.info(f"Running nuclei on {len(targets)} targets: {full_command}")
+        # Scale the default timeout with the work, up to an hour
+        executor = CommandExecutor(full_command, timeout=min(600 * len(targets), 3600))
+        result = executor.execute()
+    finally:
+        os.unlink(list_path)
+
+    success = result.get("return_code") == 0
+    findings = split_nuclei_output(result.get("stdout", ""), targets)
+    return {
+        target: dict(result, stdout=findings[target], success=success, batched=len(targets))
+        for target in targets
+    }
+
+_URL = re.compile(r"\b(https?://[^\s\]]+)")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def _url_key(url: str) -> Optional[Tuple[str, int, str]]:
+    try:
+        parts = urlsplit(url)
+        port = parts.port or _DEFAULT_PORTS.get(parts.scheme)
+    except ValueError:
+        return None
+    if not parts.hostname:
+        return None
+    return parts.hostname.lower(), port, parts.path.rstrip("/")
+
+def _netloc_key(token: str) -> Optional[Tuple[str, Optional[int]]]:
+    """(host, port) of a `host`, `host:port` or `[v6]:port` token, else None."""
+    if not token or token.startswith(("[", "(", '"')) or "/" in token:
+        return None
+    try:
+        parts = urlsplit("//" + token)
+        port = parts.port
+    except ValueError:
+        return None
+    if not parts.hostname:
+        return None
+    return parts.hostname.lower(), port
+
+def split_nuclei_output(stdout: str, targets: List[str]) -> Dict[str, str]:
+    """Demultiplex `nuclei -list` output into the lines of each target.
+
+    A finding belongs to the target with the same host and port whose path
+    is the longest prefix of the matched URL. Network, ssl and dns templates
+    report `host:port` or a bare host instead: those go to the first target
+    on that host and port, else on that host. Lines naming no target
+    (banner, progress) are dropped.
+    """
+    keys = [(target, _url_key(target)) for target in targets]
+    lines: Dict[str, List[str]] = {target: [] for target in targets}
+    for line in stdout.splitlines():
+        owners = set()
+        urls = _URL.findall(line)
+        for url in urls:
+            key = _url_key(url)
+            if key is None:
+                continue
+            matches = [(len(k[2]), target) for target, k in keys
+                       if k and k[:2] == key[:2] and (key[2] + "/").startswith(k[2] + "/")]
+            if matches:
+                owners.add(max(matches)[1])
+        if not urls:
+            for token in line.split():
+                netloc = _netloc_key(token)
+                if netloc is None:
+                    continue
+                host, port = netloc
+                on_host = [target for target, k in keys if k and k[0] == host]
+                on_port = [target for target, k in keys if k and k[0] == host and k[1] == port]
+                if on_port or on_host:
+                    owners.add((on_port or on_host)[0])
+                    break
+        for target in owners:
+            lines[target].append(line)
+    return {target: "".join(line + "\n" for line in found) for target, found in lines.items()}
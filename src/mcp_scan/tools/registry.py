@@ -0,0 +1,157 @@
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_scan.core.errors import ToolNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Third-party tools register through this entry point group, pointing at a
+# ToolSpec, a `@tool` runner, or a `@tool_factory` function returning a ToolSpec
+ENTRY_POINT_GROUP = "mcp_scan.tools"
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """What the scheduler needs to know about a tool.
+
+    `runner`, `parser` and `stream_parser` are "module:attribute" paths,
+    imported on first use so startup does not load every tool module.
+    """
+    name: str
+    runner: str
+    # `parser(stdout, default_host) -> List[Host]`, merged into job assets
+    parser: Optional[str] = None
+    # Class with `feed(line) -> Optional[(Host, Service)]` for live output
+    stream_parser: Optional[str] = None
+    # Thread pool the tool runs in (see ExecutorConfig.pool_sizes)
+    resource_class: str = "default"
+    # Approximate requests/second the tool drives against its target
+    request_rate: int = 10
+    # Seconds before the command is killed, until run history says otherwise
+    default_timeout: float = 600
+    # Whether results may be reused from the cache at all
+    cacheable: bool = True
+    # `batch_runner(targets, **params) -> {target: result}`, scanning many
+    # targets in one process; tasks differing only in "target" are batched
+    batch_runner: Optional[str] = None
+
+    def load_runner(self) -> Callable[..., Dict[str, Any]]:
+        return _resolve(self.runner)
+
+    def load_parser(self) -> Optional[Callable]:
+        return _resolve(self.parser) if self.parser else None
+
+    def load_stream_parser(self) -> Optional[Callable]:
+        return _resolve(self.stream_parser) if self.stream_parser else None
+
+    def load_batch_runner(self) -> Optional[Callable[..., Dict[str, Dict[str, Any]]]]:
+        return _resolve(self.batch_runner) if self.batch_runner else None
+
+def _resolve(path: str) -> Any:
+    # Resolved on every call: the module import is cached by Python, and
+    # the attribute lookup keeps patched or reloaded functions visible
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+_registry: Dict[str, ToolSpec] = {}
+_lock = threading.Lock()
+_entry_points_loaded = False
+
+def register_tool(spec: ToolSpec) -> ToolSpec:
+    """Add or replace a tool."""
+    with _lock:
+        _registry[spec.name] = spec
+    return spec
+
+def tool(name: str, **metadata) -> Callable:
+    """Decorator registering a runner function defined in a plugin module.
+
+        @tool("whatweb", resource_class="web", request_rate=5)
+        def run_whatweb(url: str) -> Dict[str, Any]: ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        fn.tool_spec = register_tool(ToolSpec(name=name, runner=f"{fn.__module__}:{fn.__qualname__}", **metadata))
+        return fn
+    return decorator
+
+def tool_factory(fn: Callable[[], ToolSpec]) -> Callable[[], ToolSpec]:
+    """Mark a function returning a ToolSpec, for an entry point to call.
+
+    Only marked functions are called when plugins load; anything else an
+    entry point names (a runner in particular) is never run on import.
+    """
+    fn.tool_factory = True
+    return fn
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        logger.warning(f"Could not list tool plugins: {e}")
+        return
+    for entry_point in found:
+        if entry_point.name in _registry:
+            continue
+        try:
+            loaded = entry_point.load()
+            if isinstance(loaded, ToolSpec):
+                spec = loaded
+            elif isinstance(getattr(loaded, "tool_spec", None), ToolSpec):
+                spec = loaded.tool_spec  # A @tool runner, registered by its import
+            elif callable(loaded) and getattr(loaded, "tool_factory", False):
+                spec = loaded()
+            else:
+                logger.warning(f"Tool plugin {entry_point.name} is not a ToolSpec, "
+                               f"@tool runner or @tool_factory; ignored")
+                continue
+            if isinstance(spec, ToolSpec):
+                register_tool(spec)
+        except Exception as e:
+            logger.error(f"Failed to load tool plugin {entry_point.name}: {e}")
+
+def find_tool(name: str) -> Optional[ToolSpec]:
+    """Spec of a tool, or None if no tool of that name is registered."""
+    spec = _registry.get(name)
+    if spec is None:
+        _load_entry_points()
+        spec = _registry.get(name)
+    return spec
+
+def get_tool(name: str) -> ToolSpec:
+    spec = find_tool(name)
+    if spec is None:
+        raise ToolNotFoundError(name)
+    return spec
+
+def tool_names() -> List[str]:
+    _load_entry_points()
+    return sorted(_registry)
+
+def run_tool(tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a tool by name; shared by the scheduler and remote workers."""
+    return get_tool(tool_name).load_runner()(**params)
+
+for _spec in (
+    ToolSpec("nmap", "mcp_scan.tools.nmap_tool:run_nmap",
+             parser="mcp_scan.tools.nmap_tool:parse_nmap_output",
+             stream_parser="mcp_scan.tools.nmap_tool:NmapStreamParser",
+             resource_class="network", request_rate=20, default_timeout=300),
+    # nuclei runs with `-rate-limit 50`
+    ToolSpec("nuclei", "mcp_scan.tools.nuclei_tool:run_nuclei", resource_class="web", request_rate=50,
+             batch_runner="mcp_scan.tools.nuclei_tool:run_nuclei_batch"),
+    ToolSpec("gobuster", "mcp_scan.tools.gobuster_tool:run_gobuster", resource_class="web", request_rate=10),
+    ToolSpec("sqlmap", "mcp_scan.tools.sqlmap_tool:run_sqlmap", resource_class="exploit", request_rate=5),
+    # Credential attacks and exploits have side effects, never reuse their results
+    ToolSpec("hydra", "mcp_scan.tools.hydra_tool:run_hydra", resource_class="bruteforce",
+             request_rate=4, cacheable=False),
+    ToolSpec("metasploit", "mcp_scan.tools.metasploit_tool:run_metasploit", resource_class="exploit",
+             request_rate=1, cacheable=False),
+):
+    register_tool(_spec)
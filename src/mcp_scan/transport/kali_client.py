@@ -10,16 +10,19 @@ DEFAULT_REQUEST_TIMEOUT = 300  # 5 minutes default timeout
 class KaliToolsClient:
     """Client for communicating with the Kali Linux Tools API Server"""
     
-    def __init__(self, server_url: str, timeout: int = DEFAULT_REQUEST_TIMEOUT):
+    def __init__(self, server_url: str, timeout: int = DEFAULT_REQUEST_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None):
         """
         Initialize the Kali Tools Client
         
         Args:
             server_url: URL of the Kali Tools API Server
             timeout: Request timeout in seconds
+            headers: Headers sent with every request (e.g. Authorization)
         """
         self.server_url = server_url.rstrip("/")
         self.timeout = timeout
+        self.headers = dict(headers or {})
         logger.info(f"Initialized Kali Tools Client connecting to {server_url}")
         
     def safe_get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -40,7 +43,7 @@ class KaliToolsClient:
 
         try:
             logger.debug(f"GET {url} with params: {params}")
-            response = requests.get(url, params=params, timeout=self.timeout)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -65,7 +68,7 @@ class KaliToolsClient:
         
         try:
             logger.debug(f"POST {url} with data: {json_data}")
-            response = requests.post(url, json=json_data, timeout=self.timeout)
+            response = requests.post(url, json=json_data, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
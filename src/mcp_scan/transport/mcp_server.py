@@ -1,24 +1,41 @@
 import asyncio
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, Any, List
 
 from mcp.server.fastmcp import FastMCP
 from mcp_scan.core.scheduler import Scheduler
-from mcp_scan.tools.nmap_tool import run_nmap
-from mcp_scan.tools.gobuster_tool import run_gobuster
-from mcp_scan.tools.nuclei_tool import run_nuclei
-from mcp_scan.tools.sqlmap_tool import run_sqlmap
-from mcp_scan.tools.hydra_tool import run_hydra
+from mcp_scan.core.errors import AdmissionRejectedError, InvalidPlanError, SchedulerError
+from mcp_scan.core.plans import build_plan_job
+from mcp_scan.tools.registry import get_tool
 from mcp_scan.core.models import Job, Task, TaskStatus
+from mcp_scan.config import get_config
+from mcp_scan.transport.worker_api import WorkerAPIServer
 import json
 import uuid
 
 logger = logging.getLogger(__name__)
 
-# Initialize FastMCP Server
-mcp = FastMCP("mcp_scan")
 scheduler = Scheduler()
 
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Resume jobs a previous server process left unfinished, and write
+    pending job changes on shutdown."""
+    if get_config().recovery.enabled:
+        jobs = await scheduler.recover_jobs()
+        if jobs:
+            logger.info(f"Resumed {len(jobs)} unfinished job(s)")
+    try:
+        yield {}
+    finally:
+        # Job changes still waiting for the next batched write
+        scheduler.writer.flush()
+        await scheduler.dbio.drain()
+
+# Initialize FastMCP Server
+mcp = FastMCP("mcp_scan", lifespan=lifespan)
+
 @mcp.tool()
 async def scan_nmap(target: str, ports: str = "top-1000") -> str:
     """
@@ -31,16 +48,17 @@ async def scan_nmap(target: str, ports: str = "top-1000") -> str:
     logger.info(f"MCP Tool called: scan_nmap({target}, {ports})")
     try:
         # We can either run it directly via the tool wrapper, or dispatch via scheduler.
-        # Since tools are blocking in current implementation, we wrap it in a thread.
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
-            run_nmap, 
-            target, 
-            ports, 
-            "-sV", 
-            False
-        )
+        # Since tools are blocking in current implementation, we run it in the tool's thread pool.
+        # Direct calls share the scheduler's execution slots
+        async with scheduler.limits.slot("nmap"):
+            result = await scheduler.executors.run(
+                "nmap",
+                get_tool("nmap").load_runner(),
+                target, 
+                ports, 
+                "-sV", 
+                False
+            )
         if result.get("success"):
             return result.get("stdout", "Success, but no output")
         else:
@@ -59,14 +77,14 @@ async def scan_gobuster(url: str, wordlist: str = "/usr/share/wordlists/dirb/com
     """
     logger.info(f"MCP Tool called: scan_gobuster({url})")
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
-            run_gobuster, 
-            url, 
-            wordlist,
-            False
-        )
+        async with scheduler.limits.slot("gobuster"):
+            result = await scheduler.executors.run(
+                "gobuster",
+                get_tool("gobuster").load_runner(),
+                url, 
+                wordlist,
+                False
+            )
         if result.get("success"):
             return result.get("stdout", "Success, but no output")
         else:
@@ -85,14 +103,14 @@ async def scan_nuclei(target: str, templates: str = "") -> str:
     """
     logger.info(f"MCP Tool called: scan_nuclei({target})")
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
-            run_nuclei, 
-            target, 
-            templates,
-            False
-        )
+        async with scheduler.limits.slot("nuclei"):
+            result = await scheduler.executors.run(
+                "nuclei",
+                get_tool("nuclei").load_runner(),
+                target, 
+                templates,
+                False
+            )
         if result.get("success"):
             return result.get("stdout", "Success, but no output")
         else:
@@ -114,16 +132,16 @@ async def scan_sqlmap(url: str, batch: bool = True, level: int = 1, risk: int =
     """
     logger.info(f"MCP Tool called: scan_sqlmap({url})")
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
-            run_sqlmap, 
-            url, 
-            batch,
-            level,
-            risk,
-            additional_args
-        )
+        async with scheduler.limits.slot("sqlmap"):
+            result = await scheduler.executors.run(
+                "sqlmap",
+                get_tool("sqlmap").load_runner(),
+                url, 
+                batch,
+                level,
+                risk,
+                additional_args
+            )
         if result.get("success"):
             return result.get("stdout", "Success, but no output")
         else:
@@ -146,17 +164,17 @@ async def scan_hydra(target: str, service: str, username: str = "", user_list: s
     """
     logger.info(f"MCP Tool called: scan_hydra({target}, {service})")
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
-            run_hydra, 
-            target, 
-            service,
-            username if username else None,
-            user_list if user_list else None,
-            password if password else None,
-            pass_list if pass_list else None
-        )
+        async with scheduler.limits.slot("hydra"):
+            result = await scheduler.executors.run(
+                "hydra",
+                get_tool("hydra").load_runner(),
+                target, 
+                service,
+                username if username else None,
+                user_list if user_list else None,
+                password if password else None,
+                pass_list if pass_list else None
+            )
         if result.get("success"):
             return result.get("stdout", "Success, but no output")
         else:
@@ -165,52 +183,133 @@ async def scan_hydra(target: str, service: str, username: str = "", user_list: s
         return f"Tool execution failed: {e}"
 
 @mcp.tool()
-async def submit_ai_dag_plan(target: str, task_sequence: str) -> str:
+async def submit_ai_dag_plan(target: str, task_sequence: str, priority: int = 5) -> str:
     """
     Submit a custom DAG (Directed Acyclic Graph) of tasks planned by AI for execution.
     This fulfills the 'AI Decomposes Goals into executable task DAGs' requirement.
     
     Args:
         target: Target IP or URL.
-        task_sequence: JSON string representing a list of tasks to run sequentially.
-                       Format: [{"tool_name": "nmap", "params": {"ports": "80,443"}}, ...]
-                       Supported tools: 'nmap', 'gobuster', 'nuclei', 'sqlmap', 'hydra'.
+        task_sequence: JSON string representing a list of steps.
+                       Task step: {"id": "web", "tool_name": "nuclei", "params": {...},
+                                   "depends_on": ["scan"]}
+                       Group step: {"id": "checks", "parallel": [step, ...], "depends_on": ["scan"]}
+                       runs its steps side by side; depending on the group waits for all of them.
+                       Steps without depends_on start right away, so independent scans run
+                       in parallel. If no step uses depends_on or parallel, steps run one after
+                       another: [{"tool_name": "nmap", "params": {"ports": "80,443"}}, ...]
+                       Add "bypass_cache": true to a task to skip cached results.
+                       Supported tools: 'nmap', 'gobuster', 'nuclei', 'sqlmap', 'hydra',
+                       'metasploit', plus any installed tool plugins.
+        priority: Job priority from 1 (lowest) to 10 (most urgent). Default: 5.
+
+    Plans with unknown tools, unknown ids or dependency cycles are rejected.
+    When the scanner is busy the job waits in a queue; when the queue is
+    full the plan is rejected and should be resubmitted after the given delay.
     """
     logger.info(f"MCP Tool called: submit_ai_dag_plan({target})")
     try:
-        tasks_data = json.loads(task_sequence)
-        job = Job(target=target)
+        scheduler.admission.check()
+    except AdmissionRejectedError as e:
+        return f"Rejected: {e.message}. The job was not created."
+    try:
+        job = build_plan_job(target, json.loads(task_sequence), priority)
         scheduler.jobs[job.id] = job
+        scheduler.dbio.save_job(job)
         
-        # Link tasks sequentially for MVP DAG
-        prev_task_id = None
-        for t_data in tasks_data:
-            tool_name = t_data.get("tool_name")
-            params = t_data.get("params", {})
-            params["target"] = params.get("target", target) # Auto-inject target if missing
-            
-            task = Task(tool_name=tool_name, params=params)
-            if prev_task_id:
-                task.dependencies.append(prev_task_id)
-            
-            job.tasks.append(task)
-            prev_task_id = task.id
-            
-        scheduler.db.save_job(job)
-        
-        # Start scheduler asynchronously
-        asyncio.create_task(scheduler.run_job(job.id))
-        
+        # Runs in the background once admission control lets it start
+        admission = scheduler.submit_job(job)
+        if admission.position:
+            return (f"AI DAG plan accepted and queued at position {admission.position}. "
+                    f"Job ID: {job.id}. It starts when a running job finishes.")
         return f"AI DAG plan submitted successfully! Job ID: {job.id}. You can check status later via CLI."
     except json.JSONDecodeError:
         return "Error: task_sequence must be a valid JSON array."
+    except InvalidPlanError as e:
+        return f"Error: {e.message}"
     except Exception as e:
         return f"Error scheduling DAG plan: {e}"
 
+@mcp.tool()
+async def submit_batch(targets: str, priority: int = 5) -> str:
+    """
+    Start the default scan (nmap, then web follow-ups) on many targets at once,
+    one job per target, created together.
+
+    Args:
+        targets: JSON array of targets, or targets separated by newlines or commas.
+        priority: Priority of every job, 1 (lowest) to 10 (most urgent). Default: 5.
+
+    The whole batch is rejected, with a retry-after delay, if it does not fit
+    under the scanner's running and queued job limits.
+    """
+    try:
+        parsed = json.loads(targets)
+    except json.JSONDecodeError:
+        parsed = targets.replace(",", "\n").splitlines()
+    if not isinstance(parsed, list):
+        return "Error: targets must be a JSON array or a newline/comma separated list."
+    unique = list(dict.fromkeys(str(t).strip() for t in parsed if str(t).strip()))
+    logger.info(f"MCP Tool called: submit_batch({len(unique)} targets)")
+    if not unique:
+        return "Error: no targets given."
+    try:
+        scheduler.admission.check(len(unique))
+        jobs = await scheduler.create_jobs(unique, priority=priority)
+        admissions = scheduler.submit_jobs(jobs, force=True)
+    except AdmissionRejectedError as e:
+        return f"Rejected: {e.message}. No job was created."
+    except SchedulerError as e:
+        return f"Error: {e.message}"
+    except Exception as e:
+        return f"Error creating jobs: {e}"
+    queued = sum(1 for a in admissions if a.position)
+    return json.dumps({
+        "created": len(jobs),
+        "running": len(jobs) - queued,
+        "queued": queued,
+        "jobs": {job.target: str(job.id) for job in jobs},
+    }, indent=2)
+
+@mcp.tool()
+async def scheduler_stats() -> str:
+    """
+    Report scheduler load: execution slots in use, per-target load,
+    queued tasks and executor pool saturation.
+    """
+    return json.dumps(scheduler.get_stats(), indent=2)
+
+@mcp.tool()
+async def control_job(job_id: str, action: str, task_id: str = "") -> str:
+    """
+    Cancel, pause or resume a scan job, or a single task of it.
+
+    Args:
+        job_id: ID of the job.
+        action: 'cancel' (kills running tools), 'pause' (no new tasks start),
+                'preempt' (pause and stop running tasks, which rerun on resume)
+                or 'resume'.
+        task_id: Optional task ID to act on one task only. Cancelling a task
+                 also cancels the tasks depending on it.
+    """
+    logger.info(f"MCP Tool called: control_job({job_id}, {action}, {task_id})")
+    try:
+        changed = await scheduler.control_async(uuid.UUID(job_id), action, uuid.UUID(task_id) if task_id else None)
+    except ValueError:
+        return "Error: job_id and task_id must be valid UUIDs."
+    except Exception as e:
+        return f"Error: {e}"
+    if not changed:
+        return f"Nothing to {action}: the job or task is not in a state that allows it."
+    return f"{action} applied to job {job_id}" + (f" task {task_id}" if task_id else "") + "."
 
 def start_server():
     """Start the MCP server on stdio."""
     logger.info("Starting MCP Scan Server")
+    config = get_config().workers
+    if config.enabled:
+        # Let remote workers register and pull tasks from this scheduler
+        WorkerAPIServer(scheduler.workers, config.host, config.port, config.token).start()
     mcp.run()
 
 if __name__ == "__main__":
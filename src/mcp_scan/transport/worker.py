@@ -0,0 +1,126 @@
+import logging
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_scan.command_executor import CancelScope, cancel_scope, command_timeout
+from mcp_scan.transport.kali_client import KaliToolsClient
+
+logger = logging.getLogger(__name__)
+
+class ScanWorker:
+    """Worker process that pulls tasks from a scheduler and runs them locally."""
+
+    def __init__(self, scheduler_url: str, name: Optional[str] = None, capacity: int = 2,
+                 tools: Optional[List[str]] = None,
+                 runner: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                 heartbeat_interval: float = 5.0, poll_interval: float = 1.0, token: Optional[str] = None):
+        """
+        Initialize the worker
+
+        Args:
+            scheduler_url: URL of the scheduler's worker API
+            name: Worker name shown by the scheduler (default: hostname)
+            capacity: Number of tasks run at the same time
+            tools: Tools this worker can run (default: all)
+            runner: Function running one task, `runner(tool_name, params)`
+            heartbeat_interval: Seconds between heartbeats
+            poll_interval: Seconds to wait before polling again when idle
+            token: Shared secret of the scheduler's worker API
+        """
+        if runner is None:
+            from mcp_scan.tools.registry import run_tool
+            runner = run_tool
+        self.client = KaliToolsClient(scheduler_url, timeout=30,
+                                      headers={"Authorization": f"Bearer {token}"} if token else None)
+        self.name = name or socket.gethostname()
+        self.capacity = capacity
+        self.tools = tools or []
+        self.runner = runner
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.worker_id: Optional[str] = None
+        self._running = 0
+        # Kill switches of the tasks running here, by task id
+        self._scopes: Dict[str, CancelScope] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def register(self) -> bool:
+        response = self.client.safe_post("api/workers/register", {
+            "name": self.name, "capacity": self.capacity, "tools": self.tools})
+        self.worker_id = response.get("worker_id")
+        if self.worker_id:
+            logger.info(f"Registered with scheduler as {self.worker_id}")
+        return bool(self.worker_id)
+
+    def run(self):
+        """Register, then pull and run tasks until `stop()` is called."""
+        while not self.register():
+            if self._stopped.wait(self.poll_interval):
+                return
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+
+        with ThreadPoolExecutor(max_workers=self.capacity, thread_name_prefix="mcp_scan-worker") as pool:
+            while not self._stopped.is_set():
+                with self._lock:
+                    free = self.capacity - self._running
+                tasks = self._pull(free) if free > 0 else []
+                for item in tasks:
+                    with self._lock:
+                        self._running += 1
+                    pool.submit(self._run_task, item)
+                if not tasks:
+                    self._stopped.wait(self.poll_interval)
+        # Hand back queued tasks this worker would have been the only one to run
+        self.client.safe_post("api/workers/deregister", {"worker_id": self.worker_id})
+
+    def stop(self):
+        self._stopped.set()
+
+    def _pull(self, max_tasks: int) -> List[Dict[str, Any]]:
+        response = self.client.safe_post("api/tasks/pull", {"worker_id": self.worker_id, "max_tasks": max_tasks})
+        self._cancel(response.get("cancel", []))
+        if response.get("registered") is False:
+            # The scheduler dropped us (missed heartbeats or restart)
+            self.register()
+            return []
+        return response.get("tasks", [])
+
+    def _cancel(self, task_ids: List[str]):
+        """Kill the process trees of tasks the scheduler cancelled."""
+        for task_id in task_ids:
+            with self._lock:
+                scope = self._scopes.get(task_id)
+            if scope:
+                logger.info(f"Cancelling task {task_id} on scheduler request")
+                scope.cancel()
+
+    def _run_task(self, item: Dict[str, Any]):
+        scope = CancelScope()
+        with self._lock:
+            self._scopes[item["task_id"]] = scope
+        try:
+            logger.info(f"Running {item['tool_name']} ({item['task_id']})")
+            try:
+                # The scheduler's adaptive timeout for this task, if it sent one
+                with cancel_scope(scope), command_timeout(item.get("timeout")):
+                    result = self.runner(item["tool_name"], item.get("params") or {})
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if not scope.cancelled:
+                self.client.safe_post("api/tasks/result", {
+                    "worker_id": self.worker_id, "task_id": item["task_id"], "result": result})
+        finally:
+            with self._lock:
+                self._scopes.pop(item["task_id"], None)
+                self._running -= 1
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            response = self.client.safe_post("api/workers/heartbeat", {"worker_id": self.worker_id})
+            self._cancel(response.get("cancel", []))
+            if response.get("registered") is False:
+                self.register()
@@ -0,0 +1,113 @@
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from mcp_scan.core.errors import MCPScanError
+from mcp_scan.core.workers import WorkerRegistry
+
+logger = logging.getLogger(__name__)
+
+class _WorkerAPIHandler(BaseHTTPRequestHandler):
+    # Set on the subclass built by WorkerAPIServer
+    registry: WorkerRegistry = None
+    token: str = ""
+
+    def _authorized(self) -> bool:
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode()):
+            return True
+        self._reply(401, {"error": "Missing or invalid worker token", "success": False})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", "workers": self.registry.workers()})
+        else:
+            self._reply(404, {"error": f"Unknown endpoint: {self.path}", "success": False})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._reply(400, {"error": "Invalid JSON body", "success": False})
+            return
+
+        if self.path == "/api/workers/register":
+            worker_id = self.registry.register(
+                data.get("name", "worker"), int(data.get("capacity", 1)), data.get("tools"))
+            self._reply(200, {"worker_id": worker_id, "success": True})
+        elif self.path == "/api/workers/heartbeat":
+            worker_id = data.get("worker_id", "")
+            registered = self.registry.heartbeat(worker_id)
+            self._reply(200, {"registered": registered, "cancel": self.registry.take_cancellations(worker_id),
+                              "success": True})
+        elif self.path == "/api/workers/deregister":
+            removed = self.registry.deregister(data.get("worker_id", ""))
+            self._reply(200, {"removed": removed, "success": True})
+        elif self.path == "/api/tasks/pull":
+            worker_id = data.get("worker_id", "")
+            tasks = self.registry.pull(worker_id, int(data.get("max_tasks", 1)))
+            if tasks is None:
+                self._reply(200, {"registered": False, "tasks": [], "success": True})
+            else:
+                self._reply(200, {"registered": True, "tasks": tasks,
+                                  "cancel": self.registry.take_cancellations(worker_id), "success": True})
+        elif self.path == "/api/tasks/result":
+            accepted = self.registry.complete(
+                data.get("worker_id", ""), data.get("task_id", ""), data.get("result") or {})
+            self._reply(200, {"accepted": accepted, "success": True})
+        else:
+            self._reply(404, {"error": f"Unknown endpoint: {self.path}", "success": False})
+
+    def _reply(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("worker api: " + format % args)
+
+class WorkerAPIServer:
+    """HTTP endpoints through which remote workers talk to the scheduler.
+
+    Task parameters carry targets and credentials, so every request must
+    present the shared `token`.
+    """
+
+    def __init__(self, registry: WorkerRegistry, host: str = "127.0.0.1", port: int = 8765,
+                 token: Optional[str] = None):
+        if not token:
+            raise MCPScanError("The worker API needs workers.token to be set", "E5002")
+        handler = type("WorkerAPIHandler", (_WorkerAPIHandler,), {"registry": registry, "token": token})
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread."""
+        self.registry.start_reaper()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mcp_scan-worker-api", daemon=True)
+        self._thread.start()
+        logger.info(f"Worker API listening on {self.url}")
+
+    def stop(self):
+        self.registry.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -15,9 +15,9 @@ class IntegrationTest(unittest.TestCase):
         
         self.scheduler = Scheduler()
 
-    @patch('mcp_scan.core.scheduler.run_gobuster')
-    @patch('mcp_scan.core.scheduler.run_nuclei')
-    @patch('mcp_scan.core.scheduler.run_nmap')
+    @patch('mcp_scan.tools.gobuster_tool.run_gobuster')
+    @patch('mcp_scan.tools.nuclei_tool.run_nuclei')
+    @patch('mcp_scan.tools.nmap_tool.run_nmap')
     def test_full_scan_flow(self, mock_nmap, mock_nuclei, mock_gobuster):
         # Setup mocks to return immediately
         mock_nmap.return_value = {"success": True, "return_code": 0, "stdout": "80/tcp open", "stderr": ""}
@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+from mcp_scan.config import AdmissionConfig, MCPConfig
+from mcp_scan.core.admission import AdmissionController
+from mcp_scan.core.errors import AdmissionRejectedError
+from mcp_scan.core.models import Job, Task, TaskStatus
+from mcp_scan.core.scheduler import Scheduler
+
+class TestAdmissionController(unittest.TestCase):
+    def test_queue_order_and_rejection(self):
+        async def run():
+            controller = AdmissionController(AdmissionConfig(max_running_jobs=1, max_queued_jobs=2, retry_after=30))
+            running, low, urgent = Job(target="a"), Job(target="b", priority=2), Job(target="c", priority=9)
+            self.assertEqual(controller.submit(running)[0], 0)
+            _, low_turn = controller.submit(low)
+            self.assertEqual(controller.submit(urgent)[0], 1)  # Ahead of the low priority job
+            self.assertEqual(controller.position(low.id), 2)
+
+            with self.assertRaises(AdmissionRejectedError) as raised:
+                controller.submit(Job(target="d"))
+            self.assertEqual(raised.exception.retry_after, 30)
+            self.assertEqual(raised.exception.code, "E3002")
+
+            controller.finished(running.id)
+            self.assertEqual(list(controller.running), [urgent.id])
+            self.assertFalse(low_turn.done())
+            self.assertEqual(controller.stats()["queued"], 1)
+        asyncio.run(run())
+
+    def test_batch_is_admitted_whole_or_not_at_all(self):
+        async def run():
+            controller = AdmissionController(AdmissionConfig(max_running_jobs=2, max_queued_jobs=3))
+            self.assertEqual(controller.capacity(), 5)
+            with self.assertRaises(AdmissionRejectedError) as raised:
+                controller.check(6)
+            self.assertIn("Room for 5 more jobs, 6 submitted", raised.exception.message)
+            controller.check(5)
+        asyncio.run(run())
+
+class TestSchedulerAdmission(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('mcp_scan.core.scheduler.get_db')
+        self.mock_db = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.scheduler = Scheduler()
+        self.scheduler.admission.config = AdmissionConfig(max_running_jobs=1, max_queued_jobs=1)
+
+    def _job(self, target):
+        job = Job(target=target)
+        job.add_task(Task(tool_name="nmap", params={"target": target}))
+        self.scheduler.jobs[job.id] = job
+        return job
+
+    def test_queued_job_starts_when_running_job_ends(self):
+        order = []
+
+        def fake_tool(tool_name, params):
+            order.append(params["target"])
+            return {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            first, second, third = self._job("10.0.0.1"), self._job("10.0.0.2"), self._job("10.0.0.3")
+            admitted = [self.scheduler.submit_job(first), self.scheduler.submit_job(second)]
+            with self.assertRaises(AdmissionRejectedError):
+                self.scheduler.submit_job(third)
+            self.assertEqual([a.position for a in admitted], [0, 1])
+            await asyncio.wait_for(asyncio.gather(*(a.runner for a in admitted)), timeout=2.0)
+            return first, second
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            first, second = asyncio.run(run())
+
+        self.assertEqual(order, ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual((first.status, second.status), (TaskStatus.COMPLETED, TaskStatus.COMPLETED))
+        self.assertEqual(self.scheduler.admission.stats()["running"], 0)
+
+    def test_cancel_queued_job(self):
+        async def run():
+            blocker, queued = self._job("10.0.0.1"), self._job("10.0.0.2")
+            self.scheduler.admission.submit(blocker)  # Holds the only running slot
+            admission = self.scheduler.submit_job(queued)
+            self.assertTrue(self.scheduler.control(queued.id, "cancel"))
+            await asyncio.wait([admission.runner], timeout=1.0)
+            self.assertTrue(admission.runner.cancelled())
+            return queued
+
+        queued = asyncio.run(run())
+        self.assertEqual(queued.status, TaskStatus.CANCELLED)
+        self.assertEqual(queued.tasks[0].status, TaskStatus.CANCELLED)
+        self.assertIsNone(self.scheduler.admission.position(queued.id))
+
+class TestBatchView(unittest.TestCase):
+    def test_large_batch_renders_quickly(self):
+        with patch('mcp_scan.core.scheduler.get_db'):
+            from mcp_scan import cli
+            config = MCPConfig()
+            config.admission.max_running_jobs = 1
+            config.admission.max_queued_jobs = 5000
+            scheduler = Scheduler(config)
+        jobs = [Job(target=f"10.0.{i // 256}.{i % 256}") for i in range(5001)]
+
+        async def run():
+            for job in jobs:
+                scheduler.admission.submit(job)
+            with patch.object(cli, 'scheduler', scheduler):
+                began = time.monotonic()
+                table = cli.generate_batch_table(jobs)
+                return table, time.monotonic() - began
+
+        table, elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(list(table.columns[0].cells), ["[dim]queued[/dim]", "[yellow]pending[/yellow]"])
+        self.assertEqual(list(table.columns[1].cells), ["5000", "1"])
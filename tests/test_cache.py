@@ -0,0 +1,153 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from mcp_scan.config import CacheConfig, MCPConfig, PersistenceConfig
+from mcp_scan.core.cache import ResultCache, cache_key
+from mcp_scan.core.dbio import AsyncDatabase
+from mcp_scan.core.models import TaskStatus
+from mcp_scan.core.scheduler import Scheduler
+
+OK = {"success": True, "return_code": 0, "stdout": "22/tcp open ssh", "stderr": ""}
+
+class TestResultCache(unittest.TestCase):
+    def test_key_is_normalized(self):
+        self.assertEqual(cache_key("nmap", {"target": "10.0.0.1 ", "ports": "top-1000"}),
+                         cache_key("nmap", {"ports": "top-1000", "target": "10.0.0.1"}))
+        self.assertNotEqual(cache_key("nmap", {"target": "10.0.0.1"}),
+                            cache_key("nmap", {"target": "10.0.0.2"}))
+
+    def test_ttl_and_uncacheable_tools(self):
+        cache = ResultCache(CacheConfig(ttl={"nmap": 60, "hydra": 0}))
+        cache.put("nmap", {"target": "10.0.0.1"}, OK)
+        cache.put("hydra", {"target": "10.0.0.1"}, OK)
+        self.assertTrue(cache.get("nmap", {"target": "10.0.0.1"})["cached"])
+        self.assertIsNone(cache.get("hydra", {"target": "10.0.0.1"}))
+
+        with patch('mcp_scan.core.cache.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get("nmap", {"target": "10.0.0.1"}))
+
+    def test_failures_are_not_cached(self):
+        cache = ResultCache(CacheConfig())
+        cache.put("nmap", {"target": "10.0.0.1"}, {"success": False, "return_code": 1})
+        cache.put("nmap", {"target": "10.0.0.2"}, dict(OK, timed_out=True))
+        self.assertIsNone(cache.get("nmap", {"target": "10.0.0.1"}))
+        self.assertIsNone(cache.get("nmap", {"target": "10.0.0.2"}))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(CacheConfig(max_entries=2))
+        for i in range(3):
+            cache.put("nmap", {"target": f"10.0.0.{i}"}, OK)
+            if i == 1:
+                cache.get("nmap", {"target": "10.0.0.0"})  # keep 10.0.0.0 recent
+        self.assertIsNotNone(cache.get("nmap", {"target": "10.0.0.0"}))
+        self.assertIsNone(cache.get("nmap", {"target": "10.0.0.1"}))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_disk_store_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = CacheConfig(path=os.path.join(tmp, "cache.db"))
+            first = ResultCache(config)
+            first.put("nmap", {"target": "10.0.0.1"}, OK)
+            first.close()
+
+            second = ResultCache(config)
+            self.assertEqual(second.get("nmap", {"target": "10.0.0.1"})["stdout"], OK["stdout"])
+            second.close()
+
+    def test_disk_store_io_runs_off_the_loop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = CacheConfig(path=os.path.join(tmp, "cache.db"))
+            threads = []
+            first = ResultCache(config, AsyncDatabase(PersistenceConfig(), MagicMock()))
+            store = first._store
+            first._store = lambda *args: (threads.append(threading.get_ident()), store(*args))
+
+            async def write():
+                first.put("nmap", {"target": "10.0.0.1"}, OK)
+                await first.io.drain()
+
+            asyncio.run(write())
+            self.assertEqual(len(threads), 1)
+            self.assertNotEqual(threads[0], threading.get_ident())
+            first.close()
+
+            second = ResultCache(config, AsyncDatabase(PersistenceConfig(), MagicMock()))
+            # Memory only, without counting a miss the disk may still answer
+            self.assertIsNone(second.get("nmap", {"target": "10.0.0.1"}, disk=False))
+            result = asyncio.run(second.load("nmap", {"target": "10.0.0.1"}))
+            self.assertTrue(result["cached"])
+            self.assertEqual(second.stats(), {"entries": 1, "hits": 1, "misses": 0})
+            second.close()
+
+    def test_expired_rows_are_purged_periodically(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(CacheConfig(path=os.path.join(tmp, "cache.db"), purge_interval=60))
+            cache.put("nmap", {"target": "10.0.0.1"}, OK)
+            later = time.time() + 3601
+            with patch('mcp_scan.core.cache.time.time', return_value=later - 3000):
+                # Within the purge interval: the expired row is only skipped
+                cache.put("nuclei", {"target": "10.0.0.1"}, OK)
+            rows = cache._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            self.assertEqual(rows, 2)
+            with patch('mcp_scan.core.cache.time.time', return_value=later):
+                self.assertIsNone(cache.get("nmap", {"target": "10.0.0.1"}))
+                cache.put("gobuster", {"target": "10.0.0.1"}, OK)
+            rows = cache._conn.execute("SELECT tool FROM results").fetchall()
+            self.assertEqual(sorted(tool for tool, in rows), ["gobuster", "nuclei"])
+            plan = cache._conn.execute(
+                "EXPLAIN QUERY PLAN DELETE FROM results WHERE expires_at <= 0").fetchall()
+            self.assertIn("idx_results_expires", str(plan))
+            cache.close()
+
+class TestSchedulerCache(unittest.TestCase):
+    def setUp(self):
+        self.db_patcher = patch('mcp_scan.core.scheduler.get_db')
+        self.db_patcher.start().return_value = MagicMock()
+        self.addCleanup(self.db_patcher.stop)
+        self.scheduler = Scheduler(MCPConfig())
+
+    @patch('mcp_scan.tools.nmap_tool.run_nmap')
+    def test_repeated_scan_is_served_from_cache(self, mock_nmap):
+        mock_nmap.return_value = OK
+
+        async def run(bypass_cache=False):
+            job = await self.scheduler.create_job("10.0.0.1", bypass_cache=bypass_cache)
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+        self.assertEqual(mock_nmap.call_count, 1)
+        self.assertNotIn("cached", first.tasks[0].result)
+        self.assertTrue(second.tasks[0].result["cached"])
+        self.assertEqual(second.tasks[0].status, TaskStatus.COMPLETED)
+
+        asyncio.run(run(bypass_cache=True))
+        self.assertEqual(mock_nmap.call_count, 2)
+
+    @patch('mcp_scan.tools.nmap_tool.run_nmap')
+    def test_result_on_disk_is_served_to_a_new_scheduler(self, mock_nmap):
+        mock_nmap.return_value = OK
+
+        async def run(scheduler):
+            job = await scheduler.create_job("10.0.0.1")
+            await asyncio.wait_for(scheduler.run_job(job.id), timeout=2.0)
+            await scheduler.dbio.drain()
+            return job
+
+        with tempfile.TemporaryDirectory() as tmp:
+            config = MCPConfig()
+            config.cache.path = os.path.join(tmp, "cache.db")
+            for _ in range(2):
+                scheduler = Scheduler(config)
+                job = asyncio.run(run(scheduler))
+                scheduler.cache.close()
+        self.assertEqual(mock_nmap.call_count, 1)
+        self.assertTrue(job.tasks[0].result["cached"])
+
+if __name__ == '__main__':
+    unittest.main()
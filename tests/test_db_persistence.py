@@ -4,8 +4,9 @@ from uuid import uuid4
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
-from mcp_scan.core.models import Job, TaskStatus
+from mcp_scan.core.models import Job, Task, TaskStatus, Host, Service
 from mcp_scan.core.db import DatabaseManager
+from mcp_scan.core import schema
 
 class TestDBPersistence(unittest.TestCase):
     def setUp(self):
@@ -81,5 +82,112 @@ class TestDBPersistence(unittest.TestCase):
         self.assertEqual(job.status, TaskStatus.COMPLETED)
         self.assertEqual(str(job.id), str(job_id))
 
+    @patch('mcp_scan.core.db.get_config')
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    def test_get_latest_job(self, mock_pool_cls, mock_get_config):
+        mock_pool_cls.return_value = self.mock_pool
+        db = DatabaseManager()
+
+        job = Job(target="example.com", status=TaskStatus.COMPLETED)
+        self.mock_cursor.fetchone.return_value = {"result_data": job.model_dump_json()}
+
+        latest = db.get_latest_job("example.com")
+
+        query, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("ORDER BY created_at DESC", query)
+        self.assertEqual(params, ("example.com", "completed"))
+        self.assertEqual(latest.id, job.id)
+
+    @patch('mcp_scan.core.db.get_config')
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    def test_save_jobs_in_one_transaction(self, mock_pool_cls, mock_get_config):
+        mock_pool_cls.return_value = self.mock_pool
+        db = DatabaseManager()
+        jobs = [Job(target=f"10.0.0.{i}") for i in range(3)]
+
+        self.assertTrue(db.save_jobs(jobs))
+
+        query, rows = self.mock_cursor.executemany.call_args[0]
+        self.assertIn("INSERT INTO job_results", query)
+        self.assertEqual([row[0] for row in rows], [str(job.id) for job in jobs])
+        self.mock_conn.commit.assert_called_once()
+
+    def _queries(self, method):
+        return [call[0][0] for call in method.call_args_list]
+
+    @patch('mcp_scan.core.db.get_config')
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    def test_save_job_writes_only_changed_rows(self, mock_pool_cls, mock_get_config):
+        mock_pool_cls.return_value = self.mock_pool
+        db = DatabaseManager()
+        job = Job(target="127.0.0.1", tasks=[Task(tool_name="nmap"), Task(tool_name="nuclei")])
+        db.save_job(job)
+        self.mock_cursor.reset_mock()
+
+        job.tasks[0].status = TaskStatus.RUNNING
+        db.save_job(job)
+
+        queries = self._queries(self.mock_cursor.execute)
+        self.assertEqual(len(queries), 2)
+        self.assertIn("INSERT INTO job_tasks", queries[0])
+        self.assertEqual(self.mock_cursor.execute.call_args_list[0][0][1][0], str(job.tasks[0].id))
+        self.assertIn("INSERT INTO job_results", queries[1])
+        self.mock_cursor.executemany.assert_not_called()
+
+        # The job row keeps only the header; tasks have their own table
+        header = json.loads(self.mock_cursor.execute.call_args[0][1][2])
+        self.assertNotIn("tasks", header)
+        self.assertEqual(header["status"], "pending")
+
+    @patch('mcp_scan.core.db.get_config')
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    def test_get_job_from_normalized_tables(self, mock_pool_cls, mock_get_config):
+        mock_pool_cls.return_value = self.mock_pool
+        db = DatabaseManager()
+        job = Job(target="127.0.0.1", tasks=[Task(tool_name="nmap", status=TaskStatus.COMPLETED,
+                                                   result={"stdout": "22/tcp open", "return_code": 0})],
+                  assets=[Host(ip="127.0.0.1", services=[Service(port=22, protocol="tcp", service_name="ssh")])])
+        task_rows = [dict(zip(schema.TASK_COLUMNS, schema.task_row(job, 0, job.tasks[0])))]
+        task_id, job_id, stdout, stderr = schema.output_row(job, job.tasks[0])
+        outputs = [{"task_id": task_id, "job_id": job_id, "stdout": stdout, "stderr": stderr}]
+        hosts = [{"job_id": job_id, "ip": "127.0.0.1", "hostname": None, "os": None}]
+        services = [{"job_id": job_id, "ip": "127.0.0.1", "port": 22, "protocol": "tcp",
+                     "service_name": "ssh", "product": None, "version": None}]
+        self.mock_cursor.fetchone.return_value = {
+            "job_id": job_id, "status": "completed", "result_data": schema.job_header(job), "schema_version": 1}
+
+        self.mock_cursor.fetchall.side_effect = [task_rows, outputs, hosts, services, []]
+        loaded = db.get_job(job.id)
+        self.assertEqual(loaded.status, TaskStatus.COMPLETED)
+        self.assertEqual(loaded.tasks[0].result, {"stdout": "22/tcp open", "return_code": 0})
+        self.assertEqual(loaded.assets[0].services[0].port, 22)
+
+        # The summary skips tool output and assets
+        self.mock_cursor.fetchall.side_effect = [task_rows]
+        summary = db.get_job(job.id, full=False)
+        self.assertEqual(summary.tasks[0].result, {"return_code": 0})
+        self.assertEqual(summary.assets, [])
+        self.assertNotIn("task_outputs", self._queries(self.mock_cursor.execute)[-1])
+
+    @patch('mcp_scan.core.db.get_config')
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    def test_migrate_legacy_jobs(self, mock_pool_cls, mock_get_config):
+        mock_pool_cls.return_value = self.mock_pool
+        db = DatabaseManager()
+        job = Job(target="127.0.0.1", tasks=[Task(tool_name="nmap")])
+        legacy = {"job_id": str(job.id), "status": "pending", "result_data": job.model_dump_json(),
+                  "schema_version": None}
+        broken = {"job_id": "broken", "status": "pending", "result_data": "{", "schema_version": None}
+        self.mock_cursor.fetchall.side_effect = [[legacy, broken], []]
+
+        self.assertEqual(db.migrate_legacy_jobs(batch_size=10), 1)
+
+        queries = self._queries(self.mock_cursor.execute)
+        self.assertTrue(any("INSERT INTO job_tasks" in q for q in queries))
+        self.assertTrue(any("INSERT INTO job_results" in q for q in queries))
+        query, rows = self.mock_cursor.executemany.call_args[0]
+        self.assertIn("schema_version = 0", query)
+        self.assertEqual(rows, [("broken",)])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from mcp_scan.config import PersistenceConfig
+from mcp_scan.core.db import DatabaseManager
+from mcp_scan.core.dbio import AsyncDatabase
+from mcp_scan.core.models import Job, TaskStatus
+from mcp_scan.core.writer import JobWriter
+
+class TestAsyncDatabase(unittest.TestCase):
+    def test_slow_database_does_not_block_the_loop(self):
+        db = MagicMock()
+        db.save_job.side_effect = lambda job, prepared=None: time.sleep(0.3)
+        dbio = AsyncDatabase(PersistenceConfig(), db)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            began = time.monotonic()
+            dbio.save_job(Job(target="10.0.0.1"))
+            await ticker()
+            self.assertLess(ticks[-1] - began, 0.25)
+            await dbio.drain()
+
+        asyncio.run(run())
+        db.save_job.assert_called_once()
+        self.assertEqual(dbio.stats()["queued"], 0)
+
+    def test_calls_run_in_order_on_one_thread(self):
+        db = MagicMock()
+        calls = []
+        db.update_status.side_effect = lambda job_id, status: calls.append((status, threading.get_ident()))
+        dbio = AsyncDatabase(PersistenceConfig(), db)
+
+        async def run():
+            for status in ("running", "paused", "running", "completed"):
+                dbio.submit("update_status", "job", status)
+            await dbio.drain()
+
+        asyncio.run(run())
+        self.assertEqual([status for status, _ in calls], ["running", "paused", "running", "completed"])
+        self.assertEqual(len({thread for _, thread in calls}), 1)
+        self.assertNotEqual(calls[0][1], threading.get_ident())
+
+    @patch('mcp_scan.core.db.get_config')
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    def test_write_sends_the_job_as_saved(self, mock_pool_cls, mock_get_config):
+        cursor = mock_pool_cls.return_value.get_connection.return_value.cursor.return_value
+        dbio = AsyncDatabase(PersistenceConfig(), DatabaseManager())
+        job = Job(target="10.0.0.1")
+        cursor.reset_mock()
+
+        async def run():
+            saved = dbio.save_job(job)
+            job.status = TaskStatus.RUNNING
+            await saved
+
+        asyncio.run(run())
+        self.assertEqual(cursor.execute.call_args[0][1][1], "pending")
+
+    def test_inline_outside_event_loop(self):
+        db = MagicMock()
+        db.claim_job.return_value = True
+        dbio = AsyncDatabase(PersistenceConfig(), db)
+        self.assertTrue(dbio.submit("claim_job", "job", "owner"))
+
+    def test_final_state_write_is_awaitable(self):
+        db = MagicMock()
+        db.save_job.side_effect = lambda job, prepared=None: time.sleep(0.05)
+        writer = JobWriter(PersistenceConfig(), AsyncDatabase(PersistenceConfig(), db))
+        job = Job(target="10.0.0.1", status=TaskStatus.COMPLETED)
+
+        async def run():
+            saved = writer.save(job)
+            self.assertIsInstance(saved, asyncio.Future)
+            await saved
+            self.assertIs(db.save_job.call_args[0][0], job)
+
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
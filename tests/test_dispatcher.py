@@ -0,0 +1,78 @@
+import unittest
+from mcp_scan.core.dispatcher import Dispatcher
+from mcp_scan.core.limits import ConcurrencyLimiter, TargetLimiter
+from mcp_scan.core.models import Job, Task
+
+class TestDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.limits = ConcurrencyLimiter(2, {"nmap": 1})
+        self.targets = TargetLimiter(max_tasks=10, max_requests=1000)
+        self.dispatcher = Dispatcher(self.limits, self.targets)
+
+    def _queue(self, job, count, tool_name="nuclei"):
+        tasks = []
+        for _ in range(count):
+            task = job.add_task(Task(tool_name=tool_name, params={"target": job.target}))
+            self.dispatcher.submit(job, task)
+            tasks.append(task)
+        return tasks
+
+    def test_urgent_job_is_not_starved(self):
+        big = Job(target="10.0.0.1", priority=5)
+        self._queue(big, 50)
+        started = self.dispatcher.dispatch()
+        self.assertEqual(len(started), 2)
+
+        urgent = Job(target="10.0.0.2", priority=10)
+        urgent_task, = self._queue(urgent, 1)
+        self.assertEqual(self.dispatcher.dispatch(), [])
+
+        # The next free slot goes to the urgent job, not the big job's backlog
+        self.dispatcher.release(started[0][1])
+        self.assertEqual(self.dispatcher.dispatch(), [(urgent, urgent_task)])
+        self.assertTrue(urgent_task.dispatch_note.startswith("dispatched: priority 10"))
+
+    def test_equal_priority_jobs_share_slots(self):
+        first = Job(target="10.0.0.1")
+        second = Job(target="10.0.0.2")
+        self._queue(first, 5)
+        self._queue(second, 5)
+
+        started = self.dispatcher.dispatch()
+        self.assertEqual({job.id for job, _ in started}, {first.id, second.id})
+
+    def test_blocked_tool_does_not_block_other_tools(self):
+        job = Job(target="10.0.0.1")
+        self._queue(job, 2, tool_name="nmap")
+        web_task, = self._queue(job, 1, tool_name="nuclei")
+
+        started = [task for _, task in self.dispatcher.dispatch()]
+        self.assertEqual(len(started), 2)
+        self.assertIn(web_task, started)
+        queued = [t for t in job.tasks if t not in started]
+        self.assertEqual(queued[0].dispatch_note, "queued: nmap slots full")
+        self.assertEqual(self.dispatcher.queued_count(), 1)
+
+    def test_longest_critical_path_starts_first(self):
+        durations = {"gobuster": 10.0, "nuclei": 30.0, "sqlmap": 600.0}
+        dispatcher = Dispatcher(ConcurrencyLimiter(1), self.targets,
+                                lambda task: durations.get(task.tool_name))
+        job = Job(target="10.0.0.1")
+        short = job.add_task(Task(tool_name="nuclei"))
+        chain = job.add_task(Task(tool_name="gobuster"))
+        job.add_task(Task(tool_name="sqlmap", dependencies=[chain.id]))
+        unknown = job.add_task(Task(tool_name="hydra"))
+        for task in (short, chain, unknown):
+            dispatcher.submit(job, task)
+
+        # gobuster -> sqlmap (610s) beats hydra (no history, 60s) and nuclei (30s)
+        order = []
+        for _ in range(3):
+            (_, task), = dispatcher.dispatch()
+            order.append(task)
+            dispatcher.release(task)
+        self.assertEqual(order, [chain, unknown, short])
+        self.assertTrue(chain.dispatch_note.endswith("critical path 610s"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import asyncio
+import threading
+from mcp_scan.config import ExecutorConfig
+from mcp_scan.core.executors import ExecutionBackend
+from mcp_scan.tools.nmap_tool import parse_nmap_output
+
+class TestExecutionBackend(unittest.TestCase):
+    def test_tools_run_in_named_pool_per_resource_class(self):
+        backend = ExecutionBackend(ExecutorConfig(pool_sizes={"network": 1, "web": 2}))
+
+        async def run():
+            nmap_thread = await backend.run("nmap", lambda: threading.current_thread().name)
+            nuclei_thread = await backend.run("nuclei", lambda: threading.current_thread().name)
+            return nmap_thread, nuclei_thread
+
+        try:
+            nmap_thread, nuclei_thread = asyncio.run(run())
+            self.assertTrue(nmap_thread.startswith("mcp_scan-network"))
+            self.assertTrue(nuclei_thread.startswith("mcp_scan-web"))
+            metrics = backend.metrics()
+            self.assertEqual(metrics["network"]["max_workers"], 1)
+            self.assertEqual(metrics["web"]["completed"], 1)
+        finally:
+            backend.shutdown()
+
+    def test_saturation_metrics(self):
+        backend = ExecutionBackend(ExecutorConfig(pool_sizes={"bruteforce": 1}))
+        release = threading.Event()
+
+        async def run():
+            first = asyncio.ensure_future(backend.run("hydra", release.wait, 5))
+            second = asyncio.ensure_future(backend.run("hydra", release.wait, 5))
+            await asyncio.sleep(0.05)
+            snapshot = backend.metrics()["bruteforce"]
+            release.set()
+            await asyncio.gather(first, second)
+            return snapshot
+
+        try:
+            snapshot = asyncio.run(run())
+            self.assertTrue(snapshot["saturated"])
+            self.assertEqual(snapshot["active"], 1)
+            self.assertEqual(snapshot["queued"], 1)
+        finally:
+            backend.shutdown()
+
+    def test_parsing_in_process_pool(self):
+        backend = ExecutionBackend(ExecutorConfig(process_pool=True, parse_workers=1))
+
+        async def run():
+            return await backend.run_cpu(parse_nmap_output, "80/tcp open http nginx 1.18.0", "10.0.0.1")
+
+        try:
+            hosts = asyncio.run(run())
+            self.assertEqual(hosts[0].ip, "10.0.0.1")
+            self.assertEqual(hosts[0].services[0].product, "nginx")
+            self.assertEqual(hosts[0].services[0].version, "1.18.0")
+        finally:
+            backend.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import time
+from unittest.mock import MagicMock, patch
+from mcp_scan.config import JobCacheConfig
+from mcp_scan.core.jobcache import JobCache
+from mcp_scan.core.models import Job, TaskStatus
+from mcp_scan.core.scheduler import Scheduler
+
+def finished_job(target="10.0.0.1"):
+    job = Job(target=target)
+    job.status = TaskStatus.COMPLETED
+    return job
+
+class TestJobCache(unittest.TestCase):
+    def test_evicts_least_recently_used_finished_jobs(self):
+        db = MagicMock()
+        cache = JobCache(JobCacheConfig(max_jobs=2), db, lambda job_id: False)
+        first, second, third = finished_job(), finished_job(), finished_job()
+        cache[first.id] = first
+        cache[second.id] = second
+        cache[first.id]  # touch
+        cache[third.id] = third
+        self.assertNotIn(second.id, cache)
+        self.assertIn(first.id, cache)
+        db.save_job.assert_not_called()
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_unfinished_and_running_jobs_are_kept(self):
+        running = finished_job()
+        cache = JobCache(JobCacheConfig(max_jobs=1), MagicMock(), lambda job_id: job_id == running.id)
+        pending = Job(target="10.0.0.2")
+        cache[running.id] = running
+        cache[pending.id] = pending
+        self.assertEqual(len(cache), 2)
+
+    def test_idle_jobs_expire(self):
+        cache = JobCache(JobCacheConfig(max_idle=60), MagicMock(), lambda job_id: False)
+        job = finished_job()
+        cache[job.id] = job
+        with patch('mcp_scan.core.jobcache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(cache.prune(), 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_nothing_evicted_without_database(self):
+        db = MagicMock()
+        db.pool = None
+        cache = JobCache(JobCacheConfig(max_jobs=1), db, lambda job_id: False)
+        for _ in range(3):
+            job = finished_job()
+            cache[job.id] = job
+        self.assertEqual(len(cache), 3)
+
+    def test_scheduler_reloads_evicted_job(self):
+        with patch('mcp_scan.core.scheduler.get_db') as get_db:
+            db = get_db.return_value
+            scheduler = Scheduler()
+        scheduler.jobs.config = JobCacheConfig(max_jobs=1)
+        old, new = finished_job(), finished_job()
+        scheduler.jobs[old.id] = old
+        scheduler.jobs[new.id] = new
+        self.assertNotIn(old.id, scheduler.jobs)
+
+        db.get_job.return_value = old
+        self.assertIs(scheduler.get_job(old.id), old)
+        db.get_job.assert_called_once_with(old.id)
+        self.assertIn(old.id, scheduler.jobs)
+
+    def test_status_view_loads_summary_without_caching_it(self):
+        with patch('mcp_scan.core.scheduler.get_db') as get_db:
+            db = get_db.return_value
+            scheduler = Scheduler()
+        summary = finished_job()
+        db.get_job.return_value = summary
+        self.assertIs(scheduler.get_job(summary.id, full=False), summary)
+        db.get_job.assert_called_once_with(summary.id, full=False)
+        self.assertNotIn(summary.id, scheduler.jobs)
@@ -0,0 +1,68 @@
+import unittest
+import asyncio
+from mcp_scan.core.limits import ConcurrencyLimiter, TargetLimiter, task_target, estimate_request_rate
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    def test_global_and_tool_limits(self):
+        limiter = ConcurrencyLimiter(3, {"nmap": 2})
+        self.assertTrue(limiter.try_acquire("nmap"))
+        self.assertTrue(limiter.try_acquire("nmap"))
+        # Tool limit reached, other tools still fit under the global limit
+        self.assertFalse(limiter.try_acquire("nmap"))
+        self.assertTrue(limiter.try_acquire("nuclei"))
+        # Global limit reached
+        self.assertFalse(limiter.try_acquire("gobuster"))
+        self.assertEqual(limiter.snapshot(), {"nmap": 2, "nuclei": 1, "total": 3})
+
+        limiter.release("nmap")
+        self.assertTrue(limiter.try_acquire("gobuster"))
+
+    def test_acquire_waits_for_release(self):
+        async def run():
+            limiter = ConcurrencyLimiter(1)
+            await limiter.acquire("nmap")
+            waiter = asyncio.create_task(limiter.acquire("nuclei"))
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+
+            limiter.release("nmap")
+            await asyncio.wait_for(waiter, timeout=1.0)
+            self.assertEqual(limiter.snapshot(), {"nuclei": 1, "total": 1})
+
+        asyncio.run(run())
+
+class TestTargetLimiter(unittest.TestCase):
+    def test_task_target(self):
+        self.assertEqual(task_target({"target": "10.0.0.1"}), "10.0.0.1")
+        self.assertEqual(task_target({"target": "http://Example.com:8080/x"}), "example.com")
+        self.assertEqual(task_target({"url": "https://example.com/a.php?id=1"}), "example.com")
+        self.assertEqual(task_target({"target": "example.com:443"}), "example.com")
+        self.assertEqual(task_target({"options": {"RHOSTS": "10.0.0.2"}}), "10.0.0.2")
+        self.assertIsNone(task_target({}))
+
+    def test_request_rate_estimate(self):
+        self.assertEqual(estimate_request_rate("nuclei", {}), 50)
+        self.assertEqual(estimate_request_rate("gobuster", {"threads": 20}), 20)
+
+    def test_request_budget_per_target(self):
+        limiter = TargetLimiter(max_tasks=3, max_requests=60)
+        self.assertTrue(limiter.try_acquire("10.0.0.1", 50))   # nuclei
+        self.assertTrue(limiter.try_acquire("10.0.0.1", 10))   # gobuster
+        # hydra would push the target over its request budget
+        self.assertFalse(limiter.try_acquire("10.0.0.1", 4))
+        # Other targets are unaffected
+        self.assertTrue(limiter.try_acquire("10.0.0.2", 4))
+
+        limiter.release("10.0.0.1", 10)
+        self.assertTrue(limiter.try_acquire("10.0.0.1", 4))
+        self.assertEqual(limiter.snapshot()["10.0.0.1"], {"tasks": 2, "requests": 54})
+
+    def test_idle_target_admits_expensive_task(self):
+        limiter = TargetLimiter(max_tasks=1, max_requests=10)
+        self.assertTrue(limiter.try_acquire("10.0.0.1", 50))
+        self.assertFalse(limiter.try_acquire("10.0.0.1", 1))
+        limiter.release("10.0.0.1", 50)
+        self.assertEqual(limiter.snapshot(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,34 @@ class TestModels(unittest.TestCase):
         task.status = TaskStatus.RUNNING
         self.assertEqual(task.status, "running")
 
+    def test_job_dependency_index(self):
+        job = Job(target="127.0.0.1")
+        root = job.add_task(Task(tool_name="nmap"))
+        left = job.add_task(Task(tool_name="nuclei", dependencies=[root.id]))
+        right = job.add_task(Task(tool_name="gobuster", dependencies=[root.id]))
+        join = job.add_task(Task(tool_name="sqlmap", dependencies=[left.id, right.id]))
+
+        self.assertIs(job.get_task(join.id), join)
+        self.assertEqual(job.pop_ready(), [root])
+        self.assertEqual(job.pop_ready(), [])
+
+        root.status = TaskStatus.COMPLETED
+        self.assertEqual(job.task_completed(root), [left, right])
+        self.assertEqual(job.pop_ready(), [left, right])
+
+        left.status = TaskStatus.COMPLETED
+        self.assertEqual(job.task_completed(left), [])
+        right.status = TaskStatus.COMPLETED
+        self.assertEqual(job.task_completed(right), [join])
+
+    def test_job_index_rebuilt_on_load(self):
+        job = Job(target="127.0.0.1")
+        root = job.add_task(Task(tool_name="nmap", status=TaskStatus.COMPLETED))
+        child = job.add_task(Task(tool_name="nuclei", dependencies=[root.id]))
+
+        loaded = Job.model_validate_json(job.model_dump_json())
+        self.assertEqual([t.id for t in loaded.pop_ready()], [child.id])
+
     def test_host_model(self):
         host = Host(ip="192.168.1.1")
         self.assertEqual(host.ip, "192.168.1.1")
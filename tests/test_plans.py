@@ -0,0 +1,59 @@
+import unittest
+from mcp_scan.core.errors import InvalidPlanError
+from mcp_scan.core.plans import build_plan_job
+
+class TestPlans(unittest.TestCase):
+    def _deps(self, job):
+        names = {task.id: task.name for task in job.tasks}
+        return {task.name: sorted(names[d] for d in task.dependencies) for task in job.tasks}
+
+    def test_legacy_plan_runs_sequentially(self):
+        job = build_plan_job("10.0.0.1", [
+            {"tool_name": "nmap", "params": {"ports": "80"}},
+            {"tool_name": "nuclei", "params": {"target": "http://10.0.0.1"}},
+        ])
+        self.assertEqual(self._deps(job), {"task-1": [], "task-2": ["task-1"]})
+        self.assertEqual(job.tasks[0].params, {"ports": "80", "target": "10.0.0.1"})
+        self.assertEqual(job.tasks[1].params["target"], "http://10.0.0.1")
+
+    def test_depends_on_and_groups(self):
+        job = build_plan_job("10.0.0.1", [
+            {"id": "scan", "tool_name": "nmap"},
+            {"id": "checks", "depends_on": ["scan"], "parallel": [
+                {"id": "web", "tool_name": "nuclei"},
+                {"id": "dirs", "tool_name": "gobuster"},
+                {"id": "ssh", "tool_name": "hydra", "depends_on": "web"},
+            ]},
+            {"id": "sqli", "tool_name": "sqlmap", "depends_on": ["checks"]},
+            {"id": "other", "tool_name": "nuclei"},
+        ], priority=8)
+        self.assertEqual(job.priority, 8)
+        self.assertEqual(self._deps(job), {
+            "scan": [], "web": ["scan"], "dirs": ["scan"], "ssh": ["scan", "web"],
+            "sqli": ["dirs", "ssh", "web"], "other": [],
+        })
+        # Independent roots are ready together
+        self.assertEqual(sorted(t.name for t in job.pop_ready()), ["other", "scan"])
+
+    def test_rejects_invalid_plans(self):
+        cases = {
+            "unknown tool 'nikto'": [{"tool_name": "nikto"}],
+            "unknown step 'missing'": [{"id": "a", "tool_name": "nmap", "depends_on": ["missing"]}],
+            "duplicate step id 'a'": [{"id": "a", "tool_name": "nmap"}, {"id": "a", "tool_name": "nuclei"}],
+            "cycle between a, b": [
+                {"id": "a", "tool_name": "nmap", "depends_on": ["b"]},
+                {"id": "b", "tool_name": "nuclei", "depends_on": ["a"]},
+            ],
+            "cycle between g, x": [
+                {"id": "g", "parallel": [{"id": "x", "tool_name": "nmap", "depends_on": ["g"]}]},
+            ],
+            "non-empty list": {},
+        }
+        for message, plan in cases.items():
+            with self.subTest(message):
+                with self.assertRaises(InvalidPlanError) as raised:
+                    build_plan_job("10.0.0.1", plan)
+                self.assertIn(message, raised.exception.message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import unittest
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+import mcp_scan
+from mcp_scan.core.errors import ToolNotFoundError
+from mcp_scan.core.executors import ExecutionBackend
+from mcp_scan.core.limits import estimate_request_rate
+from mcp_scan.config import ExecutorConfig
+from mcp_scan.tools import registry
+from mcp_scan.tools.registry import ToolSpec, get_tool, run_tool, tool, tool_factory
+
+@tool("echo_probe", resource_class="web", request_rate=7, default_timeout=5, cacheable=False)
+def run_echo_probe(target: str) -> Dict[str, Any]:
+    return {"success": True, "return_code": 0, "stdout": f"probed {target}", "stderr": ""}
+
+class TestToolRegistry(unittest.TestCase):
+    def test_tool_modules_load_lazily(self):
+        code = ("import sys, mcp_scan.core.scheduler; "
+                "print(any(m.endswith('_tool') for m in sys.modules if m.startswith('mcp_scan.tools')))")
+        src = os.path.dirname(os.path.dirname(mcp_scan.__file__))
+        env = dict(os.environ, PYTHONPATH=src)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+        self.assertEqual(output.stdout.strip(), "False", output.stderr)
+
+    def test_builtin_metadata(self):
+        self.assertEqual(get_tool("nmap").resource_class, "network")
+        self.assertFalse(get_tool("hydra").cacheable)
+        # Every wrapper is reachable by name, metasploit included
+        self.assertEqual(get_tool("metasploit").load_runner().__name__, "run_metasploit")
+        with self.assertRaises(ToolNotFoundError):
+            get_tool("no_such_tool")
+
+    def test_decorated_plugin_tool(self):
+        self.assertEqual(run_tool("echo_probe", {"target": "10.0.0.1"})["stdout"], "probed 10.0.0.1")
+        self.assertEqual(estimate_request_rate("echo_probe", {}), 7)
+        self.assertEqual(ExecutionBackend(ExecutorConfig()).resource_class("echo_probe"), "web")
+
+    def test_entry_points_never_run_runners(self):
+        runner = MagicMock(side_effect=AssertionError("runner executed on load"))
+        runner.tool_spec = ToolSpec("ep_runner", "plugin:run")
+
+        @tool_factory
+        def make_spec():
+            return ToolSpec("ep_factory", "plugin:run_factory")
+
+        calls = []
+
+        def unmarked():
+            calls.append("unmarked")
+            return ToolSpec("ep_unmarked", "plugin:run_unmarked")
+
+        loaded = {"ep_runner": runner, "ep_factory": make_spec, "ep_unmarked": unmarked,
+                  "ep_spec": ToolSpec("ep_spec", "plugin:run_spec")}
+        entry_points = []
+        for name, target in loaded.items():
+            entry_point = MagicMock()
+            entry_point.name = name
+            entry_point.load.return_value = target
+            entry_points.append(entry_point)
+
+        self.addCleanup(lambda: [registry._registry.pop(name, None) for name in loaded])
+        with patch.object(registry, '_entry_points_loaded', False), \
+             patch('importlib.metadata.entry_points', return_value=entry_points):
+            registry._load_entry_points()
+        runner.assert_not_called()
+        self.assertEqual(calls, [])
+        self.assertEqual(get_tool("ep_runner").runner, "plugin:run")
+        self.assertEqual(get_tool("ep_factory").runner, "plugin:run_factory")
+        self.assertEqual(get_tool("ep_spec").runner, "plugin:run_spec")
+        self.assertIsNone(registry.find_tool("ep_unmarked"))
+
+    def test_runner_resolved_per_call(self):
+        with patch('mcp_scan.tools.nuclei_tool.run_nuclei', return_value={"success": True}) as mock:
+            self.assertEqual(run_tool("nuclei", {"target": "http://x"}), {"success": True})
+        mock.assert_called_once_with(target="http://x")
+
+if __name__ == '__main__':
+    unittest.main()
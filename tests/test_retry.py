@@ -0,0 +1,76 @@
+import unittest
+from mcp_scan.config import RetryPolicy, TimeoutConfig
+from mcp_scan.core.retry import DurationHistory, backoff_delay, is_transient, param_shape
+
+class TestRetry(unittest.TestCase):
+    def test_transient_failures(self):
+        self.assertTrue(is_transient({"success": False, "return_code": -1, "timed_out": True}))
+        self.assertTrue(is_transient({"success": False, "return_code": 1, "stderr": "Connection refused"}))
+        self.assertFalse(is_transient({"success": False, "return_code": 1, "stderr": "unknown option -Z"}))
+        self.assertTrue(is_transient({"success": False, "return_code": 1, "stderr": "HTTP/1.1 503"}))
+        self.assertTrue(is_transient({"success": False, "return_code": 1, "stderr": "server returned status: 502"}))
+        # 50x outside an HTTP status is not a gateway error
+        self.assertFalse(is_transient({"success": False, "return_code": 1, "stderr": "wordlist line 1503 is invalid"}))
+        self.assertFalse(is_transient({"success": False, "return_code": 1, "stderr": "bad port spec 5040-504"}))
+        self.assertFalse(is_transient({"success": False, "return_code": 1, "stderr": "no such file /tmp/scan-502.xml"}))
+        # Rejected before running, or stopped on purpose
+        self.assertFalse(is_transient({"success": False, "error": "Invalid target format"}))
+        self.assertFalse(is_transient({"success": False, "return_code": -1, "cancelled": True}))
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(max_attempts=5, backoff=2, multiplier=3, max_backoff=30)
+        self.assertEqual([backoff_delay(policy, n) for n in (1, 2, 3, 4)], [2, 6, 18, 30])
+
+    def test_shape_ignores_concrete_target(self):
+        self.assertEqual(param_shape("nmap", {"target": "10.0.0.1", "ports": "top-1000"}),
+                         param_shape("nmap", {"target": "10.0.0.2", "ports": "top-1000"}))
+        self.assertNotEqual(param_shape("nmap", {"target": "10.0.0.1", "ports": "top-1000"}),
+                            param_shape("nmap", {"target": "10.0.0.0/24", "ports": "top-1000"}))
+
+    def test_explicit_ports_shape_by_size(self):
+        # Each incremental rescan probes a different list of known ports
+        self.assertEqual(param_shape("nmap", {"target": "10.0.0.1", "ports": "22,80,443,8080"}),
+                         param_shape("nmap", {"target": "10.0.0.1", "ports": "21,25,3306,8443"}))
+        self.assertEqual(param_shape("nmap", {"target": "10.0.0.1", "ports": "1-8192"}),
+                         param_shape("nmap", {"target": "10.0.0.1", "ports": "8193-16384"}))
+        self.assertNotEqual(param_shape("nmap", {"target": "10.0.0.1", "ports": "22,80"}),
+                            param_shape("nmap", {"target": "10.0.0.1", "ports": "1-65535"}))
+        self.assertIn("ports=top-1000", param_shape("nmap", {"target": "10.0.0.1", "ports": "top-1000"}))
+
+    def test_history_keeps_at_most_max_shapes(self):
+        history = DurationHistory(TimeoutConfig(max_shapes=2))
+        history.record("nmap", {"target": "10.0.0.1", "ports": "top-1000"}, 10)
+        history.record("nuclei", {"target": "http://10.0.0.1"}, 5)
+        history.percentile("nmap", {"target": "10.0.0.1", "ports": "top-1000"})  # keep nmap recent
+        history.record("gobuster", {"url": "http://10.0.0.1"}, 7)
+        shapes = list(history.stats())
+        self.assertEqual(len(shapes), 2)
+        self.assertFalse(any(shape.startswith("nuclei(") for shape in shapes))
+
+    def test_adaptive_timeout(self):
+        history = DurationHistory(TimeoutConfig(min_samples=3, factor=2, min_timeout=5, max_timeout=100))
+        params = {"target": "10.0.0.1", "ports": "top-1000"}
+        history.record("nmap", params, 10)
+        history.record("nmap", params, 12)
+        # Too few runs: keep the tool's own default
+        self.assertIsNone(history.timeout_for("nmap", params))
+
+        history.record("nmap", {"target": "10.0.0.9", "ports": "top-1000"}, 20)
+        self.assertEqual(history.timeout_for("nmap", params), 40)
+        # Retries after a timeout get more time, up to the cap
+        self.assertEqual(history.timeout_for("nmap", params, attempt=2), 80)
+        self.assertEqual(history.timeout_for("nmap", params, attempt=3), 100)
+        self.assertIsNone(history.timeout_for("nmap", {"target": "10.0.0.1", "ports": "1-65535"}))
+
+    def test_duration_estimate(self):
+        history = DurationHistory(TimeoutConfig())
+        self.assertIsNone(history.estimate("nmap", {"target": "10.0.0.1"}))
+        for duration in (10, 30, 11):
+            history.record("nmap", {"target": "10.0.0.1", "ports": "top-1000"}, duration)
+        self.assertEqual(history.estimate("nmap", {"target": "10.0.0.2", "ports": "top-1000"}), 11)
+        # Other shapes of the same tool fall back to the tool's median
+        self.assertEqual(history.estimate("nmap", {"target": "10.0.0.0/24", "ports": "all"}), 11)
+        self.assertIsNone(history.estimate("nuclei", {"target": "http://10.0.0.1"}))
+
+if __name__ == '__main__':
+    unittest.main()
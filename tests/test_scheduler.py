@@ -1,8 +1,14 @@
 import unittest
 import asyncio
+import time
+import threading
 from unittest.mock import MagicMock, patch
+from uuid import uuid4
 from mcp_scan.core.scheduler import Scheduler
-from mcp_scan.core.models import TaskStatus
+from mcp_scan.core.models import Job, Task, TaskStatus, Host, Service
+from mcp_scan.command_executor import CommandExecutor, output_listener
+from mcp_scan.config import BatchingConfig, RetryConfig, RetryPolicy, TimeoutConfig
+from mcp_scan.core.retry import DurationHistory
 
 class TestScheduler(unittest.TestCase):
     def setUp(self):
@@ -14,6 +20,8 @@ class TestScheduler(unittest.TestCase):
         self.addCleanup(self.db_patcher.stop)
 
         self.scheduler = Scheduler()
+        # Tests fake single-target tool calls; batching has its own tests
+        self.scheduler.batcher.config = BatchingConfig(enabled=False)
 
     def test_create_job(self):
         async def run():
@@ -23,7 +31,7 @@ class TestScheduler(unittest.TestCase):
             self.assertEqual(job.tasks[0].tool_name, "nmap")
         asyncio.run(run())
 
-    @patch('mcp_scan.core.scheduler.run_nmap')
+    @patch('mcp_scan.tools.nmap_tool.run_nmap')
     def test_run_job_flow(self, mock_nmap):
         # Mock Nmap result to trigger next steps
         mock_nmap.return_value = {
@@ -48,5 +56,624 @@ class TestScheduler(unittest.TestCase):
             # Check if Nuclei/Gobuster were added
             self.assertTrue(any(t.tool_name == "nuclei" for t in job.tasks))
             self.assertTrue(any(t.tool_name == "gobuster" for t in job.tasks))
+
+            # Nmap services are parsed into the job's assets
+            self.assertEqual(job.assets[0].ip, "example.com")
+            self.assertEqual(job.assets[0].services[0].port, 80)
         
         asyncio.run(run())
+
+    @patch('mcp_scan.tools.nmap_tool.run_nmap')
+    def test_dependents_start_without_polling_delay(self, mock_nmap):
+        mock_nmap.return_value = {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            # A 5-level chain used to cost at least 0.5s per level
+            job = Job(target="example.com")
+            prev = None
+            for _ in range(5):
+                task = Task(tool_name="nmap", params={"target": "example.com"})
+                if prev:
+                    task.dependencies.append(prev.id)
+                job.tasks.append(task)
+                prev = task
+            self.scheduler.jobs[job.id] = job
+
+            start = time.monotonic()
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            elapsed = time.monotonic() - start
+
+            self.assertEqual(job.status, TaskStatus.COMPLETED)
+            self.assertTrue(all(t.status == TaskStatus.COMPLETED for t in job.tasks))
+            self.assertLess(elapsed, 0.5)
+            self.assertEqual(self.scheduler.active_tasks, {})
+
+        asyncio.run(run())
+
+    @patch('mcp_scan.tools.nmap_tool.run_nmap')
+    def test_failed_dependency_fails_job(self, mock_nmap):
+        mock_nmap.return_value = {"success": False, "return_code": 1, "stdout": "", "stderr": "boom"}
+
+        async def run():
+            job = Job(target="example.com")
+            first = Task(tool_name="nmap", params={"target": "example.com"})
+            second = Task(tool_name="nmap", params={"target": "example.com"}, dependencies=[first.id])
+            job.tasks.extend([first, second])
+            self.scheduler.jobs[job.id] = job
+
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+
+            self.assertEqual(first.status, TaskStatus.FAILED)
+            self.assertEqual(second.status, TaskStatus.PENDING)
+            self.assertEqual(job.status, TaskStatus.FAILED)
+
+        asyncio.run(run())
+
+    def test_tool_limit_applies_across_jobs(self):
+        self.scheduler.limits.tool_limits["nmap"] = 2
+        running = 0
+        peak = 0
+
+        lock = threading.Lock()
+
+        def fake_tool(tool_name, params):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            jobs = [await self.scheduler.create_job(f"10.0.0.{i}") for i in range(6)]
+            await asyncio.wait_for(
+                asyncio.gather(*(self.scheduler.run_job(job.id) for job in jobs)), timeout=5.0)
+            for job in jobs:
+                self.assertEqual(job.status, TaskStatus.COMPLETED)
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            asyncio.run(run())
+        self.assertLessEqual(peak, 2)
+        self.assertEqual(self.scheduler.limits.snapshot(), {"total": 0})
+
+    def test_saturated_target_does_not_block_other_targets(self):
+        self.scheduler.targets.max_tasks = 1
+        started = []
+
+        def fake_tool(tool_name, params):
+            started.append(params["target"])
+            if params["target"] == "10.0.0.1":
+                time.sleep(0.05)
+            return {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            busy = Job(target="10.0.0.1")
+            for ports in ("22", "80"):
+                busy.add_task(Task(tool_name="nmap", params={"target": "10.0.0.1", "ports": ports}))
+            other = Job(target="10.0.0.2")
+            other.add_task(Task(tool_name="nmap", params={"target": "10.0.0.2"}))
+            for job in (busy, other):
+                self.scheduler.jobs[job.id] = job
+
+            await asyncio.wait_for(asyncio.gather(
+                self.scheduler.run_job(busy.id), self.scheduler.run_job(other.id)), timeout=2.0)
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            asyncio.run(run())
+        # The second task for 10.0.0.1 waited behind the first one, 10.0.0.2 did not
+        self.assertEqual(sorted(started[:2]), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(started[2], "10.0.0.1")
+
+    def test_identical_inflight_tasks_run_once(self):
+        calls = []
+
+        def fake_tool(tool_name, params):
+            calls.append(params)
+            time.sleep(0.05)
+            return {"success": True, "return_code": 0, "stdout": "22/tcp open ssh", "stderr": ""}
+
+        async def run():
+            # Same target, created close together (e.g. CLI start + MCP plan)
+            first = await self.scheduler.create_job("10.0.0.1", bypass_cache=True)
+            second = await self.scheduler.create_job("10.0.0.1", bypass_cache=True)
+            await asyncio.wait_for(asyncio.gather(
+                self.scheduler.run_job(first.id), self.scheduler.run_job(second.id)), timeout=2.0)
+            return first, second
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            first, second = asyncio.run(run())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first.tasks[0].status, TaskStatus.COMPLETED)
+        self.assertEqual(second.tasks[0].status, TaskStatus.COMPLETED)
+        self.assertEqual(second.tasks[0].result["stdout"], first.tasks[0].result["stdout"])
+        self.assertEqual(second.tasks[0].result["coalesced_from"], str(first.tasks[0].id))
+        self.assertEqual(self.scheduler._inflight, {})
+
+    def test_incremental_rescan_only_reruns_changed_services(self):
+        ok = {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+        self.mock_db.get_latest_job.return_value = None
+        scans = iter([
+            # Full scan: no version detection, so no product or version
+            "22/tcp open ssh\n80/tcp open http\n8080/tcp open http\n",
+            # First rescan: same services with versions, plus a new one
+            "22/tcp open ssh OpenSSH 8.2p1\n80/tcp open http Apache httpd 2.4.41\n"
+            "8080/tcp open http Jetty 9.4\n8443/tcp open https nginx 1.18.0\n",
+            # Second rescan: Jetty was upgraded
+            "22/tcp open ssh OpenSSH 8.2p1\n80/tcp open http Apache httpd 2.4.41\n"
+            "8080/tcp open http Jetty 10.0\n8443/tcp open https nginx 1.18.0\n",
+        ])
+        calls = []
+
+        def fake_tool(tool_name, params):
+            calls.append((tool_name, params.get("target") or params.get("url")))
+            if tool_name == "nmap":
+                return dict(ok, stdout=next(scans))
+            return dict(ok, stdout=f"{tool_name} run {len(calls)}")
+
+        async def scan(incremental):
+            job = await self.scheduler.create_job("10.0.0.1", incremental=incremental, bypass_cache=True)
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        async def run():
+            baseline = await scan(False)
+            calls.clear()
+            first = await scan(True)
+            first_calls = list(calls)
+            calls.clear()
+            second = await scan(True)
+            return baseline, first, first_calls, second
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            baseline, first, first_calls, second = asyncio.run(run())
+
+        self.assertEqual(first.baseline_job_id, baseline.id)
+        nmap_params = first.tasks[0].params
+        self.assertIn("-sV", nmap_params["additional_args"])
+        self.assertTrue({"22", "80", "8080"} <= set(nmap_params["ports"].split(",")))
+
+        # Services the full scan found are carried forward, only the new one is scanned
+        carried = [t for t in first.tasks if t.carried_forward_from]
+        self.assertEqual(sorted(t.tool_name for t in carried), ["gobuster", "gobuster", "nuclei", "nuclei"])
+        self.assertEqual(sorted(first_calls[1:]), [
+            ("gobuster", "https://10.0.0.1:8443"),
+            ("nuclei", "https://10.0.0.1:8443"),
+        ])
+        self.assertEqual(first.status, TaskStatus.COMPLETED)
+
+        # Against the first rescan, which recorded versions, the upgrade is noticed
+        self.assertEqual(second.baseline_job_id, first.id)
+        self.assertEqual(sorted(calls[1:]), [
+            ("gobuster", "http://10.0.0.1:8080"),
+            ("nuclei", "http://10.0.0.1:8080"),
+        ])
+        self.assertEqual(second.status, TaskStatus.COMPLETED)
+
+    def test_evicted_baseline_is_loaded_off_the_loop(self):
+        ok = {"success": True, "return_code": 0, "stderr": ""}
+        baseline = Job(target="10.0.0.1", status=TaskStatus.COMPLETED)
+        baseline.assets.append(Host(ip="10.0.0.1", services=[Service(port=80, protocol="tcp")]))
+        baseline.add_task(Task(tool_name="nuclei", params={"target": "http://10.0.0.1"},
+                               status=TaskStatus.COMPLETED, result=dict(ok, stdout="old")))
+        loaded_on = []
+
+        def get_job(job_id, full=True):
+            loaded_on.append(threading.get_ident())
+            return baseline
+        self.mock_db.get_job.side_effect = get_job
+
+        async def run():
+            job = Job(target="10.0.0.1", baseline_job_id=baseline.id)
+            job.add_task(Task(tool_name="nmap", params={"target": "10.0.0.1"}))
+            self.scheduler.jobs[job.id] = job
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', return_value=dict(ok, stdout="80/tcp open http\n")), \
+                patch.object(self.scheduler, 'get_job', side_effect=AssertionError("blocking load")):
+            job = asyncio.run(run())
+
+        self.assertEqual(len(loaded_on), 1)
+        self.assertNotEqual(loaded_on[0], threading.get_ident())
+        self.assertEqual(job.tasks[1].carried_forward_from, baseline.tasks[0].id)
+
+    def test_follow_ups_never_target_the_ptr_name(self):
+        ptr = "ec2-93-184-216-34.compute-1.amazonaws.com"
+        services = [Service(port=80, protocol="tcp", service_name="http"),
+                    Service(port=8443, protocol="tcp", service_name="https-alt")]
+
+        def follow_up_urls(target, ip="93.184.216.34"):
+            job = Job(target=target)
+            nmap = Task(tool_name="nmap", params={"target": target})
+            job.add_task(nmap)
+            self.scheduler._plan_follow_ups(job, nmap, [Host(ip=ip, hostname=ptr, services=services)])
+            return sorted({t.params.get("target") or t.params.get("url") for t in job.tasks[1:]})
+
+        # The scoped hostname, even though reverse DNS named the host otherwise
+        self.assertEqual(follow_up_urls("app.example.com"),
+                         ["http://app.example.com", "https://app.example.com:8443"])
+        # IP and network scopes stay on the IP
+        self.assertEqual(follow_up_urls("93.184.216.34"),
+                         ["http://93.184.216.34", "https://93.184.216.34:8443"])
+        self.assertEqual(follow_up_urls("93.184.216.0/24"),
+                         ["http://93.184.216.34", "https://93.184.216.34:8443"])
+        # In a list, a host only gets a name the list scoped for it
+        self.assertEqual(follow_up_urls("app.example.com 93.184.216.34"),
+                         ["http://93.184.216.34", "https://93.184.216.34:8443"])
+
+    def test_large_scope_fans_out_into_nmap_shards(self):
+        ok = {"success": True, "return_code": 0, "stderr": ""}
+        scanned = []
+
+        def fake_tool(tool_name, params):
+            if tool_name != "nmap":
+                return dict(ok, stdout="")
+            scanned.append(params["target"])
+            # Every shard finds a web server on the first address of its subnet
+            first = params["target"].split("/")[0]
+            return dict(ok, stdout=f"Nmap scan report for {first}\n80/tcp open http\n")
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.0/24")
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            job = asyncio.run(run())
+
+        self.assertEqual(sorted(scanned), ["10.0.0.0/26", "10.0.0.128/26", "10.0.0.192/26", "10.0.0.64/26"])
+        self.assertEqual(sorted(h.ip for h in job.assets), ["10.0.0.0", "10.0.0.128", "10.0.0.192", "10.0.0.64"])
+        self.assertEqual(len([t for t in job.tasks if t.tool_name == "nuclei"]), 4)
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+
+    def test_follow_ups_start_while_nmap_streams(self):
+        ok = {"success": True, "return_code": 0, "stderr": ""}
+        nuclei_started = threading.Event()
+        seen_before_exit = []
+
+        def fake_tool(tool_name, params):
+            if tool_name == "nmap":
+                output_listener()("Discovered open port 80/tcp on 10.0.0.1\n")
+                # Nmap keeps scanning the remaining ports meanwhile
+                seen_before_exit.append(nuclei_started.wait(timeout=1.0))
+                return dict(ok, stdout="Nmap scan report for 10.0.0.1\n80/tcp open http\n")
+            if tool_name == "nuclei":
+                nuclei_started.set()
+            return dict(ok, stdout="")
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            job = asyncio.run(run())
+
+        self.assertEqual(seen_before_exit, [True])
+        # The final port table does not schedule the same service again
+        self.assertEqual(sorted(t.tool_name for t in job.tasks), ["gobuster", "nmap", "nuclei"])
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+
+    def test_cancel_job_kills_running_tool(self):
+        started = threading.Event()
+        results = []
+
+        def fake_tool(tool_name, params):
+            started.set()
+            result = CommandExecutor("sleep 30").execute()
+            results.append(result)
+            return result
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            runner = asyncio.create_task(self.scheduler.run_job(job.id))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 2.0)
+            await asyncio.sleep(0.1)
+            self.assertTrue(self.scheduler.control(job.id, "cancel"))
+            # Slots are free before the job loop even wakes up
+            self.assertEqual(self.scheduler.limits.snapshot(), {"total": 0})
+            await asyncio.wait_for(runner, timeout=2.0)
+            return job
+
+        begin = time.monotonic()
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            job = asyncio.run(run())
+
+        # The tool thread returns as soon as its process tree is gone
+        deadline = time.monotonic() + 2.0
+        while not results and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertLess(time.monotonic() - begin, 5.0)
+        self.assertEqual(job.status, TaskStatus.CANCELLED)
+        self.assertEqual(job.tasks[0].status, TaskStatus.CANCELLED)
+        self.assertTrue(results[0]["cancelled"])
+        saved = self.mock_db.save_job.call_args[0][0]
+        self.assertEqual(saved.status, TaskStatus.CANCELLED)
+
+    def test_preempted_job_reruns_task_on_resume(self):
+        calls = []
+
+        def fake_tool(tool_name, params):
+            calls.append(tool_name)
+            if len(calls) == 1:
+                return CommandExecutor("sleep 30").execute()
+            return {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            runner = asyncio.create_task(self.scheduler.run_job(job.id))
+            while not calls:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            self.scheduler.control(job.id, "preempt")
+            await asyncio.sleep(0.1)
+            self.assertEqual(job.status, TaskStatus.PAUSED)
+            self.assertEqual(job.tasks[0].status, TaskStatus.PENDING)
+            self.assertFalse(runner.done())
+
+            self.scheduler.control(job.id, "resume")
+            await asyncio.wait_for(runner, timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            job = asyncio.run(run())
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+
+    def test_cancel_task_cancels_dependents(self):
+        job = Job(target="10.0.0.1")
+        first = job.add_task(Task(tool_name="nmap", params={"target": "10.0.0.1"}))
+        second = job.add_task(Task(tool_name="nuclei", params={"target": "10.0.0.1"}, dependencies=[first.id]))
+        other = job.add_task(Task(tool_name="hydra", params={"target": "10.0.0.1"}))
+        self.scheduler.jobs[job.id] = job
+
+        def fake_tool(tool_name, params):
+            if tool_name == "nmap":
+                return CommandExecutor("sleep 30").execute()
+            return {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            runner = asyncio.create_task(self.scheduler.run_job(job.id))
+            while first.status != TaskStatus.RUNNING:
+                await asyncio.sleep(0.01)
+            self.scheduler.control(job.id, "cancel", first.id)
+            await asyncio.wait_for(runner, timeout=2.0)
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            asyncio.run(run())
+
+        self.assertEqual(first.status, TaskStatus.CANCELLED)
+        self.assertEqual(second.status, TaskStatus.CANCELLED)
+        self.assertEqual(other.status, TaskStatus.COMPLETED)
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+
+    def test_control_request_from_another_process(self):
+        self.mock_db.poll_jobs.side_effect = lambda job_ids, owner: {str(job_id): "cancel" for job_id in job_ids}
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper') as tool:
+            job = asyncio.run(run())
+
+        tool.assert_not_called()
+        self.assertEqual(job.status, TaskStatus.CANCELLED)
+        # Jobs not run by this process are reached through the database
+        self.scheduler.control(job.id, "pause")
+        self.mock_db.request_control.assert_called_with(job.id, "pause")
+
+    def test_one_poll_covers_every_running_job(self):
+        self.scheduler.control_poll_interval = 0.05
+        self.mock_db.poll_jobs.return_value = {}
+        ok = {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        def slow_tool(tool_name, params):
+            time.sleep(0.3)
+            return ok
+
+        async def run():
+            jobs = [await self.scheduler.create_job(f"10.0.0.{i}") for i in range(3)]
+            await asyncio.wait_for(asyncio.gather(*(self.scheduler.run_job(j.id) for j in jobs)), timeout=3.0)
+            return jobs
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=slow_tool):
+            jobs = asyncio.run(run())
+
+        # Past the one check each job makes as it starts, a single query
+        # per interval renews and polls all of them
+        shared = [call[0][0] for call in self.mock_db.poll_jobs.call_args_list if len(call[0][0]) > 1]
+        self.assertTrue(shared)
+        self.assertEqual(set(shared[0]), {job.id for job in jobs})
+
+    def test_transient_failure_is_retried_with_backoff(self):
+        self.scheduler.retries = RetryConfig(policies={"nmap": RetryPolicy(max_attempts=3, backoff=0.05)})
+        self.scheduler.history = DurationHistory(TimeoutConfig(min_samples=1, min_timeout=1))
+        self.scheduler.history.record("nmap", {"target": "10.0.0.9", "ports": "top-1000"}, 2.0)
+        calls = []
+
+        def fake_tool(tool_name, params):
+            # The adaptive timeout reaches the command, doubling on each retry
+            calls.append((time.monotonic(), CommandExecutor("true").timeout))
+            if len(calls) < 3:
+                return {"success": False, "return_code": 1, "stdout": "", "stderr": "Connection reset by peer"}
+            return {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            job = asyncio.run(run())
+
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+        self.assertEqual(job.tasks[0].attempts, 3)
+        self.assertEqual([timeout for _, timeout in calls], [6.0, 12.0, 24.0])
+        # Second retry waits twice as long as the first
+        self.assertGreaterEqual(calls[1][0] - calls[0][0], 0.05)
+        self.assertGreaterEqual(calls[2][0] - calls[1][0], 0.1)
+
+    def test_permanent_failure_is_not_retried(self):
+        calls = []
+
+        def fake_tool(tool_name, params):
+            calls.append(tool_name)
+            return {"success": False, "error": "Invalid ports format"}
+
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            job = asyncio.run(run())
+
+        self.assertEqual(calls, ["nmap"])
+        self.assertEqual(job.tasks[0].status, TaskStatus.FAILED)
+
+    def test_recover_resumes_unfinished_job(self):
+        ok = {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+        job = Job(target="10.0.0.1", status=TaskStatus.RUNNING)
+        nmap = job.add_task(Task(tool_name="nmap", params={"target": "10.0.0.1"},
+                                 status=TaskStatus.COMPLETED, result=ok))
+        nuclei = job.add_task(Task(tool_name="nuclei", params={"target": "http://10.0.0.1"},
+                                   dependencies=[nmap.id], status=TaskStatus.RUNNING))
+        hydra = job.add_task(Task(tool_name="hydra", params={"target": "10.0.0.1", "service": "ssh"},
+                                  dependencies=[nmap.id], status=TaskStatus.RUNNING))
+        sqlmap = job.add_task(Task(tool_name="sqlmap", params={"url": "http://10.0.0.1/?id=1"},
+                                   dependencies=[nuclei.id]))
+        # Round-trip through JSON, as the job is read back from job_results
+        stored = Job.model_validate_json(job.model_dump_json())
+        self.mock_db.get_unfinished_jobs.return_value = [stored]
+        self.mock_db.claim_job.return_value = True
+        calls = []
+
+        def fake_tool(tool_name, params):
+            calls.append(tool_name)
+            return ok
+
+        async def run():
+            jobs = await self.scheduler.recover_jobs(start=False)
+            self.assertEqual([j.id for j in jobs], [job.id])
+            await asyncio.wait_for(self.scheduler.run_job(job.id), timeout=2.0)
+            return self.scheduler.get_job(job.id)
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool):
+            recovered = asyncio.run(run())
+
+        # Finished work is not redone; the interrupted scan reruns, the
+        # interrupted brute force (side effects) is failed instead
+        self.assertEqual(calls, ["nuclei", "sqlmap"])
+        self.assertEqual(recovered.get_task(hydra.id).status, TaskStatus.FAILED)
+        self.assertEqual(recovered.get_task(sqlmap.id).status, TaskStatus.COMPLETED)
+        self.mock_db.claim_job.assert_any_call(job.id, self.scheduler.owner, self.scheduler.recovery.stale_after)
+
+    def test_job_leased_elsewhere_is_not_run_twice(self):
+        async def run():
+            job = await self.scheduler.create_job("10.0.0.1")
+            # Another scheduler recovered it before this one got to run it
+            self.mock_db.claim_job.return_value = False
+            await asyncio.wait_for(self.scheduler.submit_job(job).runner, timeout=2.0)
+            return job
+
+        with patch.object(self.scheduler, '_run_tool_wrapper') as tool:
+            job = asyncio.run(run())
+
+        tool.assert_not_called()
+        self.assertEqual(job.status, TaskStatus.PENDING)
+        # The lease is taken as soon as the job is submitted
+        self.mock_db.claim_job.assert_any_call(job.id, self.scheduler.owner, self.scheduler.recovery.stale_after)
+        self.mock_db.update_status.assert_not_called()
+
+    def test_recover_skips_jobs_claimed_elsewhere(self):
+        self.mock_db.get_unfinished_jobs.return_value = [Job(target="10.0.0.1", status=TaskStatus.RUNNING)]
+        self.mock_db.claim_job.return_value = False
+
+        jobs = asyncio.run(self.scheduler.recover_jobs(start=False))
+
+        self.assertEqual(jobs, [])
+        self.assertEqual(self.scheduler.jobs, {})
+
+    def test_nuclei_tasks_across_jobs_share_one_batch(self):
+        self.scheduler.batcher.config = BatchingConfig(window=0.2)
+        ok = {"success": True, "return_code": 0, "stderr": ""}
+        batches = []
+
+        def fake_tool(tool_name, params):
+            return dict(ok, stdout="")
+
+        def fake_batch(tool_name, targets, params, scope, timeout=None):
+            batches.append(sorted(targets))
+            return {t: dict(ok, stdout=f"[tech] [http] [info] {t}\n", batched=len(targets)) for t in targets}
+
+        async def run():
+            jobs = []
+            for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+                job = Job(target=ip)
+                job.add_task(Task(tool_name="nuclei", params={"target": f"http://{ip}"}))
+                self.scheduler.jobs[job.id] = job
+                jobs.append(job)
+            await asyncio.wait_for(asyncio.gather(*(self.scheduler.run_job(j.id) for j in jobs)), timeout=2.0)
+            return jobs
+
+        with patch.object(self.scheduler, '_run_tool_wrapper', side_effect=fake_tool), \
+             patch.object(self.scheduler, '_run_batch_wrapper', side_effect=fake_batch):
+            jobs = asyncio.run(run())
+
+        self.assertEqual(batches, [["http://10.0.0.1", "http://10.0.0.2", "http://10.0.0.3"]])
+        for job in jobs:
+            task = job.tasks[0]
+            self.assertEqual(task.status, TaskStatus.COMPLETED)
+            self.assertEqual(task.result["stdout"], f"[tech] [http] [info] http://{job.target}\n")
+
+    def test_batch_timeout_reflects_one_process(self):
+        from mcp_scan.core.batching import TaskBatcher
+        timeouts = []
+
+        async def launch(tool_name, shared, targets, scope, timeout):
+            timeouts.append(timeout)
+            return {t: {"success": True} for t in targets}
+
+        async def run(count, config):
+            batcher = TaskBatcher(config, launch)
+            await asyncio.gather(*(batcher.submit(uuid4(), "nuclei", {"target": f"http://10.0.0.{i}"}, 600)
+                                   for i in range(count)))
+
+        asyncio.run(run(20, BatchingConfig(window=0.01, max_targets=20, per_target_timeout=30)))
+        asyncio.run(run(20, BatchingConfig(window=0.01, max_targets=20, max_timeout=900)))
+        # Slowest target's timeout plus 30s for each of the 19 others, then capped
+        self.assertEqual(timeouts, [600 + 19 * 30, 900])
+
+    def test_create_jobs_in_bulk(self):
+        from mcp_scan.core.errors import InvalidTargetError
+
+        async def run():
+            jobs = await self.scheduler.create_jobs(["10.0.0.1", "10.0.0.2 ", "", "10.0.0.1"], priority=7)
+            with self.assertRaises(InvalidTargetError):
+                await self.scheduler.create_jobs(["10.0.0.3", "10.0.0.0/8"])
+            return jobs
+
+        jobs = asyncio.run(run())
+        self.assertEqual([job.target for job in jobs], ["10.0.0.1", "10.0.0.2"])
+        self.assertTrue(all(job.priority == 7 and job.tasks[0].tool_name == "nmap" for job in jobs))
+        # One bulk save; the rejected batch left nothing behind
+        self.mock_db.save_jobs.assert_called_once_with(jobs)
+        self.mock_db.save_job.assert_not_called()
+        self.assertEqual(len(self.scheduler.jobs), 2)
+
+    def test_failed_bulk_save_creates_no_job(self):
+        from mcp_scan.core.errors import SchedulerError
+        self.mock_db.save_jobs.return_value = False
+
+        async def run():
+            with self.assertRaises(SchedulerError):
+                await self.scheduler.create_jobs(["10.0.0.1", "10.0.0.2"])
+
+        asyncio.run(run())
+        self.assertEqual(len(self.scheduler.jobs), 0)
@@ -0,0 +1,50 @@
+import unittest
+from mcp_scan.config import ShardingConfig
+from mcp_scan.core.errors import InvalidTargetError
+from mcp_scan.core.sharding import shard_targets, shard_ports, plan_scan_shards
+
+class TestSharding(unittest.TestCase):
+    def test_cidr_split_into_subnets(self):
+        shards = shard_targets("10.0.0.0/22", 64, 65536)
+        self.assertEqual(len(shards), 16)
+        self.assertEqual(shards[0], "10.0.0.0/26")
+        self.assertEqual(shard_targets("10.0.0.5/32", 64, 65536), ["10.0.0.5/32"])
+
+    def test_ranges_and_lists_grouped(self):
+        shards = shard_targets("10.0.0.1-10, example.com 10.0.0.3", 4, 1000)
+        self.assertEqual(shards, [
+            "10.0.0.1 10.0.0.2 10.0.0.3 10.0.0.4",
+            "10.0.0.5 10.0.0.6 10.0.0.7 10.0.0.8",
+            "10.0.0.9 10.0.0.10 example.com",
+        ])
+        self.assertEqual(shard_targets("example.com", 4, 1000), ["example.com"])
+
+    def test_other_targets_pass_through(self):
+        self.assertEqual(shard_targets("http://example.com/", 4, 1000), ["http://example.com/"])
+        self.assertEqual(shard_targets("1-800-flowers.com", 4, 1000), ["1-800-flowers.com"])
+        self.assertEqual(shard_targets("https://example.com/app 10.0.0.1-2", 4, 1000),
+                         ["https://example.com/app 10.0.0.1 10.0.0.2"])
+
+    def test_scope_limit(self):
+        with self.assertRaises(InvalidTargetError):
+            shard_targets("10.0.0.0/8", 64, 65536)
+        with self.assertRaises(InvalidTargetError):
+            shard_targets("10.0.0.9-1", 64, 65536)
+
+    def test_port_shards(self):
+        shards = shard_ports("all", 16384)
+        self.assertEqual(shards, ["1-16384", "16385-32768", "32769-49152", "49153-65535"])
+        self.assertEqual(shard_ports("1-10,20,30-35", 5), ["1-5", "6-10", "20,30-33", "34-35"])
+        self.assertEqual(shard_ports("top-1000", 5), ["top-1000"])
+        self.assertEqual(shard_ports("22,80", 5), ["22,80"])
+
+    def test_plan_is_cross_product(self):
+        config = ShardingConfig(hosts_per_shard=128, max_ports_per_shard=32768)
+        shards = plan_scan_shards("192.168.0.0/24", "1-65535", config)
+        self.assertEqual(len(shards), 4)
+        self.assertIn(("192.168.0.128/25", "32769-65535"), shards)
+        self.assertEqual(plan_scan_shards("192.168.0.0/24", "1-65535", ShardingConfig(enabled=False)),
+                         [("192.168.0.0/24", "1-65535")])
+
+if __name__ == '__main__':
+    unittest.main()
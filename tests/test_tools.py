@@ -1,7 +1,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from mcp_scan.tools.nmap_tool import run_nmap
-from mcp_scan.tools.nuclei_tool import run_nuclei
+from mcp_scan.tools.nmap_tool import run_nmap, parse_nmap_output, NmapStreamParser
+from mcp_scan.command_executor import CommandExecutor, stream_output
+from mcp_scan.tools.nuclei_tool import run_nuclei, run_nuclei_batch, split_nuclei_output
 from mcp_scan.tools.gobuster_tool import run_gobuster
 from mcp_scan.tools.sqlmap_tool import run_sqlmap
 from mcp_scan.tools.metasploit_tool import run_metasploit
@@ -30,6 +31,56 @@ class TestTools(unittest.TestCase):
         run_nmap("example.com", ports="80,443", timing="T4")
         MockExecutor.assert_called_with("nmap -T4 -p 80,443 example.com", timeout=300)
 
+    def test_nmap_output_parsing(self):
+        stdout = (
+            "Nmap scan report for example.com (93.184.216.34)\n"
+            "PORT    STATE  SERVICE VERSION\n"
+            "22/tcp  open   ssh     OpenSSH 8.2p1 Ubuntu 4ubuntu0.5\n"
+            "80/tcp  open   http    Apache httpd 2.4.41 ((Ubuntu))\n"
+            "443/tcp closed https\n"
+            "Nmap scan report for 10.0.0.2\n"
+            "3306/tcp open mysql\n"
+        )
+        hosts = parse_nmap_output(stdout)
+
+        self.assertEqual([h.ip for h in hosts], ["93.184.216.34", "10.0.0.2"])
+        self.assertEqual(hosts[0].hostname, "example.com")
+        self.assertEqual([s.port for s in hosts[0].services], [22, 80])
+        self.assertEqual(hosts[0].services[1].product, "Apache httpd")
+        self.assertEqual(hosts[0].services[1].version, "2.4.41")
+        self.assertEqual(hosts[1].services[0].service_name, "mysql")
+
+    def test_nmap_stream_parsing(self):
+        parser = NmapStreamParser("example.com")
+        lines = [
+            "Scanning example.com (93.184.216.34) [1000 ports]",
+            "Discovered open port 80/tcp on 93.184.216.34",
+            "Discovered open port 22/tcp on 93.184.216.34",
+            "Nmap scan report for example.com (93.184.216.34)",
+            "22/tcp open ssh OpenSSH 8.2p1",
+            "80/tcp open http Apache httpd 2.4.41",
+            "8443/tcp open https-alt",
+        ]
+        found = [f for f in map(parser.feed, lines) if f]
+
+        # Each port is reported once, as soon as it is first seen
+        self.assertEqual([(h.hostname, s.port) for h, s in found],
+                         [("example.com", 80), ("example.com", 22), ("example.com", 8443)])
+        self.assertEqual(found[0][1].service_name, "unknown")
+
+    @patch('mcp_scan.tools.nmap_tool.CommandExecutor')
+    def test_nmap_verbose_when_streaming(self, MockExecutor):
+        MockExecutor.return_value.execute.return_value = {"return_code": 0}
+        with stream_output(lambda line: None):
+            run_nmap("example.com", ports="80")
+        MockExecutor.assert_called_with("nmap -T3 -p 80 -v example.com", timeout=300)
+
+    def test_executor_line_callback(self):
+        lines = []
+        result = CommandExecutor("printf 'one\\ntwo\\n'", on_line=lines.append).execute()
+        self.assertEqual(lines, ["one\n", "two\n"])
+        self.assertEqual(result["stdout"], "one\ntwo\n")
+
     @patch('mcp_scan.tools.nuclei_tool.CommandExecutor')
     def test_nuclei_command_generation(self, MockExecutor):
         mock_instance = MockExecutor.return_value
@@ -39,6 +90,44 @@ class TestTools(unittest.TestCase):
         
         MockExecutor.assert_called_with("nuclei -target http://example.com -tags cve,misc -rate-limit 50", timeout=600)
 
+    @patch('mcp_scan.tools.nuclei_tool.CommandExecutor')
+    def test_nuclei_batch_splits_findings(self, MockExecutor):
+        MockExecutor.return_value.execute.return_value = {
+            "return_code": 0, "stderr": "",
+            "stdout": (
+                "[tech-detect:nginx] [http] [info] http://example.com:80/\n"
+                "[git-config] [http] [medium] http://example.com:8080/.git/config\n"
+                "[phpinfo] [http] [low] http://example.com/app/info.php\n"
+                "[INF] Templates loaded for current scan: 4000\n"
+            ),
+        }
+        targets = ["http://example.com", "http://example.com:8080", "http://example.com/app"]
+        results = run_nuclei_batch(targets, tags=["cve"])
+
+        command = MockExecutor.call_args[0][0]
+        self.assertTrue(command.startswith("nuclei -list "))
+        self.assertTrue(command.endswith(" -tags cve -rate-limit 50"))
+        self.assertEqual(results["http://example.com"]["stdout"],
+                         "[tech-detect:nginx] [http] [info] http://example.com:80/\n")
+        self.assertIn(".git/config", results["http://example.com:8080"]["stdout"])
+        self.assertIn("info.php", results["http://example.com/app"]["stdout"])
+        self.assertTrue(all(r["success"] and r["batched"] == 3 for r in results.values()))
+        self.assertEqual(split_nuclei_output("", targets)["http://example.com"], "")
+
+    def test_nuclei_split_network_template_findings(self):
+        stdout = (
+            "[ssh-weak-algo] [javascript] [low] example.com:22\n"
+            "[ssl-dns-names] [ssl] [info] example.org:443 [\"example.org\"]\n"
+            "[dns-saas-service] [dns] [info] example.net\n"
+            "[openssh-detect] [tcp] [info] unrelated.com:22\n"
+        )
+        targets = ["http://example.com", "https://example.org", "http://example.net:8080"]
+        findings = split_nuclei_output(stdout, targets)
+        self.assertEqual(findings["http://example.com"], "[ssh-weak-algo] [javascript] [low] example.com:22\n")
+        self.assertIn("ssl-dns-names", findings["https://example.org"])
+        self.assertIn("dns-saas-service", findings["http://example.net:8080"])
+        self.assertNotIn("unrelated", "".join(findings.values()))
+
     @patch('mcp_scan.tools.gobuster_tool.CommandExecutor')
     def test_gobuster_command_generation(self, MockExecutor):
         mock_instance = MockExecutor.return_value
@@ -0,0 +1,243 @@
+import unittest
+import asyncio
+import multiprocessing
+import os
+import time
+from unittest.mock import MagicMock, patch
+from mcp_scan.config import WorkerConfig
+from mcp_scan.core.models import Job, Task, TaskStatus
+from mcp_scan.core.scheduler import Scheduler
+from mcp_scan.core.workers import WorkerRegistry
+from mcp_scan.transport.kali_client import KaliToolsClient
+from mcp_scan.transport.worker import ScanWorker
+from mcp_scan.transport.worker_api import WorkerAPIServer
+
+def fake_runner(tool_name, params):
+    time.sleep(0.05)
+    return {"success": True, "return_code": 0, "stdout": f"pid {os.getpid()}", "stderr": ""}
+
+TOKEN = "test-token"
+
+def run_worker_process(url, name):
+    ScanWorker(url, name=name, capacity=2, runner=fake_runner,
+               heartbeat_interval=0.2, poll_interval=0.05, token=TOKEN).run()
+
+class TestWorkerRegistry(unittest.TestCase):
+    def test_tasks_of_dead_worker_are_reassigned(self):
+        registry = WorkerRegistry(WorkerConfig(heartbeat_timeout=1.0))
+
+        async def run():
+            dead = registry.register("dead", capacity=1)
+            pending = asyncio.ensure_future(registry.execute("t1", "nmap", {"target": "10.0.0.1"}))
+            await asyncio.sleep(0)
+            self.assertEqual([t["task_id"] for t in registry.pull(dead)], ["t1"])
+
+            alive = registry.register("alive", capacity=1)
+            self.assertEqual(registry.pull(alive), [])
+            registry._workers[dead].last_seen -= 10
+            self.assertEqual(registry.reap(), [dead])
+
+            self.assertEqual([t["task_id"] for t in registry.pull(alive)], ["t1"])
+            registry.complete(alive, "t1", {"success": True})
+            result = await asyncio.wait_for(pending, 1.0)
+            self.assertTrue(result["success"])
+            self.assertIn("duration", result)  # Timed from the lease to the live worker
+            # A late result from the dead worker is ignored
+            self.assertFalse(registry.complete(dead, "t1", {"success": False}))
+
+        asyncio.run(run())
+
+    def test_orphaned_tasks_fall_back_when_no_workers_left(self):
+        registry = WorkerRegistry(WorkerConfig(heartbeat_timeout=1.0))
+
+        async def run():
+            worker = registry.register("only")
+            pending = asyncio.ensure_future(registry.execute("t1", "nmap", {}))
+            await asyncio.sleep(0)
+            registry._workers[worker].last_seen -= 10
+            registry.reap()
+            self.assertIsNone(await asyncio.wait_for(pending, 1.0))
+
+        asyncio.run(run())
+
+    def test_worker_only_gets_tools_it_supports(self):
+        registry = WorkerRegistry(WorkerConfig())
+
+        async def run():
+            worker = registry.register("web-only", capacity=2, tools=["nuclei"])
+            first = asyncio.ensure_future(registry.execute("t1", "nmap", {}))
+            second = asyncio.ensure_future(registry.execute("t2", "nuclei", {}))
+            await asyncio.sleep(0)
+            self.assertEqual([t["task_id"] for t in registry.pull(worker, 2)], ["t2"])
+            first.cancel()
+            second.cancel()
+
+        asyncio.run(run())
+
+    def test_tasks_no_remaining_worker_supports_are_handed_back(self):
+        registry = WorkerRegistry(WorkerConfig(heartbeat_timeout=1.0))
+
+        async def run():
+            registry.register("web-only", tools=["nuclei"])
+            general = registry.register("general")
+            pending = asyncio.ensure_future(registry.execute("t1", "nmap", {}))
+            await asyncio.sleep(0)
+            self.assertTrue(registry.deregister(general))
+            self.assertIsNone(await asyncio.wait_for(pending, 1.0))
+            # No worker can run nmap now: nothing is queued at all
+            self.assertIsNone(await registry.execute("t2", "nmap", {}))
+
+        asyncio.run(run())
+
+    def test_cancelled_remote_task_is_sent_to_its_worker(self):
+        registry = WorkerRegistry(WorkerConfig())
+
+        async def run():
+            worker = registry.register("w")
+            pending = asyncio.ensure_future(registry.execute("t1", "nmap", {}))
+            await asyncio.sleep(0)
+            registry.pull(worker)
+            pending.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(registry.take_cancellations(worker), ["t1"])
+            self.assertEqual(registry.take_cancellations(worker), [])
+
+        asyncio.run(run())
+
+class TestDistributedScheduling(unittest.TestCase):
+    def setUp(self):
+        self.db_patcher = patch('mcp_scan.core.scheduler.get_db')
+        self.db_patcher.start().return_value = MagicMock()
+        self.addCleanup(self.db_patcher.stop)
+
+    def test_jobs_run_on_local_worker_processes(self):
+        scheduler = Scheduler()
+        api = WorkerAPIServer(scheduler.workers, "127.0.0.1", 0, token=TOKEN)
+        api.start()
+        self.addCleanup(api.stop)
+
+        # Requests without the shared token are turned away
+        anonymous = KaliToolsClient(api.url).safe_post("api/workers/register", {"name": "intruder"})
+        self.assertFalse(anonymous["success"])
+        self.assertEqual(scheduler.workers.workers(), [])
+
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=run_worker_process, args=(api.url, f"w{i}"), daemon=True)
+                   for i in range(2)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            self.addCleanup(process.terminate)
+
+        deadline = time.monotonic() + 5
+        while len(scheduler.workers.workers()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(scheduler.workers.workers()), 2)
+
+        async def run():
+            job = Job(target="10.0.0.1")
+            for i in range(6):
+                job.add_task(Task(tool_name="nuclei", params={"target": f"http://10.0.0.{i}"}))
+            scheduler.jobs[job.id] = job
+            await asyncio.wait_for(scheduler.run_job(job.id), timeout=10.0)
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+        pids = {task.result["stdout"] for task in job.tasks}
+        self.assertNotIn(f"pid {os.getpid()}", pids)
+        self.assertEqual(len(pids), 2)
+
+    def test_remote_results_are_cached(self):
+        scheduler = Scheduler()
+        worker = scheduler.workers.register("remote")
+        runs = []
+
+        async def serve():
+            # Stands in for a ScanWorker polling over HTTP
+            while True:
+                for item in scheduler.workers.pull(worker, 2):
+                    runs.append(item["params"])
+                    scheduler.workers.complete(worker, item["task_id"], {
+                        "success": True, "return_code": 0, "stdout": "[info] http://10.0.0.1", "stderr": ""})
+                await asyncio.sleep(0.01)
+
+        async def run():
+            server = asyncio.create_task(serve())
+            jobs = []
+            for _ in range(2):
+                job = Job(target="10.0.0.1")
+                job.add_task(Task(tool_name="nuclei", params={"target": "http://10.0.0.1"}))
+                scheduler.jobs[job.id] = job
+                await asyncio.wait_for(scheduler.run_job(job.id), timeout=2.0)
+                jobs.append(job)
+            server.cancel()
+            return jobs
+
+        first, second = asyncio.run(run())
+        self.assertEqual(len(runs), 1)
+        self.assertNotIn("cached", first.tasks[0].result)
+        self.assertTrue(second.tasks[0].result["cached"])
+        self.assertEqual(scheduler.cache.stats()["hits"], 1)
+
+    def test_remote_runs_get_the_timeout_and_feed_the_history(self):
+        scheduler = Scheduler()
+        worker = scheduler.workers.register("remote")
+        leased = []
+
+        async def serve():
+            while True:
+                for item in scheduler.workers.pull(worker, 1):
+                    leased.append(item)
+                    await asyncio.sleep(0.05)
+                    scheduler.workers.complete(worker, item["task_id"], {
+                        "success": True, "return_code": 0, "stdout": "", "stderr": ""})
+                await asyncio.sleep(0.01)
+
+        async def run():
+            server = asyncio.create_task(serve())
+            job = Job(target="10.0.0.1")
+            job.add_task(Task(tool_name="nmap", params={"target": "10.0.0.1"}, bypass_cache=True))
+            scheduler.jobs[job.id] = job
+            await asyncio.wait_for(scheduler.run_job(job.id), timeout=2.0)
+            server.cancel()
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(leased[0]["timeout"], 300)  # nmap's default until durations are known
+        self.assertGreaterEqual(job.tasks[0].result["duration"], 0.05)
+        self.assertEqual([shape["samples"] for shape in scheduler.history.stats().values()], [1])
+
+    def test_worker_applies_the_sent_timeout(self):
+        from mcp_scan.command_executor import CommandExecutor
+        timeouts = []
+
+        def runner(tool_name, params):
+            timeouts.append(CommandExecutor("true").timeout)
+            return {"success": True}
+
+        worker = ScanWorker("http://127.0.0.1:1", runner=runner)
+        worker.client = MagicMock()
+        worker._running = 1
+        worker._run_task({"task_id": "t1", "tool_name": "nmap", "params": {}, "timeout": 42})
+        self.assertEqual(timeouts, [42])
+
+    def test_task_no_worker_supports_runs_locally(self):
+        scheduler = Scheduler()
+        scheduler.workers.register("web-only", tools=["nuclei"])
+        ok = {"success": True, "return_code": 0, "stdout": "", "stderr": ""}
+
+        async def run():
+            job = Job(target="10.0.0.1")
+            job.add_task(Task(tool_name="nmap", params={"target": "10.0.0.1"}))
+            scheduler.jobs[job.id] = job
+            await asyncio.wait_for(scheduler.run_job(job.id), timeout=2.0)
+            return job
+
+        with patch.object(scheduler, '_run_tool_wrapper', return_value=ok) as tool:
+            job = asyncio.run(run())
+        self.assertEqual(job.status, TaskStatus.COMPLETED)
+        self.assertEqual(tool.call_args[0][0], "nmap")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock
+from mcp_scan.config import PersistenceConfig
+from mcp_scan.core.models import Job, TaskStatus
+from mcp_scan.core.writer import JobWriter
+
+class TestJobWriter(unittest.TestCase):
+    def test_saves_coalesce_into_one_batch(self):
+        db = MagicMock()
+        writer = JobWriter(PersistenceConfig(flush_interval=0.05), db)
+        first, second = Job(target="10.0.0.1"), Job(target="10.0.0.2")
+
+        async def run():
+            for _ in range(5):
+                writer.save(first)
+                writer.save(second)
+            db.save_jobs.assert_not_called()
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        db.save_jobs.assert_called_once_with([first, second])
+        db.save_job.assert_not_called()
+        self.assertEqual(writer.stats(), {"dirty": 0, "saves": 10, "writes": 2, "batches": 1})
+
+    def test_final_state_is_written_at_once(self):
+        db = MagicMock()
+        writer = JobWriter(PersistenceConfig(flush_interval=60), db)
+        job = Job(target="10.0.0.1")
+
+        async def run():
+            writer.save(job)
+            job.status = TaskStatus.COMPLETED
+            writer.save(job)
+            db.save_job.assert_called_once_with(job)
+            writer.flush()
+
+        asyncio.run(run())
+        # The pending write was superseded by the final one
+        db.save_jobs.assert_not_called()
+
+    def test_failed_batch_is_retried(self):
+        db = MagicMock()
+        db.save_jobs.side_effect = [False, True]
+        writer = JobWriter(PersistenceConfig(flush_interval=0.02), db)
+        job = Job(target="10.0.0.1")
+
+        async def run():
+            writer.save(job)
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        self.assertEqual(db.save_jobs.call_count, 2)
+        self.assertEqual(writer.stats()["dirty"], 0)
+
+if __name__ == '__main__':
+    unittest.main()